@@ -12,18 +12,18 @@ class HistoricalSiteAdmin(admin.ModelAdmin):
     list_display = ('name', 'event_date', 'category', 'event_type', 'location_name')
     
     # Add filtering options in the right sidebar
-    list_filter = ('event_date', 'category', 'event_type', 'created_at')
+    list_filter = ('event_date', 'category', 'event_type', 'county', 'created_at')
     
     # Enable search functionality for key fields
     search_fields = ('name', 'location_name', 'significance')
     
     # Prevent modification of timestamp fields
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('county', 'created_at', 'updated_at')
     
     # Organize fields into logical groupings
     fieldsets = (
         ('Basic Information', {
-            'fields': ('name', 'event_date', 'location_name', 'location')
+            'fields': ('name', 'event_date', 'location_name', 'location', 'county')
         }),
         ('Classification', {
             'fields': ('category', 'event_type')
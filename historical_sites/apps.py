@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class HistoricalSitesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'historical_sites'
+    
+    def ready(self):
+        # Register signal handlers that keep denormalised data in sync
+        from . import signals  # noqa: F401
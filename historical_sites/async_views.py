@@ -0,0 +1,116 @@
+"""
+Async versions of the read-only site endpoints.
+
+Served under ASGI (e.g. gunicorn with uvicorn workers running
+irish_civil_war_project.asgi), a worker holds no thread while these views
+wait on the database or on a slow client, so one node can keep many more
+connections open. Responses match the DRF endpoints' fast list path.
+"""
+import functools
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.request import Request
+
+from .models import HistoricalSite
+from .pagination import KeysetPagination
+from .serializers import HistoricalSiteDetailSerializer, site_list_values, with_coordinates
+from .views import (
+    HistoricalSiteFilter,
+    finish_nearby_rows,
+    nearby_extra,
+    nearby_queryset,
+    nearby_rows,
+    parse_nearby_params
+)
+
+
+def require_get(view):
+    """Async-aware require_GET (Django 4.2's method decorators only wrap sync views)"""
+    @functools.wraps(view)
+    async def inner(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+def _error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _site_queryset():
+    return HistoricalSite.objects.all().order_by('event_date', 'id')
+
+
+@require_get
+async def site_list(request):
+    """Filtered site list; keyset-paginated with `cursor`/`page_size`"""
+    filterset = HistoricalSiteFilter(request.GET, queryset=_site_queryset(), request=request)
+    if not filterset.is_valid():
+        return JsonResponse(filterset.errors, status=400)
+    rows = site_list_values(filterset.qs)
+
+    paginator = KeysetPagination()
+    drf_request = Request(request)
+    if paginator.is_requested(drf_request):
+        page = await sync_to_async(paginator.paginate_queryset)(rows, drf_request)
+        return JsonResponse({'next': paginator.get_next_link(), 'results': page})
+
+    return JsonResponse([row async for row in rows], safe=False)
+
+
+@require_get
+async def site_detail(request, pk):
+    """Single site with the detail serializer fields"""
+    queryset = with_coordinates(_site_queryset().defer('location', 'search_vector'))
+    try:
+        site = await queryset.aget(pk=pk)
+    except HistoricalSite.DoesNotExist:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    # nearby_events reads the neighbour table through the sync ORM
+    data = await sync_to_async(lambda: HistoricalSiteDetailSerializer(site).data)()
+    return JsonResponse(data)
+
+
+@require_get
+async def site_nearby(request):
+    """Proximity / KNN search with the same parameters as /api/sites/nearby/"""
+    try:
+        latitude, longitude, k, radius_km = parse_nearby_params(request.GET)
+    except ValueError as e:
+        return _error(str(e))
+
+    rows = nearby_rows(nearby_queryset(latitude, longitude, radius_km), k, radius_km)
+    sites = [row async for row in rows]
+    count = finish_nearby_rows(sites, radius_km)
+    return JsonResponse({
+        'count': count,
+        **nearby_extra(latitude, longitude, k, radius_km),
+        'sites': sites
+    })
+
+
+@require_get
+async def site_timeline(request):
+    """Sites within a date range (start_date, end_date)"""
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+
+    try:
+        queryset = _site_queryset()
+        if start_date:
+            queryset = queryset.filter(event_date__gte=date.fromisoformat(start_date))
+        if end_date:
+            queryset = queryset.filter(event_date__lte=date.fromisoformat(end_date))
+    except ValueError as e:
+        return _error(f'Invalid parameter: {str(e)}')
+
+    sites = [row async for row in site_list_values(queryset)]
+    return JsonResponse({
+        'count': len(sites),
+        'date_range': {'start': start_date, 'end': end_date},
+        'sites': sites
+    })
@@ -0,0 +1,186 @@
+"""
+Type-ahead suggestions for site names, place names and counties.
+
+Each process keeps a sorted array of casefolded keys (one per word start of
+every label) and answers prefix queries with a binary search, so a keystroke
+costs microseconds and no database round trip. The index is keyed by the
+site and county dataset versions and rebuilt when either changes. It is
+bounded by AUTOCOMPLETE_MAX_ENTRIES; larger datasets are answered by
+indexed case-insensitive prefix queries on the whole label instead. Queries
+without any prefix match (typically typos) fall back to trigram word
+similarity in PostgreSQL.
+"""
+import re
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+
+from .caching import dataset_versions
+from .models import CountyBoundary, DatasetVersion, HistoricalSite
+
+
+AUTOCOMPLETE_DATASETS = (DatasetVersion.HISTORICAL_SITES, DatasetVersion.COUNTY_BOUNDARIES)
+
+# Shortest query answered by trigram similarity (shorter strings have too
+# few trigrams to match reliably)
+MIN_FUZZY_LENGTH = 3
+
+_WORD_START = re.compile(r'\w+')
+
+
+class PrefixIndex:
+    """Sorted array of (key, suggestion) pairs searched with bisect"""
+
+    def __init__(self, suggestions):
+        entries = []
+        for suggestion in suggestions:
+            label = suggestion['label'].casefold()
+            # Index the label from each word start so "amb" finds "Kilmichael Ambush"
+            for match in _WORD_START.finditer(label):
+                entries.append((label[match.start():], match.start(), suggestion))
+        entries.sort(key=lambda entry: entry[0])
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, prefix, limit):
+        """Return up to `limit` suggestions with a word starting with `prefix`"""
+        prefix = prefix.casefold()
+        start = bisect_left(self.keys, prefix)
+        matches = {}
+        # Scan a few more candidates than needed so whole-label matches and
+        # short labels can be ranked first
+        for key, position, suggestion in self.entries[start:start + limit * 5]:
+            if not key.startswith(prefix):
+                break
+            identity = (suggestion['type'], suggestion['id'], suggestion['label'])
+            if identity not in matches or position < matches[identity][0]:
+                matches[identity] = (position, suggestion)
+        ranked = sorted(
+            matches.values(),
+            key=lambda item: (item[0] > 0, len(item[1]['label']), item[1]['label'])
+        )
+        return [suggestion for _position, suggestion in ranked[:limit]]
+
+
+def iter_suggestions():
+    """Yield every suggestion: sites, distinct place names and counties"""
+    sites = HistoricalSite.objects.order_by().values_list('id', 'name', 'location_name')
+    places = set()
+    for pk, name, location_name in sites.iterator(chunk_size=5000):
+        yield {'type': 'site', 'id': pk, 'label': name}
+        if location_name and location_name not in places:
+            places.add(location_name)
+            yield {'type': 'place', 'id': None, 'label': location_name}
+    for pk, name in CountyBoundary.objects.order_by().values_list('id', 'name'):
+        yield {'type': 'county', 'id': pk, 'label': name}
+
+
+# Per-process index: (dataset versions, PrefixIndex or None when over the bound)
+_index = None
+_index_lock = threading.Lock()
+
+
+def build_prefix_index():
+    """Build the prefix index, or return None if it would exceed the entry bound"""
+    max_entries = settings.AUTOCOMPLETE_MAX_ENTRIES
+    site_count = HistoricalSite.objects.count()
+    # Every site contributes at least a name and usually a place
+    if site_count * 2 > max_entries:
+        return None
+    index = PrefixIndex(iter_suggestions())
+    return index if len(index) <= max_entries else None
+
+
+def get_prefix_index():
+    """
+    Return the current prefix index, rebuilding it after a dataset change.
+    While one thread rebuilds, other threads keep using the previous index.
+    """
+    global _index
+    versions = dataset_versions(AUTOCOMPLETE_DATASETS)
+    current = _index
+    if current is not None and current[0] == versions:
+        return current[1]
+
+    if not _index_lock.acquire(blocking=current is None):
+        return current[1]
+    try:
+        if _index is None or _index[0] != versions:
+            _index = (versions, build_prefix_index())
+        return _index[1]
+    finally:
+        _index_lock.release()
+
+
+def warm_prefix_index():
+    """Build the index ahead of the first request (called at process start)"""
+    get_prefix_index()
+
+
+def database_prefix_suggestions(text, limit):
+    """
+    Suggestions whose label starts with `text` (case-insensitive), served by
+    the UPPER(...) text_pattern_ops indexes; used when the in-memory index is
+    over its bound. Shorter labels are ranked first, as in PrefixIndex.
+    """
+    suggestions = []
+    sites = HistoricalSite.objects.filter(name__istartswith=text).order_by().values_list(
+        'id', 'name'
+    )[:limit]
+    suggestions.extend({'type': 'site', 'id': pk, 'label': name} for pk, name in sites)
+    places = HistoricalSite.objects.filter(location_name__istartswith=text).order_by().values_list(
+        'location_name', flat=True
+    ).distinct()[:limit]
+    suggestions.extend({'type': 'place', 'id': None, 'label': name} for name in places)
+    counties = CountyBoundary.objects.filter(name__istartswith=text).values_list('id', 'name')[:limit]
+    suggestions.extend({'type': 'county', 'id': pk, 'label': name} for pk, name in counties)
+    suggestions.sort(key=lambda suggestion: (len(suggestion['label']), suggestion['label']))
+    return suggestions[:limit]
+
+
+def fuzzy_suggestions(text, limit):
+    """Typo-tolerant suggestions from the pg_trgm indexes (word similarity)"""
+    suggestions = []
+    sites = HistoricalSite.objects.filter(name__trigram_word_similar=text).annotate(
+        similarity=TrigramWordSimilarity(text, 'name')
+    ).order_by('-similarity', 'name').values_list('id', 'name', 'similarity')[:limit]
+    suggestions.extend(
+        (similarity, {'type': 'site', 'id': pk, 'label': name}) for pk, name, similarity in sites
+    )
+    places = HistoricalSite.objects.filter(location_name__trigram_word_similar=text).annotate(
+        similarity=TrigramWordSimilarity(text, 'location_name')
+    ).order_by('-similarity', 'location_name').values_list(
+        'location_name', 'similarity'
+    ).distinct()[:limit]
+    suggestions.extend(
+        (similarity, {'type': 'place', 'id': None, 'label': name}) for name, similarity in places
+    )
+    counties = CountyBoundary.objects.filter(name__trigram_word_similar=text).annotate(
+        similarity=TrigramWordSimilarity(text, 'name')
+    ).order_by('-similarity', 'name').values_list('id', 'name', 'similarity')[:limit]
+    suggestions.extend(
+        (similarity, {'type': 'county', 'id': pk, 'label': name}) for pk, name, similarity in counties
+    )
+    suggestions.sort(key=lambda item: (-item[0], item[1]['label']))
+    return [suggestion for _similarity, suggestion in suggestions[:limit]]
+
+
+def autocomplete(text, limit):
+    """
+    Prefix suggestions from memory, or from the prefix indexes when the
+    in-memory index is over its bound; trigram similarity is only queried
+    when the prefix has no match (a likely typo).
+    """
+    index = get_prefix_index()
+    if index is not None:
+        results = index.search(text, limit)
+    else:
+        results = database_prefix_suggestions(text, limit)
+    if not results and len(text) >= MIN_FUZZY_LENGTH:
+        results = fuzzy_suggestions(text, limit)
+    return results
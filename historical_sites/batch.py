@@ -0,0 +1,177 @@
+"""
+Batched spatial queries: many radius, polygon and bbox queries answered by a
+single SQL statement. The queries are passed as parallel arrays, unnested
+into rows and matched against the sites with a LATERAL subquery each, so the
+per-query cost is one index scan rather than one HTTP request and round trip.
+"""
+from django.conf import settings
+from django.contrib.gis.geos import GEOSException, Polygon
+from django.db import connection
+
+from .models import HistoricalSite
+from .serializers import site_list_values
+
+
+QUERY_TYPES = ('radius', 'polygon', 'bbox')
+DEFAULT_QUERY_LIMIT = 100
+
+
+def parse_batch_queries(queries):
+    """
+    Validate the submitted queries and return their (id, type) pairs plus
+    radius queries (index, lng, lat, metres, limit) and polygon queries
+    (index, wkt, limit); bboxes are sent as polygons. Raises ValueError
+    naming the offending query.
+    """
+    max_queries = settings.BATCH_QUERY_MAX_QUERIES
+    if not isinstance(queries, list) or not queries:
+        raise ValueError('queries must be a non-empty list')
+    if len(queries) > max_queries:
+        raise ValueError(f'Too many queries (max {max_queries})')
+
+    max_limit = settings.NEARBY_MAX_RESULTS
+    query_ids = []
+    query_types = []
+    radius_queries = []
+    polygon_queries = []
+    for position, query in enumerate(queries):
+        try:
+            if not isinstance(query, dict):
+                raise ValueError('query must be an object')
+            query_id = str(query.get('id', position))
+            if query_id in query_ids:
+                raise ValueError('duplicate id')
+            query_type = query.get('type')
+            if query_type not in QUERY_TYPES:
+                raise ValueError(f'type must be one of {", ".join(QUERY_TYPES)}')
+
+            limit = int(query.get('limit', DEFAULT_QUERY_LIMIT))
+            if not 1 <= limit <= max_limit:
+                raise ValueError(f'limit must be 1-{max_limit}')
+
+            index = len(query_ids)
+            if query_type == 'radius':
+                latitude = float(query['lat'])
+                longitude = float(query['lng'])
+                radius_km = float(query.get('radius_km', 50))
+                if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+                    raise ValueError('invalid coordinates')
+                if radius_km <= 0 or radius_km > 500:
+                    raise ValueError('radius_km must be 0-500')
+                radius_queries.append((index, longitude, latitude, radius_km * 1000, limit))
+            else:
+                if query_type == 'polygon':
+                    # Same [lat, lng] vertex order as the in_polygon action
+                    polygon = Polygon([(lng, lat) for lat, lng in query['polygon']])
+                else:
+                    min_lng, min_lat, max_lng, max_lat = [float(value) for value in query['bbox']]
+                    if not (min_lng <= max_lng and min_lat <= max_lat):
+                        raise ValueError('invalid bbox')
+                    polygon = Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
+                if not polygon.valid:
+                    raise ValueError('invalid polygon')
+                polygon_queries.append((index, polygon.wkt, limit))
+            query_ids.append(query_id)
+            query_types.append(query_type)
+        except (KeyError, TypeError, ValueError, IndexError, GEOSException) as e:
+            raise ValueError(f'Query {position}: {e}')
+
+    return list(zip(query_ids, query_types)), radius_queries, polygon_queries
+
+
+def _columns(rows, count):
+    """Transpose query tuples into parallel arrays for unnest()"""
+    return [list(column) for column in zip(*rows)] if rows else [[] for _ in range(count)]
+
+
+def match_batch_queries(radius_queries, polygon_queries, queryset=None):
+    """
+    Run every query in one statement. Returns (query index, site id,
+    distance in metres or None) rows; radius matches are ordered by
+    distance and polygon matches by (event_date, id) within each query.
+    A filtered site `queryset` restricts the candidate sites.
+    """
+    sites = connection.ops.quote_name(HistoricalSite._meta.db_table)
+
+    restriction = ''
+    restriction_params = []
+    if queryset is not None:
+        subquery, restriction_params = queryset.order_by().values('id').query.sql_with_params()
+        restriction = f'AND s.id IN ({subquery})'
+        restriction_params = list(restriction_params)
+
+    sql = f"""
+        WITH radius_queries AS (
+            SELECT idx, ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography AS center, metres, max_rows
+            FROM unnest(%s::int[], %s::float8[], %s::float8[], %s::float8[], %s::int[])
+                 AS q(idx, lng, lat, metres, max_rows)
+        ),
+        polygon_queries AS (
+            SELECT idx, ST_GeomFromText(wkt, 4326) AS area, max_rows
+            FROM unnest(%s::int[], %s::text[], %s::int[]) AS q(idx, wkt, max_rows)
+        )
+        SELECT q.idx, m.id, m.distance_m, m.position
+        FROM radius_queries q
+        CROSS JOIN LATERAL (
+            SELECT s.id, ST_Distance(s.location::geography, q.center, false) AS distance_m,
+                   row_number() OVER (ORDER BY s.location::geography <-> q.center, s.id) AS position
+            FROM {sites} s
+            WHERE ST_DWithin(s.location::geography, q.center, q.metres, false)
+              {restriction}
+            ORDER BY s.location::geography <-> q.center, s.id
+            LIMIT q.max_rows
+        ) m
+        UNION ALL
+        SELECT q.idx, m.id, NULL, m.position
+        FROM polygon_queries q
+        CROSS JOIN LATERAL (
+            SELECT s.id, row_number() OVER (ORDER BY s.event_date, s.id) AS position
+            FROM {sites} s
+            WHERE ST_Within(s.location, q.area)
+              {restriction}
+            ORDER BY s.event_date, s.id
+            LIMIT q.max_rows
+        ) m
+        ORDER BY 1, 4
+    """
+    params = [
+        *_columns(radius_queries, 5),
+        *_columns(polygon_queries, 3),
+        *restriction_params,
+        *restriction_params,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(index, site_id, distance_m) for index, site_id, distance_m, _position in cursor.fetchall()]
+
+
+def run_batch_queries(queries, queryset=None):
+    """
+    Answer a list of radius/polygon/bbox queries. Results are keyed by query
+    id and list matching site ids (plus distances for radius queries); each
+    matched site's payload is included once in `sites`.
+    """
+    query_meta, radius_queries, polygon_queries = parse_batch_queries(queries)
+
+    results = {}
+    for query_id, query_type in query_meta:
+        results[query_id] = {'type': query_type, 'count': 0, 'site_ids': []}
+        if query_type == 'radius':
+            results[query_id]['distances_km'] = []
+
+    rows = match_batch_queries(radius_queries, polygon_queries, queryset)
+    for index, site_id, distance_m in rows:
+        result = results[query_meta[index][0]]
+        result['site_ids'].append(site_id)
+        if distance_m is not None:
+            result['distances_km'].append(round(distance_m / 1000, 3))
+    for result in results.values():
+        result['count'] = len(result['site_ids'])
+
+    site_ids = {site_id for _index, site_id, _distance in rows}
+    sites = {
+        str(site['id']): site
+        for site in site_list_values(HistoricalSite.objects.filter(id__in=site_ids).order_by())
+    } if site_ids else {}
+
+    return {'count': len(site_ids), 'results': results, 'sites': sites}
@@ -0,0 +1,195 @@
+"""
+API benchmark scenarios, reproducible synthetic datasets and result reports.
+
+Datasets are generated by the synthetic site generator from a fixed seed and
+grow in place, so moving from 1k to 100k sites only adds the difference.
+Every scenario is a request made through the Django test client and is
+measured for latency percentiles, query count, response size and peak
+Python memory.
+"""
+import json
+import time
+import tracemalloc
+
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .models import CountyBoundary, DatasetVersion, HistoricalSite
+from .simplification import simplify_county_boundaries
+from .spatial import rebuild_site_neighbours, subdivide_county_boundaries
+from .synthetic import generate_synthetic_sites
+from .versioning import bump_dataset_version
+
+
+# Bounding box of the island of Ireland used for synthetic data
+IRELAND_BBOX = (-10.7, 51.4, -5.4, 55.45)
+
+# Synthetic counties: a grid of rectangles covering IRELAND_BBOX
+COUNTY_GRID = (4, 6)
+
+
+def seed_counties():
+    """Create the synthetic county grid (used when no boundary file is given)"""
+    min_lng, min_lat, max_lng, max_lat = IRELAND_BBOX
+    columns, rows = COUNTY_GRID
+    width = (max_lng - min_lng) / columns
+    height = (max_lat - min_lat) / rows
+    counties = []
+    for column in range(columns):
+        for row in range(rows):
+            cell = Polygon.from_bbox((
+                min_lng + column * width, min_lat + row * height,
+                min_lng + (column + 1) * width, min_lat + (row + 1) * height,
+            ))
+            cell.srid = 4326
+            counties.append(CountyBoundary(
+                name=f'BENCHMARK {column * rows + row + 1}',
+                geometry=MultiPolygon(cell, srid=4326)
+            ))
+    CountyBoundary.objects.bulk_create(counties)
+    simplify_county_boundaries()
+    subdivide_county_boundaries()
+    bump_dataset_version(DatasetVersion.COUNTY_BOUNDARIES)
+
+
+def grow_sites(seed, size, workers=1):
+    """Generate synthetic sites until the table holds `size` sites"""
+    missing = size - HistoricalSite.objects.count()
+    if missing > 0:
+        generate_synthetic_sites(missing, seed, workers=workers)
+
+
+def refresh_derived_data(neighbour_table):
+    """Recompute the neighbour pairs and versions after seeding"""
+    if neighbour_table:
+        rebuild_site_neighbours()
+    bump_dataset_version(DatasetVersion.HISTORICAL_SITES)
+
+
+def build_scenarios():
+    """
+    Return (name, method, path, payload) for every site and county action,
+    using data from the seeded dataset (a central site and a county name).
+    """
+    center = HistoricalSite.objects.order_by('id').values('id', 'location').first()
+    county = CountyBoundary.objects.order_by('id').values_list('name', flat=True).first() or ''
+    lng, lat = (center['location'].x, center['location'].y) if center else (-8.0, 53.0)
+    site_id = center['id'] if center else 0
+    polygon = [
+        [lat - 0.2, lng - 0.3], [lat - 0.2, lng + 0.3],
+        [lat + 0.2, lng + 0.3], [lat + 0.2, lng - 0.3], [lat - 0.2, lng - 0.3],
+    ]
+    bbox = f'{lng - 1:.4f},{lat - 1:.4f},{lng + 1:.4f},{lat + 1:.4f}'
+
+    return [
+        ('list', 'get', '/api/sites/', None),
+        ('list_page', 'get', '/api/sites/?page_size=500', None),
+        ('list_geojson_stream', 'get', '/api/sites/?stream=geojson', None),
+        ('retrieve', 'get', f'/api/sites/{site_id}/', None),
+        ('nearby', 'get', f'/api/sites/nearby/?lat={lat}&lng={lng}&radius_km=10', None),
+        ('nearby_knn', 'get', f'/api/sites/nearby/?lat={lat}&lng={lng}&k=20', None),
+        ('timeline', 'get', '/api/sites/timeline/?start_date=1920-01-01&end_date=1921-12-31', None),
+        ('categories', 'get', '/api/sites/categories/', None),
+        ('facets', 'get', '/api/sites/facets/', None),
+        ('clusters', 'get', f'/api/sites/clusters/?bbox={bbox}&zoom=7', None),
+        ('search', 'get', '/api/sites/search/?q=ambush', None),
+        ('in_polygon', 'post', '/api/sites/in_polygon/', {'polygon': polygon}),
+        ('batch_query', 'post', '/api/sites/batch_query/', {'queries': [
+            {'id': str(i), 'type': 'radius', 'lat': lat + i * 0.01, 'lng': lng, 'radius_km': 5}
+            for i in range(50)
+        ]}),
+        ('buffer_zone', 'get', f'/api/sites/buffer_zone/?site_id={site_id}&buffer_km=10', None),
+        ('county_filter', 'get', f'/api/sites/?county={county}', None),
+        ('county_list', 'get', '/api/county-boundaries/', None),
+        ('county_geojson', 'get', '/api/county-boundaries/geojson/', None),
+        ('geojson_with_colors', 'get', '/api/county-boundaries/geojson_with_colors/?zoom=7', None),
+        ('autocomplete', 'get', '/api/autocomplete/?q=synth', None),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def _request(client, method, path, payload):
+    if method == 'post':
+        response = client.post(path, data=json.dumps(payload), content_type='application/json')
+    else:
+        response = client.get(path)
+    # Streaming responses are consumed so their full cost is measured
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    return response, body
+
+
+def run_scenario(client, method, path, payload, repeat):
+    """Time `repeat` requests after a cold one; memory is traced on a separate run"""
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response, body = _request(client, method, path, payload)
+        cold = time.perf_counter() - started
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _request(client, method, path, payload)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    # tracemalloc slows allocation down, so it is kept out of the timed runs
+    tracemalloc.start()
+    try:
+        _request(client, method, path, payload)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'cold_ms': round(cold * 1000, 3),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'queries': len(queries),
+        'response_bytes': len(body),
+        'peak_memory_bytes': peak,
+    }
+
+
+def run_benchmarks(repeat, only=None):
+    """Run every scenario (or those named in `only`) against the current data"""
+    client = Client()
+    results = {}
+    for name, method, path, payload in build_scenarios():
+        if only and name not in only:
+            continue
+        results[name] = run_scenario(client, method, path, payload, repeat)
+    return results
+
+
+def compare_reports(baseline, current, tolerance):
+    """
+    Compare two reports dataset by dataset. Returns (dataset size, scenario,
+    baseline p95, current p95, ratio) for every scenario whose p95 latency
+    grew by more than `tolerance` (e.g. 1.2 = 20%) or whose query count rose.
+    """
+    regressions = []
+    baseline_datasets = {dataset['sites']: dataset for dataset in baseline.get('datasets', [])}
+    for dataset in current.get('datasets', []):
+        before = baseline_datasets.get(dataset['sites'])
+        if before is None:
+            continue
+        for name, result in dataset['results'].items():
+            previous = before['results'].get(name)
+            if previous is None:
+                continue
+            ratio = result['p95_ms'] / previous['p95_ms'] if previous['p95_ms'] else 1.0
+            if ratio > tolerance or result['queries'] > previous['queries']:
+                regressions.append((dataset['sites'], name, previous, result, ratio))
+    return regressions
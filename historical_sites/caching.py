@@ -0,0 +1,278 @@
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .versioning import get_dataset_version
+
+try:
+    import brotli
+except ImportError:  # br variants are skipped without the optional brotli package
+    brotli = None
+
+
+# Content codings offered by precompressed responses, in order of preference
+PREFERRED_ENCODINGS = ('br', 'gzip')
+
+# Django cache shared by all worker processes (see CACHES in settings)
+SHARED_CACHE_ALIAS = 'responses'
+
+
+class LRUCache:
+    """Bounded per-process LRU store (encoded response bodies, cluster tiles)"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+response_cache = LRUCache(
+    max_entries=getattr(settings, 'RESPONSE_CACHE_MAX_ENTRIES', 64)
+)
+
+
+def dataset_versions(datasets):
+    """
+    Return ((name, token, version), ...) for a dataset name or tuple of
+    names; the per-database token keeps keys of different databases apart
+    in caches they share.
+    """
+    if isinstance(datasets, str):
+        datasets = (datasets,)
+    versions = []
+    for dataset in datasets:
+        version, _updated_at, token = get_dataset_version(dataset)
+        versions.append((dataset, token, version))
+    return tuple(versions)
+
+
+def compress_body(body, content_type):
+    """
+    Precompress a response body into the identity, gzip and (when the brotli
+    package is installed) br variants served by encoded_response().
+    """
+    bodies = {'identity': body}
+    if len(body) >= settings.RESPONSE_COMPRESS_MIN_BYTES:
+        if getattr(settings, 'RESPONSE_CACHE_GZIP', True):
+            bodies['gzip'] = gzip.compress(body, compresslevel=settings.RESPONSE_CACHE_GZIP_LEVEL)
+        if brotli is not None and getattr(settings, 'RESPONSE_CACHE_BROTLI', True):
+            bodies['br'] = brotli.compress(body, quality=settings.RESPONSE_CACHE_BROTLI_QUALITY)
+    return {
+        'content_type': content_type,
+        'digest': hashlib.sha256(body).hexdigest()[:32],
+        'bodies': bodies,
+    }
+
+
+def encode_json(data):
+    """Encode data once into cacheable identity and compressed variants"""
+    body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return compress_body(body, 'application/json')
+
+
+def negotiate_encoding(request, available):
+    """Pick the preferred encoding (br, then gzip) among `available` that the client accepts"""
+    accepted = {}
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = coding.strip().partition(';')
+        quality = 1.0
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in PREFERRED_ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return 'identity'
+
+
+def _shared_key(key):
+    return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+
+def get_cached_entry(key):
+    """Look an encoded entry up in this process, then in the cache shared by all workers"""
+    entry = response_cache.get(key)
+    if entry is None and SHARED_CACHE_ALIAS in settings.CACHES:
+        entry = caches[SHARED_CACHE_ALIAS].get(_shared_key(key))
+        if entry is not None:
+            response_cache.set(key, entry)
+    return entry
+
+
+def set_cached_entry(key, entry):
+    response_cache.set(key, entry)
+    if SHARED_CACHE_ALIAS in settings.CACHES:
+        caches[SHARED_CACHE_ALIAS].set(_shared_key(key), entry)
+
+
+def encoded_response(request, entry):
+    """HttpResponse with the precompressed variant of an entry the client prefers"""
+    encoding = negotiate_encoding(request, entry['bodies'])
+    response = HttpResponse(entry['bodies'][encoding], content_type=entry['content_type'])
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def cached_json_response(request, datasets, key, build):
+    """
+    Serve JSON built by `build()` from the encoded-bytes cache.
+
+    Entries are keyed by `key` plus the current versions of `datasets` (a name
+    or a tuple of names), so bumping a dataset version invalidates them in
+    every worker. Each encoding carries a strong ETag and matching
+    If-None-Match requests are answered with a 304.
+    """
+    cache_key = (dataset_versions(datasets), key)
+    entry = get_cached_entry(cache_key)
+    if entry is None:
+        entry = encode_json(build())
+        set_cached_entry(cache_key, entry)
+
+    encoding = negotiate_encoding(request, entry['bodies'])
+    etag = f'"{entry["digest"]}"' if encoding == 'identity' else f'"{entry["digest"]}-{encoding}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = encoded_response(request, entry)
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def cacheable_entry(response):
+    """
+    Precompressed entry for a rendered JSON/GeoJSON response, or None for
+    streamed, already encoded or other (e.g. browsable API HTML) responses.
+    """
+    if response.streaming or response.has_header('Content-Encoding'):
+        return None
+    content_type = response.get('Content-Type', '')
+    if not content_type.startswith(('application/json', 'application/geo+json')):
+        return None
+    return compress_body(response.content, content_type)
+
+
+def dataset_validators(request, datasets):
+    """
+    Conditional GET validators of a request against dataset versions: a weak
+    ETag over the versions (with their per-database tokens), the full path and the kind of renderer the Accept
+    header selects, and the latest dataset update as a Last-Modified
+    timestamp (or None).
+    """
+    if isinstance(datasets, str):
+        datasets = (datasets,)
+    versions = []
+    updated = []
+    for dataset in datasets:
+        version, updated_at, token = get_dataset_version(dataset)
+        versions.append((dataset, token, version))
+        if updated_at is not None:
+            updated.append(updated_at)
+
+    # Browsers navigating to the API get the browsable HTML renderer and
+    # FlatGeobuf clients a binary export
+    accept = request.META.get('HTTP_ACCEPT', '')
+    if 'application/flatgeobuf' in accept:
+        renderer = 'fgb'
+    elif 'text/html' in accept:
+        renderer = 'html'
+    else:
+        renderer = 'default'
+    key = repr((versions, request.get_full_path(), renderer))
+    etag = f'W/"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+    last_modified = int(max(updated).timestamp()) if updated else None
+    return etag, last_modified
+
+
+def patch_conditional_headers(response, etag, last_modified):
+    """Set validators plus browser revalidation and nginx micro-cache lifetimes"""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Browsers always revalidate (answered with a 304 when nothing changed);
+    # nginx keeps its own copy for API_MICRO_CACHE_SECONDS
+    response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    response['X-Accel-Expires'] = str(settings.API_MICRO_CACHE_SECONDS)
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering If-None-Match / If-Modified-Since with a 304
+    before any query or serialization runs. Validators come from the
+    `conditional_datasets` versions, which the loaders and model signals bump
+    on every change, so checking them costs a memoised version lookup.
+
+    Responses of `compressed_actions` are also stored precompressed (see
+    compress_body) under the same validators, i.e. URL plus dataset versions,
+    and later requests are served the variant their Accept-Encoding prefers.
+    Only URLs without other query parameters than `compressed_query_params`
+    qualify: filtered lists, cursor pages and date ranges are mostly one-off
+    URLs that would only churn the caches.
+    """
+    conditional_datasets = ()
+    compressed_actions = ()
+    compressed_query_params = ('format',)
+
+    def is_precompressed(self, request):
+        """Whether the response to this request is stored precompressed"""
+        return self.action_map.get(request.method.lower()) in self.compressed_actions and all(
+            name in self.compressed_query_params for name in request.GET
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not self.conditional_datasets:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = dataset_validators(request, self.conditional_datasets)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return patch_conditional_headers(response, etag, last_modified)
+
+        compressed = self.is_precompressed(request)
+        if compressed:
+            entry = get_cached_entry(('response', etag))
+            if entry is not None:
+                response = encoded_response(request, entry)
+                return patch_conditional_headers(response, etag, last_modified)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if compressed:
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            entry = cacheable_entry(response)
+            if entry is not None:
+                set_cached_entry(('response', etag), entry)
+                response = encoded_response(request, entry)
+        return patch_conditional_headers(response, etag, last_modified)
@@ -0,0 +1,105 @@
+import math
+
+from django.conf import settings
+from django.contrib.gis.geos import Polygon
+from django.db.models import Avg, Count
+from django.db.models.functions import Floor
+
+from .caching import LRUCache, dataset_versions
+from .functions import Latitude, Longitude
+from .models import DatasetVersion
+
+
+# Each degree tile (360 / 2^zoom degrees square) is split into GRID_SIZE x
+# GRID_SIZE cells; cells never straddle tiles, so tiles can be cached and
+# computed independently.
+GRID_SIZE = 8
+MAX_CLUSTER_ZOOM = 20
+
+cluster_cache = LRUCache(max_entries=getattr(settings, 'CLUSTER_CACHE_MAX_TILES', 2048))
+
+
+def tile_size(zoom):
+    """Size in degrees of a clustering tile at a zoom level"""
+    return 360.0 / (2 ** zoom)
+
+
+def tiles_for_bbox(bbox, zoom):
+    """Return the (x, y) tiles covering a (min_lng, min_lat, max_lng, max_lat) bbox"""
+    size = tile_size(zoom)
+    min_lng, min_lat, max_lng, max_lat = bbox
+    x_range = range(math.floor((min_lng + 180) / size), math.floor((max_lng + 180) / size) + 1)
+    y_range = range(math.floor((min_lat + 90) / size), math.floor((max_lat + 90) / size) + 1)
+    return [(x, y) for x in x_range for y in y_range]
+
+
+def _compute_tiles(queryset, zoom, tiles):
+    """Group the sites in a block of tiles into grid cells with one query"""
+    size = tile_size(zoom)
+    cell = size / GRID_SIZE
+    min_x = min(x for x, _y in tiles)
+    max_x = max(x for x, _y in tiles)
+    min_y = min(y for _x, y in tiles)
+    max_y = max(y for _x, y in tiles)
+    envelope = Polygon.from_bbox((
+        min_x * size - 180, min_y * size - 90,
+        (max_x + 1) * size - 180, (max_y + 1) * size - 90,
+    ))
+    envelope.srid = 4326
+
+    rows = queryset.order_by().filter(location__bboverlaps=envelope).annotate(
+        cell_x=Floor((Longitude('location') + 180) / cell),
+        cell_y=Floor((Latitude('location') + 90) / cell),
+    ).values('cell_x', 'cell_y', 'category').annotate(
+        site_count=Count('id'),
+        mean_lng=Avg(Longitude('location')),
+        mean_lat=Avg(Latitude('location')),
+    )
+
+    # Merge the per-category groups of each cell into one cluster
+    cells = {}
+    for row in rows:
+        key = (int(row['cell_x']), int(row['cell_y']))
+        cluster = cells.setdefault(key, {'count': 0, 'lng': 0.0, 'lat': 0.0, 'categories': {}})
+        cluster['count'] += row['site_count']
+        cluster['lng'] += row['mean_lng'] * row['site_count']
+        cluster['lat'] += row['mean_lat'] * row['site_count']
+        cluster['categories'][row['category']] = row['site_count']
+
+    results = {tile: [] for tile in tiles}
+    for (cell_x, cell_y), cluster in cells.items():
+        tile = (cell_x // GRID_SIZE, cell_y // GRID_SIZE)
+        if tile not in results:
+            continue
+        results[tile].append({
+            'latitude': round(cluster['lat'] / cluster['count'], 6),
+            'longitude': round(cluster['lng'] / cluster['count'], 6),
+            'count': cluster['count'],
+            'categories': cluster['categories'],
+        })
+    return results
+
+
+def get_clusters(queryset, zoom, bbox, filter_key=()):
+    """
+    Return the site clusters covering a bbox at a zoom level. Tiles are cached
+    per dataset version, zoom and filter; only missing tiles hit the database.
+    """
+    versions = dataset_versions(
+        (DatasetVersion.HISTORICAL_SITES, DatasetVersion.COUNTY_BOUNDARIES)
+    )
+    tiles = tiles_for_bbox(bbox, zoom)
+    clusters = []
+    missing = []
+    for tile in tiles:
+        cached = cluster_cache.get((versions, filter_key, zoom, tile))
+        if cached is None:
+            missing.append(tile)
+        else:
+            clusters.extend(cached)
+
+    if missing:
+        for tile, tile_clusters in _compute_tiles(queryset, zoom, missing).items():
+            cluster_cache.set((versions, filter_key, zoom, tile), tile_clusters)
+            clusters.extend(tile_clusters)
+    return clusters
@@ -0,0 +1,194 @@
+"""
+Binary FlatGeobuf exports of the site and county datasets (?format=fgb or
+Accept: application/flatgeobuf).
+
+Unfiltered exports are written once per dataset version into
+EXPORT_CACHE_DIR and reused by every worker; older versions are deleted
+once the new one has been in place for EXPORT_CACHE_GRACE_SECONDS. With EXPORT_ACCEL_REDIRECT_URL set, nginx serves
+the cached files itself (X-Accel-Redirect), including the HTTP range
+requests FlatGeobuf clients make to read only the index and the features of
+a bounding box.
+"""
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.gis.db.models import GeometryField
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from . import flatgeobuf
+from .caching import dataset_versions
+from .renderers import FlatGeobufRenderer
+from .serializers import with_coordinates
+from .streaming import CURSOR_CHUNK_SIZE, FEATURE_PROPERTIES
+
+
+# Map colours of the county overlay, assigned in query order
+COUNTY_COLORS = [
+    '#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8',
+    '#F7DC6F', '#BB8FCE', '#85C1E2', '#F8B88B', '#A3E4D7',
+    '#F1948A', '#85C1E2', '#F7DC6F', '#D7BDE2', '#A9DFBF',
+    '#F8B88B', '#AED6F1', '#F1948A', '#D5A6BD', '#FAD7A0',
+    '#85C1E2', '#F7DC6F', '#BB8FCE', '#A9CCE3', '#F8B88B',
+    '#F1948A', '#AED6F1'
+]
+
+# Columns match the GeoJSON feature id and properties
+SITE_COLUMNS = [
+    ('id', flatgeobuf.LONG),
+    ('name', flatgeobuf.STRING),
+    ('event_date', flatgeobuf.DATETIME),
+    ('location_name', flatgeobuf.STRING),
+    ('category', flatgeobuf.STRING),
+    ('event_type', flatgeobuf.STRING),
+    ('significance', flatgeobuf.STRING),
+    ('casualties', flatgeobuf.INT),
+]
+COUNTY_COLUMNS = [
+    ('id', flatgeobuf.LONG),
+    ('name', flatgeobuf.STRING),
+    ('color', flatgeobuf.STRING),
+]
+
+
+def site_features(queryset):
+    """FlatGeobuf point features of a site queryset, read from a server-side cursor"""
+    rows = with_coordinates(queryset).values_list(
+        'longitude', 'latitude', 'id', *FEATURE_PROPERTIES
+    )
+    for longitude, latitude, *values in rows.iterator(chunk_size=CURSOR_CHUNK_SIZE):
+        yield (longitude, latitude, longitude, latitude), [[(longitude, latitude)]], values
+
+
+def county_features(queryset, geometry_field):
+    """FlatGeobuf multipolygon features of counties at a simplification level"""
+    geometry = geometry_field
+    if geometry_field != 'geometry':
+        # Fall back to the full geometry for counties without a simplified level
+        geometry = Coalesce(geometry_field, 'geometry', output_field=GeometryField(srid=4326))
+    counties = queryset.only('id', 'name').annotate(export_geometry=geometry)
+
+    for idx, county in enumerate(counties.iterator()):
+        shape = county.export_geometry
+        if shape.geom_type == 'Polygon':
+            polygons = [shape]
+        else:
+            polygons = [part for part in shape if part.geom_type == 'Polygon']
+        parts = [[ring.coords for ring in polygon] for polygon in polygons]
+        min_x, min_y, max_x, max_y = shape.extent
+        color = COUNTY_COLORS[idx % len(COUNTY_COLORS)]
+        yield (min_x, min_y, max_x, max_y), parts, (county.id, county.name, color)
+
+
+def write_sites(out, queryset):
+    flatgeobuf.write_flatgeobuf(
+        out, 'historical_sites', flatgeobuf.POINT, SITE_COLUMNS, site_features(queryset)
+    )
+
+
+def write_counties(out, queryset, geometry_field):
+    flatgeobuf.write_flatgeobuf(
+        out, 'county_boundaries', flatgeobuf.MULTIPOLYGON, COUNTY_COLUMNS,
+        county_features(queryset, geometry_field)
+    )
+
+
+def _digest(value):
+    return hashlib.sha256(repr(value).encode('utf-8')).hexdigest()
+
+
+def cached_export(name, datasets, write):
+    """
+    Path of the export `name` for the current versions of `datasets`,
+    written with `write(file)` when missing. Files are written under a
+    temporary name and renamed into place, so concurrent workers never read
+    a partial file. File names carry the per-database dataset tokens, so
+    databases sharing EXPORT_CACHE_DIR never serve or delete each other's
+    exports.
+    """
+    export_dir = Path(settings.EXPORT_CACHE_DIR)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    versions = dataset_versions(datasets)
+    prefix = f'{name}-{_digest(tuple(token for _dataset, token, _version in versions))[:8]}-'
+    path = export_dir / f'{prefix}{_digest(versions)[:16]}.fgb'
+    if not path.exists():
+        with tempfile.NamedTemporaryFile(dir=export_dir, prefix=f'.{name}-', delete=False) as out:
+            try:
+                write(out)
+            except BaseException:
+                os.unlink(out.name)
+                raise
+        os.replace(out.name, path)
+
+    remove_stale_exports(export_dir, prefix, path)
+    return path
+
+
+def remove_stale_exports(export_dir, prefix, current):
+    """
+    Delete this database's exports of older dataset versions once `current`
+    is EXPORT_CACHE_GRACE_SECONDS old. Until then workers with older
+    memoised versions, and nginx behind an X-Accel-Redirect already sent,
+    may still serve them.
+    """
+    try:
+        age = time.time() - current.stat().st_mtime
+    except FileNotFoundError:
+        return
+    if age < settings.EXPORT_CACHE_GRACE_SECONDS:
+        return
+    for stale in export_dir.glob(f'{prefix}*.fgb'):
+        if stale != current:
+            stale.unlink(missing_ok=True)
+
+
+def export_file_response(path):
+    """Serve a cached export, through nginx when EXPORT_ACCEL_REDIRECT_URL is set"""
+    if settings.EXPORT_ACCEL_REDIRECT_URL:
+        response = HttpResponse(content_type=FlatGeobufRenderer.media_type)
+        response['X-Accel-Redirect'] = settings.EXPORT_ACCEL_REDIRECT_URL.rstrip('/') + '/' + path.name
+        return response
+    return FileResponse(open(path, 'rb'), content_type=FlatGeobufRenderer.media_type)
+
+
+def uncached_export_response(write):
+    """Serve an export (e.g. of a filtered queryset) written to a temporary file"""
+    out = tempfile.TemporaryFile()
+    try:
+        write(out)
+    except BaseException:
+        out.close()
+        raise
+    out.seek(0)
+    return FileResponse(out, content_type=FlatGeobufRenderer.media_type)
+
+
+class FlatGeobufMixin:
+    """
+    ViewSet mixin offering FlatGeobuf (?format=fgb, Accept:
+    application/flatgeobuf) on the `flatgeobuf_actions` only. Error responses
+    of those actions stay JSON.
+    """
+    flatgeobuf_actions = ()
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if getattr(self, 'action', None) in self.flatgeobuf_actions:
+            renderers.append(FlatGeobufRenderer())
+        return renderers
+
+    def wants_flatgeobuf(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return isinstance(renderer, FlatGeobufRenderer)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if isinstance(response, Response) and response.status_code >= 400 and self.wants_flatgeobuf():
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
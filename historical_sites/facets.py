@@ -0,0 +1,77 @@
+from django.db import connection
+from django.db.models import F
+from django.db.models.functions import ExtractYear, TruncMonth
+
+from .models import HistoricalSite
+
+
+# GROUPING() bitmask of (category, event_type, county, year, month): a bit is
+# set for every column that is aggregated away in that grouping set
+FACET_GROUPINGS = {
+    0b01111: 'category',
+    0b10111: 'event_type',
+    0b11011: 'county',
+    0b11101: 'year',
+    0b11110: 'month',
+    0b11111: 'total',
+}
+
+
+def compute_facets(queryset):
+    """
+    Count a filtered site queryset by category, event type, county, year and
+    month with a single GROUPING SETS query.
+    """
+    inner = queryset.order_by().annotate(
+        county_name=F('county__name'),
+        year=ExtractYear('event_date'),
+        month=TruncMonth('event_date'),
+    ).values('category', 'event_type', 'county_id', 'county_name', 'year', 'month')
+    inner_sql, params = inner.query.sql_with_params()
+
+    sql = f"""
+        SELECT GROUPING(category, event_type, county_id, year, month) AS grouping_id,
+               category, event_type, county_id, county_name, year, month,
+               COUNT(*) AS site_count
+        FROM ({inner_sql}) AS filtered_sites
+        GROUP BY GROUPING SETS (
+            (category), (event_type), (county_id, county_name), (year), (month), ()
+        )
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    category_labels = dict(HistoricalSite.CATEGORY_CHOICES)
+    facets = {'total': 0, 'category': [], 'event_type': [], 'county': [], 'year': [], 'month': []}
+    for grouping_id, category, event_type, county_id, county_name, year, month, count in rows:
+        facet = FACET_GROUPINGS.get(grouping_id)
+        if facet == 'total':
+            facets['total'] = count
+        elif facet == 'category':
+            facets['category'].append({
+                'value': category,
+                'label': category_labels.get(category, category),
+                'count': count,
+            })
+        elif facet == 'event_type':
+            facets['event_type'].append({'value': event_type, 'count': count})
+        elif facet == 'county':
+            # Sites outside every county boundary are reported with id None
+            facets['county'].append({'id': county_id, 'name': county_name, 'count': count})
+        elif facet == 'year':
+            facets['year'].append({'year': int(year), 'count': count})
+        elif facet == 'month':
+            facets['month'].append({'month': month.strftime('%Y-%m'), 'count': count})
+
+    # Categories keep their declared order, counts are listed largest first and
+    # histograms chronologically
+    category_order = list(category_labels)
+    facets['category'].sort(key=lambda item: (
+        category_order.index(item['value']) if item['value'] in category_order else len(category_order)
+    ))
+    facets['event_type'].sort(key=lambda item: (-item['count'], item['value']))
+    facets['county'].sort(key=lambda item: (-item['count'], item['name'] or ''))
+    facets['year'].sort(key=lambda item: item['year'])
+    facets['month'].sort(key=lambda item: item['month'])
+    return facets
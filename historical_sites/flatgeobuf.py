@@ -0,0 +1,268 @@
+"""
+FlatGeobuf writer (https://flatgeobuf.org, format version 3).
+
+A file is the magic bytes, a size-prefixed FlatBuffers header, a packed
+Hilbert R-tree over the feature bounding boxes and the size-prefixed
+features in tree order. The index lets clients read only the features of a
+bounding box with HTTP range requests, and features decode without a JSON
+parse. Features are encoded one at a time into a temporary file, so only
+their bounding boxes, offsets and sizes are kept in memory while sorting.
+"""
+import mmap
+import struct
+import tempfile
+
+import flatbuffers
+import numpy as np
+
+
+MAGIC = b'fgb\x03fgb\x00'
+INDEX_NODE_SIZE = 16
+
+# GeometryType and ColumnType enums of the FlatGeobuf schema
+POINT = 1
+POLYGON = 3
+MULTIPOLYGON = 6
+
+INT = 5
+LONG = 7
+STRING = 11
+DATETIME = 13
+
+HILBERT_MAX = (1 << 16) - 1
+
+
+def _uint_vector(builder, values, dtype):
+    return builder.CreateNumpyVector(np.asarray(values, dtype=dtype))
+
+
+def _table_vector(builder, offsets):
+    builder.StartVector(4, len(offsets), 4)
+    for offset in reversed(offsets):
+        builder.PrependUOffsetTRelative(offset)
+    return builder.EndVector()
+
+
+def _encode_geometry(builder, geometry_type, parts):
+    """
+    Geometry table: a point is [(x, y)]; a polygon is a list of rings (each
+    an (n, 2) array); a multipolygon is a list of polygons stored as parts.
+    """
+    if geometry_type == MULTIPOLYGON:
+        offsets = [_encode_geometry(builder, POLYGON, polygon) for polygon in parts]
+        parts_vector = _table_vector(builder, offsets)
+        builder.StartObject(8)
+        builder.PrependUOffsetTRelativeSlot(7, parts_vector, 0)
+        builder.PrependUint8Slot(6, geometry_type, 0)
+        return builder.EndObject()
+
+    rings = [np.asarray(ring, dtype='<f8').reshape(-1, 2) for ring in parts]
+    xy = builder.CreateNumpyVector(np.concatenate(rings).ravel())
+    ends = None
+    if len(rings) > 1:
+        ends = _uint_vector(builder, np.cumsum([len(ring) for ring in rings]), '<u4')
+    builder.StartObject(8)
+    builder.PrependUOffsetTRelativeSlot(1, xy, 0)
+    if ends is not None:
+        builder.PrependUOffsetTRelativeSlot(0, ends, 0)
+    builder.PrependUint8Slot(6, geometry_type, 0)
+    return builder.EndObject()
+
+
+def encode_properties(columns, values):
+    """Property bytes: (uint16 column index, value) for every non-null value"""
+    encoded = bytearray()
+    for index, ((_name, column_type), value) in enumerate(zip(columns, values)):
+        if value is None:
+            continue
+        encoded += struct.pack('<H', index)
+        if column_type == INT:
+            encoded += struct.pack('<i', value)
+        elif column_type == LONG:
+            encoded += struct.pack('<q', value)
+        else:
+            text = (value.isoformat() if column_type == DATETIME else str(value)).encode('utf-8')
+            encoded += struct.pack('<I', len(text)) + text
+    return bytes(encoded)
+
+
+def encode_feature(geometry_type, parts, properties):
+    """Size-prefixed Feature table"""
+    builder = flatbuffers.Builder(256)
+    geometry = _encode_geometry(builder, geometry_type, parts)
+    properties_vector = builder.CreateByteVector(properties) if properties else None
+    builder.StartObject(3)
+    builder.PrependUOffsetTRelativeSlot(0, geometry, 0)
+    if properties_vector is not None:
+        builder.PrependUOffsetTRelativeSlot(1, properties_vector, 0)
+    builder.FinishSizePrefixed(builder.EndObject())
+    return builder.Output()
+
+
+def encode_header(name, geometry_type, columns, features_count, envelope, index_node_size):
+    """Size-prefixed Header table (EPSG:4326)"""
+    builder = flatbuffers.Builder(1024)
+    column_offsets = []
+    for column_name, column_type in columns:
+        column_name_offset = builder.CreateString(column_name)
+        builder.StartObject(11)
+        builder.PrependUOffsetTRelativeSlot(0, column_name_offset, 0)
+        builder.PrependUint8Slot(1, column_type, 0)
+        column_offsets.append(builder.EndObject())
+    columns_vector = _table_vector(builder, column_offsets)
+
+    org = builder.CreateString('EPSG')
+    builder.StartObject(6)
+    builder.PrependUOffsetTRelativeSlot(0, org, 0)
+    builder.PrependInt32Slot(1, 4326, 0)
+    crs = builder.EndObject()
+
+    name_offset = builder.CreateString(name)
+    envelope_vector = builder.CreateNumpyVector(np.asarray(envelope, dtype='<f8')) if envelope else None
+    builder.StartObject(14)
+    builder.PrependUOffsetTRelativeSlot(0, name_offset, 0)
+    if envelope_vector is not None:
+        builder.PrependUOffsetTRelativeSlot(1, envelope_vector, 0)
+    builder.PrependUint8Slot(2, geometry_type, 0)
+    builder.PrependUOffsetTRelativeSlot(7, columns_vector, 0)
+    builder.PrependUint64Slot(8, features_count, 0)
+    builder.PrependUint16Slot(9, index_node_size, INDEX_NODE_SIZE)
+    builder.PrependUOffsetTRelativeSlot(10, crs, 0)
+    builder.FinishSizePrefixed(builder.EndObject())
+    return builder.Output()
+
+
+def hilbert(x, y):
+    """Hilbert curve index of 16-bit integer coordinates (uint64 arrays)"""
+    a = x ^ y
+    b = 0xFFFF ^ a
+    c = 0xFFFF ^ (x | y)
+    d = x & (y ^ 0xFFFF)
+
+    A = a | (b >> 1)
+    B = (a >> 1) ^ a
+    C = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    D = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 2)) ^ (b & (b >> 2))
+    B = (a & (b >> 2)) ^ (b & ((a ^ b) >> 2))
+    C = C ^ ((a & (c >> 2)) ^ (b & (d >> 2)))
+    D = D ^ ((b & (c >> 2)) ^ ((a ^ b) & (d >> 2)))
+
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 4)) ^ (b & (b >> 4))
+    B = (a & (b >> 4)) ^ (b & ((a ^ b) >> 4))
+    C = C ^ ((a & (c >> 4)) ^ (b & (d >> 4)))
+    D = D ^ ((b & (c >> 4)) ^ ((a ^ b) & (d >> 4)))
+
+    a, b, c, d = A, B, C, D
+    C = C ^ ((a & (c >> 8)) ^ (b & (d >> 8)))
+    D = D ^ ((b & (c >> 8)) ^ ((a ^ b) & (d >> 8)))
+
+    a = C ^ (C >> 1)
+    b = D ^ (D >> 1)
+    i0 = x ^ y
+    i1 = b | (0xFFFF ^ (i0 | a))
+
+    def interleave(value):
+        value = (value | (value << 8)) & 0x00FF00FF
+        value = (value | (value << 4)) & 0x0F0F0F0F
+        value = (value | (value << 2)) & 0x33333333
+        return (value | (value << 1)) & 0x55555555
+
+    return ((interleave(i1) << 1) | interleave(i0)) & 0xFFFFFFFF
+
+
+def level_bounds(count, node_size):
+    """
+    (start, end) node ranges of each tree level, leaves first; the root is
+    node 0. Like the reference implementation, at least one level is built
+    above the leaves, so a single feature still gets a parent node.
+    """
+    level_sizes = [count]
+    while True:
+        level_sizes.append(-(-level_sizes[-1] // node_size))
+        if level_sizes[-1] == 1:
+            break
+    bounds = []
+    end = sum(level_sizes)
+    for size in level_sizes:
+        bounds.append((end - size, end))
+        end -= size
+    return bounds
+
+
+def packed_rtree(boxes, offsets, node_size):
+    """Serialise the packed R-tree over leaf boxes (in tree order) and feature byte offsets"""
+    bounds = level_bounds(len(boxes), node_size)
+    nodes = np.zeros((bounds[0][1], 4))
+    node_offsets = np.zeros(bounds[0][1], dtype=np.uint64)
+    start, end = bounds[0]
+    nodes[start:end] = boxes
+    node_offsets[start:end] = offsets
+
+    # Each parent covers up to node_size consecutive children and points at the first
+    for (start, end), (parent_start, _parent_end) in zip(bounds, bounds[1:]):
+        for parent, first in enumerate(range(start, end, node_size), parent_start):
+            children = nodes[first:min(first + node_size, end)]
+            nodes[parent] = (
+                children[:, 0].min(), children[:, 1].min(), children[:, 2].max(), children[:, 3].max()
+            )
+            node_offsets[parent] = first
+
+    records = np.zeros(len(nodes), dtype=[
+        ('min_x', '<f8'), ('min_y', '<f8'), ('max_x', '<f8'), ('max_y', '<f8'), ('offset', '<u8')
+    ])
+    records['min_x'], records['min_y'], records['max_x'], records['max_y'] = nodes.T
+    records['offset'] = node_offsets
+    return records.tobytes()
+
+
+def write_flatgeobuf(out, name, geometry_type, columns, features):
+    """
+    Write a FlatGeobuf file with a spatial index to the binary file `out`.
+    `columns` are (name, column type) pairs and `features` yields
+    (bbox, parts, values) with values in column order (None for null).
+    """
+    boxes = []
+    sizes = []
+    with tempfile.TemporaryFile() as spool:
+        for bbox, parts, values in features:
+            encoded = encode_feature(geometry_type, parts, encode_properties(columns, values))
+            spool.write(encoded)
+            boxes.append(bbox)
+            sizes.append(len(encoded))
+        spool.flush()
+
+        count = len(boxes)
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        sizes = np.asarray(sizes, dtype=np.uint64)
+        envelope = None
+        if count:
+            envelope = (boxes[:, 0].min(), boxes[:, 1].min(), boxes[:, 2].max(), boxes[:, 3].max())
+
+        out.write(MAGIC)
+        out.write(encode_header(
+            name, geometry_type, columns, count, envelope, INDEX_NODE_SIZE if count else 0
+        ))
+        if not count:
+            return
+
+        # Sort features along a Hilbert curve through their box centres
+        width = envelope[2] - envelope[0]
+        height = envelope[3] - envelope[1]
+        centre_x = (boxes[:, 0] + boxes[:, 2]) / 2 - envelope[0]
+        centre_y = (boxes[:, 1] + boxes[:, 3]) / 2 - envelope[1]
+        x = np.floor(HILBERT_MAX * centre_x / width) if width else np.zeros(count)
+        y = np.floor(HILBERT_MAX * centre_y / height) if height else np.zeros(count)
+        order = np.argsort(hilbert(x.astype(np.uint64), y.astype(np.uint64)), kind='stable')
+
+        spool_offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.uint64)
+        sorted_sizes = sizes[order]
+        feature_offsets = np.concatenate([[0], np.cumsum(sorted_sizes)[:-1]]).astype(np.uint64)
+        out.write(packed_rtree(boxes[order], feature_offsets, INDEX_NODE_SIZE))
+
+        with mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for start, size in zip(spool_offsets[order].tolist(), sorted_sizes.tolist()):
+                out.write(data[start:start + size])
@@ -0,0 +1,13 @@
+from django.db.models import FloatField, Func
+
+
+class Latitude(Func):
+    """Latitude (ST_Y) of a point geometry, computed in SQL"""
+    function = 'ST_Y'
+    output_field = FloatField()
+
+
+class Longitude(Func):
+    """Longitude (ST_X) of a point geometry, computed in SQL"""
+    function = 'ST_X'
+    output_field = FloatField()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from historical_sites.models import HistoricalSite
+from historical_sites.spatial import assign_site_counties
+
+
+class Command(BaseCommand):
+    """Django command to backfill the denormalised county of every historical site"""
+    
+    help = 'Assign each historical site to the county boundary containing it'
+    
+    def handle(self, *args, **options):
+        self.stdout.write("Assigning sites to counties...")
+        
+        updated_count = assign_site_counties()
+        unassigned_count = HistoricalSite.objects.filter(county__isnull=True).count()
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ County assignment complete!\n'
+            f'  Updated: {updated_count} sites\n'
+            f'  Outside all counties: {unassigned_count} sites'
+        ))
@@ -0,0 +1,198 @@
+import json
+import os
+import platform
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from historical_sites import benchmarks
+from historical_sites.models import CountyBoundary
+
+
+class Command(BaseCommand):
+    """Django command benchmarking every site and county API action on seeded datasets"""
+    
+    help = 'Benchmark the API against reproducible synthetic datasets of increasing size'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            default='1000',
+            help='Comma-separated dataset sizes in sites, e.g. 1000,100000,1000000'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Timed requests per scenario (after one cold request)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed of the synthetic sites'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes generating the synthetic sites'
+        )
+        parser.add_argument(
+            '--scenarios',
+            type=str,
+            default=None,
+            help='Comma-separated scenario names to run (default: all)'
+        )
+        parser.add_argument(
+            '--counties',
+            type=str,
+            default=None,
+            help='County boundary GeoJSON to load instead of the synthetic county grid'
+        )
+        parser.add_argument(
+            '--neighbour-table-max',
+            type=int,
+            default=20000,
+            help='Largest dataset for which the site neighbour table is built'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Write the JSON report to this file instead of stdout'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            default=None,
+            help='Baseline JSON report; fail when a scenario regresses'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=1.2,
+            help='Allowed p95 latency ratio against the baseline (default 1.2 = +20%%)'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the benchmark database between runs'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',')})
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers')
+        if not sizes or sizes[0] <= 0:
+            raise CommandError('--sizes must be positive')
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        only = set(options['scenarios'].split(',')) if options['scenarios'] else None
+        
+        # Run against a throwaway test database, never the configured one
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            with tempfile.TemporaryDirectory(prefix='benchmark-api-') as cache_dir:
+                with override_settings(**self.cache_settings(cache_dir)):
+                    report = self.run(sizes, only, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+        
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f'✓ Report written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+        
+        if options['compare']:
+            self.compare(report, options['compare'], options['tolerance'])
+    
+    def cache_settings(self, cache_dir):
+        """
+        Keep the response and export caches of the benchmark in a throwaway
+        directory, so synthetic responses never reach the production caches.
+        Exports are served by Django, as the test client has no nginx.
+        """
+        caches = dict(settings.CACHES)
+        if 'responses' in caches:
+            caches['responses'] = {**caches['responses'], 'LOCATION': os.path.join(cache_dir, 'responses')}
+        return {
+            'CACHES': caches,
+            'EXPORT_CACHE_DIR': os.path.join(cache_dir, 'exports'),
+            'EXPORT_ACCEL_REDIRECT_URL': '',
+        }
+    
+    def run(self, sizes, only, options):
+        started = time.perf_counter()
+        if options['counties']:
+            # Keep stdout for the JSON report
+            call_command(
+                'load_county_boundaries_from_geojson', options['counties'],
+                workers=options['workers'], stdout=self.stderr
+            )
+        else:
+            benchmarks.seed_counties()
+        self.stderr.write(f'  • Counties ready in {time.perf_counter() - started:.1f}s')
+        
+        datasets = []
+        for size in sizes:
+            started = time.perf_counter()
+            benchmarks.grow_sites(options['seed'], size, options['workers'])
+            # Beyond the threshold the neighbour rebuild (a KNN query per site)
+            # dominates seeding; buffer_zone then uses its live radius query instead
+            neighbour_table = size <= options['neighbour_table_max']
+            benchmarks.refresh_derived_data(neighbour_table)
+            seed_seconds = time.perf_counter() - started
+            self.stderr.write(f'  • Seeded {size} sites in {seed_seconds:.1f}s')
+            
+            neighbour_settings = {} if neighbour_table else {'SITE_NEIGHBOUR_MAX_KM': 0}
+            with override_settings(**neighbour_settings):
+                results = benchmarks.run_benchmarks(options['repeat'], only)
+            
+            for name, result in results.items():
+                self.stderr.write(
+                    f'    {name}: p50 {result["p50_ms"]:.1f} ms, p95 {result["p95_ms"]:.1f} ms, '
+                    f'{result["queries"]} queries, {result["response_bytes"]} bytes'
+                )
+            datasets.append({
+                'sites': size,
+                'counties': CountyBoundary.objects.count(),
+                'neighbour_table': neighbour_table,
+                'seed_seconds': round(seed_seconds, 3),
+                'results': results,
+            })
+        
+        return {
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'datasets': datasets,
+        }
+    
+    def compare(self, report, baseline_path, tolerance):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        
+        regressions = benchmarks.compare_reports(baseline, report, tolerance)
+        for size, name, previous, result, ratio in regressions:
+            self.stderr.write(self.style.ERROR(
+                f'✗ {name} @ {size} sites: p95 {previous["p95_ms"]:.1f} → {result["p95_ms"]:.1f} ms '
+                f'({ratio:.2f}x), queries {previous["queries"]} → {result["queries"]}'
+            ))
+        if regressions:
+            raise CommandError(f'{len(regressions)} scenario(s) regressed against {baseline_path}')
+        self.stderr.write(self.style.SUCCESS(f'✓ No regressions against {baseline_path}'))
@@ -0,0 +1,62 @@
+import json
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.utils.encoders import JSONEncoder
+from historical_sites.models import HistoricalSite
+from historical_sites.serializers import HistoricalSiteListSerializer, site_list_values
+
+
+class Command(BaseCommand):
+    """Django command comparing the serializer and SQL-coordinate list paths"""
+    
+    help = 'Benchmark HistoricalSiteListSerializer against the .values() list path'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of timed runs per path (best run is reported)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Only serialize the first N sites'
+        )
+    
+    def handle(self, *args, **options):
+        queryset = HistoricalSite.objects.order_by('event_date', 'id')
+        limit = options['limit']
+        
+        paths = {
+            'serializer': lambda: HistoricalSiteListSerializer(queryset[:limit], many=True).data,
+            'values': lambda: list(site_list_values(queryset)[:limit]),
+        }
+        
+        results = {}
+        encoded = {}
+        for name, run in paths.items():
+            timings = []
+            for _ in range(max(1, options['repeat'])):
+                start = time.perf_counter()
+                data = run()
+                timings.append(time.perf_counter() - start)
+            results[name] = (min(timings), len(data))
+            encoded[name] = json.dumps(data, cls=JSONEncoder)
+        
+        # Both paths must produce byte-identical JSON
+        if encoded['serializer'] != encoded['values']:
+            self.stdout.write(self.style.ERROR('✗ Output differs between list paths'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Output identical between list paths'))
+        
+        for name, (seconds, rows) in results.items():
+            per_row = seconds / rows * 1e6 if rows else 0
+            self.stdout.write(
+                f'  • {name}: {rows} rows in {seconds * 1000:.1f} ms ({per_row:.1f} µs/row)'
+            )
+        
+        if results['values'][0]:
+            speedup = results['serializer'][0] / results['values'][0]
+            self.stdout.write(self.style.SUCCESS(f'✓ Speed-up: {speedup:.1f}x'))
@@ -0,0 +1,115 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from historical_sites.models import DatasetVersion, HistoricalSite
+from historical_sites.spatial import invalidate_site_neighbours, rebuild_site_neighbours
+from historical_sites.synthetic import NAME_PREFIX, generate_synthetic_sites, load_sampling_model
+from historical_sites.versioning import bump_dataset_version
+
+
+class Command(BaseCommand):
+    """Django command generating synthetic sites inside the loaded county boundaries"""
+    
+    help = 'Generate reproducible synthetic historical sites for load tests and benchmarks'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            required=True,
+            help='Number of sites to generate'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed; the same seed and chunk size give the same sites'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes generating chunks in parallel'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50000,
+            help='Sites generated and written per chunk'
+        )
+        parser.add_argument(
+            '--urban-share',
+            type=float,
+            default=0.6,
+            help='Fraction of sites clustered around towns and real sites (0-1)'
+        )
+        parser.add_argument(
+            '--spread-km',
+            type=float,
+            default=5.0,
+            help='Standard deviation of the clusters around each centre'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated synthetic sites first'
+        )
+        parser.add_argument(
+            '--rebuild-neighbours',
+            action='store_true',
+            help='Rebuild the site neighbour table afterwards (a KNN query per site)'
+        )
+    
+    def handle(self, *args, **options):
+        count = options['count']
+        if count <= 0:
+            raise CommandError('--count must be positive')
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size must be positive')
+        if not 0 <= options['urban_share'] <= 1:
+            raise CommandError('--urban-share must be between 0 and 1')
+        
+        try:
+            model = load_sampling_model(options['urban_share'], options['spread_km'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            f'Sampling from {len(model.piece_counties)} county pieces, '
+            f'{len(model.centre_names)} cluster centres and {len(model.template_ordinals)} site templates'
+        )
+        
+        started = time.perf_counter()
+        
+        def progress(written):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'  • {written}/{count} sites ({written / elapsed:.0f} sites/s)')
+        
+        if options['clear']:
+            deleted, _ = HistoricalSite.objects.filter(name__startswith=NAME_PREFIX).delete()
+            self.stdout.write(f'  • Deleted {deleted} synthetic rows')
+        
+        # Each chunk is committed on its own: the worker pool is forked after
+        # closing the database connections, which can't happen mid-transaction
+        written = generate_synthetic_sites(
+            count,
+            options['seed'],
+            model=model,
+            chunk_size=options['chunk_size'],
+            workers=max(1, options['workers']),
+            progress=progress
+        )
+        
+        # Sites are written with their county, so no county reassignment is
+        # needed. The neighbour rebuild is opt-in at load-test volumes; without
+        # it the existing lists miss the new sites, so they are all marked
+        # incomplete and buffer_zone answers with its radius query
+        if options['rebuild_neighbours']:
+            self.stdout.write("Rebuilding site neighbours...")
+            self.stdout.write(f'  • Neighbour pairs: {rebuild_site_neighbours()}')
+        else:
+            self.stdout.write(f'  • Neighbour lists marked incomplete: {invalidate_site_neighbours()}')
+        bump_dataset_version(DatasetVersion.HISTORICAL_SITES)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Generated {written} synthetic sites in {time.perf_counter() - started:.1f}s'
+        ))
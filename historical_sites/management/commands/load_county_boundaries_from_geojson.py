@@ -1,8 +1,60 @@
 import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand
-from django.contrib.gis.geos import GEOSGeometry
-from historical_sites.models import CountyBoundary
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
+from django.db import connections, transaction
+from historical_sites.models import CountyBoundary, DatasetVersion
+from historical_sites.simplification import simplify_county_boundaries
+from historical_sites.spatial import assign_site_counties, subdivide_county_boundaries
+from historical_sites.versioning import bump_dataset_version
+
+
+def extract_county_name(props):
+    """Extract and normalize the county name from feature properties"""
+    county_name = (props.get('COUNTY') or props.get('county') or
+                   props.get('NAME') or props.get('name'))
+    return county_name.strip().upper() if county_name else None
+
+
+def prepare_feature(job):
+    """
+    Parse, reproject (EPSG:2157 -> EPSG:4326) and validate one feature.
+
+    Runs in a worker process, so it only takes and returns picklable values:
+    ('ok', idx, name, hexewkb, centroid, repaired) or ('error', idx, name, message).
+    """
+    idx, county_name, geom = job
+    try:
+        geometry = GEOSGeometry(json.dumps(geom))
+        geometry.srid = None
+        geometry.srid = 2157  # Irish Grid
+        geometry.transform(4326)  # Transform to WGS84
+    except Exception as e:
+        return ('error', idx, county_name, f'Failed to parse/transform geometry: {e}')
+
+    # Repair invalid rings, keeping only the polygonal parts of the result
+    repaired = False
+    if not geometry.valid:
+        geometry = geometry.make_valid()
+        repaired = True
+        if geometry.geom_type == 'GeometryCollection':
+            polygons = []
+            for part in geometry:
+                if part.geom_type == 'Polygon':
+                    polygons.append(part)
+                elif part.geom_type == 'MultiPolygon':
+                    polygons.extend(part)
+            geometry = MultiPolygon(polygons, srid=4326)
+        if geometry.empty or not geometry.valid:
+            return ('error', idx, county_name, 'Invalid geometry')
+
+    centroid = geometry.centroid
+    if not (-11 < centroid.x < -5 and 51 < centroid.y < 56):
+        return ('error', idx, county_name, f'Invalid location after transform: {centroid}')
+
+    return ('ok', idx, county_name, geometry.hexewkb, (centroid.x, centroid.y), repaired)
 
 
 class Command(BaseCommand):
@@ -10,6 +62,18 @@ class Command(BaseCommand):
     
     def add_arguments(self, parser):
         parser.add_argument('geojson_file', type=str, help='Path to GeoJSON file')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes used to parse, reproject and validate features'
+        )
+        parser.add_argument(
+            '--max-vertices',
+            type=int,
+            default=None,
+            help='Maximum vertices per subdivided lookup piece (COUNTY_PIECE_MAX_VERTICES)'
+        )
     
     def handle(self, *args, **options):
         geojson_file = options['geojson_file']
@@ -34,93 +98,103 @@ class Command(BaseCommand):
         
         # Track processing statistics
         processed_counties = set()
-        created_count = 0
-        updated_count = 0
         skipped_count = 0
         
+        # Names and duplicates are resolved in file order before the
+        # geometry work is farmed out
+        jobs = []
         for idx, feature in enumerate(features):
-            try:
-                props = feature.get('properties', {})
-                geom = feature.get('geometry')
-                
-                if not geom:
-                    skipped_count += 1
-                    continue
-                
-                # Extract and normalize county name
-                county_name = (props.get('COUNTY') or props.get('county') or 
-                              props.get('NAME') or props.get('name'))
-                
-                if not county_name:
-                    skipped_count += 1
-                    continue
-                
-                county_name = county_name.strip().upper()
-                
-                # Prevent duplicate processing
-                if county_name in processed_counties:
-                    self.stdout.write(self.style.WARNING(f'⊘ Duplicate in file: {county_name}'))
-                    skipped_count += 1
-                    continue
-                
-                processed_counties.add(county_name)
-                
-                # Handle coordinate transformation
-                geom_geojson = json.dumps(geom)
-                
-                try:
-                    geometry = GEOSGeometry(geom_geojson)
-                    geometry.srid = None
-                    geometry.srid = 2157  # Irish Grid
-                    geometry.transform(4326)  # Transform to WGS84
-                    
-                    self.stdout.write(self.style.SUCCESS(
-                        f'⚠ Transformed {county_name} from EPSG:2157 to EPSG:4326'
-                    ))
-                    
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(
-                        f'✗ Failed to parse/transform geometry for {county_name}: {str(e)}'
-                    ))
-                    skipped_count += 1
-                    continue
+            props = feature.get('properties') or {}
+            geom = feature.get('geometry')
+            county_name = extract_county_name(props)
+            
+            if not geom or not county_name:
+                skipped_count += 1
+                continue
+            
+            # Prevent duplicate processing
+            if county_name in processed_counties:
+                self.stdout.write(self.style.WARNING(f'⊘ Duplicate in file: {county_name}'))
+                skipped_count += 1
+                continue
+            
+            processed_counties.add(county_name)
+            jobs.append((idx, county_name, geom))
+        
+        # Parse, reproject and validate in parallel
+        workers = max(1, min(options['workers'], len(jobs) or 1))
+        started = time.perf_counter()
+        if workers > 1:
+            # Forked workers must not inherit open database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    prepare_feature, jobs, chunksize=max(1, len(jobs) // (workers * 4))
+                ))
+        else:
+            results = [prepare_feature(job) for job in jobs]
+        self.stdout.write(
+            f'  • Prepared {len(jobs)} geometries in {time.perf_counter() - started:.2f}s '
+            f'({workers} worker{"s" if workers > 1 else ""})'
+        )
+        
+        prepared = []
+        for status, idx, county_name, *result in results:
+            if status == 'error':
+                self.stdout.write(self.style.ERROR(f'✗ Feature {idx} ({county_name}): {result[0]}'))
+                skipped_count += 1
+                continue
+            hexewkb, centroid, repaired = result
+            if repaired:
+                self.stdout.write(self.style.WARNING(f'⚠ Repaired invalid geometry for {county_name}'))
+            prepared.append((county_name, GEOSGeometry(hexewkb), centroid))
+        
+        # Swap every boundary and its derived data in a single transaction, so
+        # readers see either the old or the new dataset
+        created_count = 0
+        updated_count = 0
+        if prepared:
+            started = time.perf_counter()
+            with transaction.atomic():
+                existing = {
+                    county.name: county
+                    for county in CountyBoundary.objects.filter(
+                        name__in=[name for name, _geometry, _centroid in prepared]
+                    ).only('id', 'name')
+                }
+                to_create = []
+                to_update = []
+                for county_name, geometry, (x, y) in prepared:
+                    county = existing.get(county_name)
+                    if county is None:
+                        to_create.append(CountyBoundary(name=county_name, geometry=geometry))
+                        self.stdout.write(self.style.SUCCESS(
+                            f'✓ Created: {county_name} (centroid: {x:.4f}, {y:.4f})'
+                        ))
+                    else:
+                        county.geometry = geometry
+                        to_update.append(county)
+                        self.stdout.write(self.style.HTTP_INFO(
+                            f'⟳ Updated: {county_name} (centroid: {x:.4f}, {y:.4f})'
+                        ))
                 
-                # Validate geometry and location
-                if not geometry.valid:
-                    self.stdout.write(self.style.ERROR(f'✗ Invalid geometry for {county_name}'))
-                    skipped_count += 1
-                    continue
+                CountyBoundary.objects.bulk_create(to_create, batch_size=500)
+                CountyBoundary.objects.bulk_update(to_update, ['geometry'], batch_size=500)
+                created_count = len(to_create)
+                updated_count = len(to_update)
                 
-                centroid = geometry.centroid
-                if not (-11 < centroid.x < -5 and 51 < centroid.y < 56):
-                    self.stdout.write(self.style.ERROR(
-                        f'✗ Invalid location after transform for {county_name}: {centroid}'
-                    ))
-                    skipped_count += 1
-                    continue
+                # Rebuild the simplified levels of detail for the whole coverage
+                simplified_count = simplify_county_boundaries()
                 
-                # Persist to database
-                county, is_created = CountyBoundary.objects.update_or_create(
-                    name=county_name,
-                    defaults={'geometry': geometry}
-                )
+                # Cut the boundaries into small pieces for point-in-county tests
+                piece_count = subdivide_county_boundaries(max_vertices=options['max_vertices'])
                 
-                if is_created:
-                    self.stdout.write(self.style.SUCCESS(
-                        f'✓ Created: {county_name} (centroid: {centroid.x:.4f}, {centroid.y:.4f})'
-                    ))
-                    created_count += 1
-                else:
-                    self.stdout.write(self.style.HTTP_INFO(
-                        f'⟳ Updated: {county_name} (centroid: {centroid.x:.4f}, {centroid.y:.4f})'
-                    ))
-                    updated_count += 1
+                # Re-run the site -> county spatial join against the new boundaries
+                assigned_count = assign_site_counties()
                 
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'✗ Error at feature {idx}: {str(e)}'))
-                import traceback
-                traceback.print_exc()
-                skipped_count += 1
+                # Invalidate cached boundary responses in every worker
+                version = bump_dataset_version(DatasetVersion.COUNTY_BOUNDARIES)
+            swap_seconds = time.perf_counter() - started
         
         # Output processing summary
         self.stdout.write("\n" + "="*60)
@@ -132,6 +206,15 @@ class Command(BaseCommand):
         self.stdout.write(f'  • Skipped: {skipped_count}')
         self.stdout.write("="*60)
         
+        if created_count + updated_count > 0:
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Simplified geometries rebuilt for {simplified_count} counties'
+            ))
+            self.stdout.write(f'  • Lookup pieces: {piece_count}')
+            self.stdout.write(f'  • Sites reassigned to counties: {assigned_count}')
+            self.stdout.write(f'  • Boundary dataset version: {version}')
+            self.stdout.write(f'  • Database swap: {swap_seconds:.2f}s')
+        
         # Verify sample results
         if created_count + updated_count > 0:
             self.stdout.write("\nVerification (first 3 counties):")
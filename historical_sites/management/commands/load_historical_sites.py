@@ -1,9 +1,104 @@
 import json
 import os
+import time
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.contrib.gis.geos import Point
-from historical_sites.models import HistoricalSite
+from django.db import transaction
+from historical_sites.models import DatasetVersion, HistoricalSite
+from historical_sites.spatial import (
+    assign_site_counties, invalidate_site_neighbours, rebuild_site_neighbours
+)
+from historical_sites.versioning import bump_dataset_version
+
+
+# Map historical period categories to database values
+CATEGORY_MAP = {
+    'Easter Rising': 'EASTER_RISING',
+    'War of Independence': 'WAR_INDEPENDENCE',
+    'Treaty Period': 'TREATY',
+    'Civil War': 'CIVIL_WAR',
+    'Civil War End': 'AFTERMATH',
+    'Aftermath': 'AFTERMATH',
+}
+
+# Fields overwritten when a site with the same name already exists
+UPSERT_FIELDS = [
+    'event_date', 'location_name', 'location', 'significance',
+    'category', 'event_type', 'updated_at'
+]
+
+
+def iter_json_records(json_file, read_size=1 << 16):
+    """
+    Stream records from a JSON array file (or newline-delimited JSON when the
+    file ends in .ndjson/.jsonl) without loading the whole document.
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        if json_file.endswith(('.ndjson', '.jsonl')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        
+        decoder = json.JSONDecoder()
+        buffer = ''
+        position = 0
+        started = False
+        eof = False
+        while True:
+            # Skip whitespace, the opening bracket and separators
+            while position < len(buffer) and buffer[position] in ' \t\r\n,[':
+                if buffer[position] == '[':
+                    started = True
+                position += 1
+            if position < len(buffer) and buffer[position] == ']' and started:
+                return
+            
+            try:
+                if position >= len(buffer):
+                    raise json.JSONDecodeError('Need more data', buffer, position)
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(read_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                if eof and not buffer.strip():
+                    return
+                continue
+            
+            if not started:
+                raise json.JSONDecodeError('Expected a JSON array', buffer, position)
+            yield record
+            position = end
+
+
+def parse_site_record(site_data):
+    """Validate a raw JSON record and return HistoricalSite field values"""
+    try:
+        longitude = float(site_data['longitude'])
+        latitude = float(site_data['latitude'])
+        values = {
+            'name': str(site_data['event']).strip(),
+            'event_date': datetime.strptime(site_data['date'], '%Y-%m-%d').date(),
+            'location_name': site_data['location'],
+            'location': Point(longitude, latitude, srid=4326),
+            'significance': site_data['significance'],
+            'category': CATEGORY_MAP.get(site_data['category'], 'CIVIL_WAR'),
+            'event_type': site_data['type'],
+        }
+    except (KeyError, TypeError) as e:
+        raise ValueError(f'missing or invalid field {e}')
+    
+    if not values['name']:
+        raise ValueError('empty event name')
+    if not (-180 <= longitude <= 180 and -90 <= latitude <= 90):
+        raise ValueError(f'coordinates out of range ({longitude}, {latitude})')
+    return values
+
 
 class Command(BaseCommand):
     """Django command to load historical sites from JSON file"""
@@ -19,6 +114,22 @@ class Command(BaseCommand):
             default='irish_civil_war_sites.json',
             help='Path to JSON file containing site data'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Stream the file and upsert validated batches with INSERT ... ON CONFLICT'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Records per validated batch in --bulk mode'
+        )
+        parser.add_argument(
+            '--skip-neighbours',
+            action='store_true',
+            help='Do not refresh the proximity graph after a --bulk load (nearby lists are marked incomplete instead)'
+        )
     
     def handle(self, *args, **options):
         json_file = options['json_file']
@@ -29,6 +140,9 @@ class Command(BaseCommand):
             )
             return
         
+        if options['bulk']:
+            return self.handle_bulk(json_file, options)
+        
         try:
             with open(json_file, 'r', encoding='utf-8') as f:
                 sites_data = json.load(f)
@@ -43,16 +157,7 @@ class Command(BaseCommand):
                 # Create geographic point from coordinates
                 location = Point(site_data['longitude'], site_data['latitude'])
                 
-                # Map historical period categories to database values
-                category_map = {
-                    'Easter Rising': 'EASTER_RISING',
-                    'War of Independence': 'WAR_INDEPENDENCE',
-                    'Treaty Period': 'TREATY',
-                    'Civil War': 'CIVIL_WAR',
-                    'Civil War End': 'AFTERMATH',
-                    'Aftermath': 'AFTERMATH',
-                }
-                category = category_map.get(site_data['category'], 'CIVIL_WAR')
+                category = CATEGORY_MAP.get(site_data['category'], 'CIVIL_WAR')
                 
                 # Create or update site in database
                 site, created = HistoricalSite.objects.update_or_create(
@@ -96,4 +201,104 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error loading data: {e}')
-            )
\ No newline at end of file
+            )
+    
+    def handle_bulk(self, json_file, options):
+        """Stream, validate and upsert sites in batches, reporting throughput"""
+        batch_size = max(1, options['batch_size'])
+        batch = []
+        batch_number = 0
+        loaded_ids = []
+        invalid_count = 0
+        started = time.perf_counter()
+        
+        try:
+            for index, site_data in enumerate(iter_json_records(json_file)):
+                try:
+                    batch.append(parse_site_record(site_data))
+                except ValueError as e:
+                    invalid_count += 1
+                    self.stdout.write(self.style.WARNING(f'⊘ Invalid record {index}: {e}'))
+                    continue
+                
+                if len(batch) >= batch_size:
+                    batch_number += 1
+                    loaded_ids += self.write_batch(batch, batch_number)
+                    batch = []
+            
+            if batch:
+                batch_number += 1
+                loaded_ids += self.write_batch(batch, batch_number)
+        
+        except json.JSONDecodeError as e:
+            self.stdout.write(
+                self.style.ERROR(f'Invalid JSON format: {e}')
+            )
+            return
+        
+        loaded_count = len(loaded_ids)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✓ Bulk load complete!\n'
+                f'  Upserted: {loaded_count} sites in {batch_number} batches\n'
+                f'  Invalid: {invalid_count} records\n'
+                f'  Throughput: {loaded_count / elapsed if elapsed else 0:.0f} sites/s'
+            )
+        )
+        
+        if not loaded_count:
+            return
+        
+        # bulk_create bypasses the post_save signals, so refresh the
+        # denormalised spatial data of the upserted sites (in batches, keeping
+        # the id arrays small) and invalidate caches once at the end
+        self.stdout.write("Refreshing county assignments...")
+        reassigned_count = 0
+        pair_count = 0
+        invalidated_count = 0
+        for start in range(0, loaded_count, batch_size):
+            site_ids = loaded_ids[start:start + batch_size]
+            reassigned_count += assign_site_counties(site_ids)
+            if options['skip_neighbours']:
+                # Lists near the upserted sites may now miss them; mark them
+                # incomplete so buffer_zone falls back to its radius query
+                invalidated_count += invalidate_site_neighbours(site_ids)
+            else:
+                pair_count += rebuild_site_neighbours(site_ids)
+        self.stdout.write(f'  • Sites reassigned: {reassigned_count}')
+        if options['skip_neighbours']:
+            self.stdout.write(f'  • Neighbour lists marked incomplete: {invalidated_count}')
+        else:
+            self.stdout.write(f'  • Neighbour pairs: {pair_count}')
+        bump_dataset_version(DatasetVersion.HISTORICAL_SITES)
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Total: {HistoricalSite.objects.count()} sites in database')
+        )
+    
+    def write_batch(self, batch, batch_number):
+        """Upsert one validated batch with a single INSERT ... ON CONFLICT; returns the site ids"""
+        started = time.perf_counter()
+        
+        # A row may only be upserted once per statement; the last record wins
+        unique = {values['name']: values for values in batch}
+        sites = [HistoricalSite(**values) for values in unique.values()]
+        
+        with transaction.atomic():
+            HistoricalSite.objects.bulk_create(
+                sites,
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=UPSERT_FIELDS
+            )
+            # Upserted rows don't get their pk back, so look the ids up by name
+            site_ids = list(
+                HistoricalSite.objects.filter(name__in=unique).values_list('id', flat=True)
+            )
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'  • Batch {batch_number}: {len(sites)} sites in {elapsed:.2f}s '
+            f'({len(sites) / elapsed if elapsed else 0:.0f} sites/s)'
+        )
+        return site_ids
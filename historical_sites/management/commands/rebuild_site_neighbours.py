@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from historical_sites.spatial import rebuild_site_neighbours
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the precomputed site proximity graph"""
+    
+    help = 'Rebuild neighbour pairs for all sites within SITE_NEIGHBOUR_MAX_KM'
+    
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Rebuilding site neighbours within {settings.SITE_NEIGHBOUR_MAX_KM} km..."
+        )
+        
+        pair_count = rebuild_site_neighbours()
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Site neighbours rebuilt: {pair_count} pairs'
+        ))
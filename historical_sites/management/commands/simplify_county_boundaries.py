@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from historical_sites.models import CountyBoundary, DatasetVersion
+from historical_sites.simplification import simplify_county_boundaries
+from historical_sites.versioning import bump_dataset_version
+
+
+class Command(BaseCommand):
+    """Django command to precompute simplified county geometries for each zoom level"""
+    
+    help = 'Rebuild the topology-preserving simplified county boundary geometries'
+    
+    def handle(self, *args, **options):
+        self.stdout.write("Simplifying county boundaries...")
+        
+        simplified_count = simplify_county_boundaries()
+        if not simplified_count:
+            self.stdout.write(self.style.WARNING('⊘ No county boundaries loaded'))
+            return
+        
+        # Report vertex counts per level so the reduction is visible
+        counties = CountyBoundary.objects.all()
+        full_vertices = sum(county.geometry.num_coords for county in counties)
+        self.stdout.write(f'  • full: {full_vertices} vertices')
+        for field, tolerance, max_zoom in CountyBoundary.SIMPLIFICATION_LEVELS:
+            vertices = sum(
+                getattr(county, field).num_coords
+                for county in counties if getattr(county, field)
+            )
+            self.stdout.write(
+                f'  • {field} (tolerance {tolerance}°, zoom ≤ {max_zoom}): {vertices} vertices'
+            )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Simplified geometries rebuilt for {simplified_count} counties'
+        ))
+        
+        version = bump_dataset_version(DatasetVersion.COUNTY_BOUNDARIES)
+        self.stdout.write(f'  • Boundary dataset version: {version}')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from historical_sites.models import CountyBoundary
+from historical_sites.spatial import subdivide_county_boundaries
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the subdivided county pieces used for point-in-county tests"""
+    
+    help = 'Split county boundaries into ST_Subdivide pieces with a bounded vertex count'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-vertices',
+            type=int,
+            default=None,
+            help='Maximum vertices per piece (defaults to COUNTY_PIECE_MAX_VERTICES)'
+        )
+    
+    def handle(self, *args, **options):
+        self.stdout.write("Subdividing county boundaries...")
+        
+        county_count = CountyBoundary.objects.count()
+        if not county_count:
+            self.stdout.write(self.style.WARNING('⊘ No county boundaries loaded'))
+            return
+        
+        piece_count = subdivide_county_boundaries(max_vertices=options['max_vertices'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {county_count} counties split into {piece_count} pieces'
+        ))
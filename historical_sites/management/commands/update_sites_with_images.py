@@ -1,7 +1,25 @@
+import hashlib
 import json
 import os
+from collections import Counter, defaultdict
 from django.core.management.base import BaseCommand
-from historical_sites.models import HistoricalSite
+from django.db import transaction
+from django.utils import timezone
+from historical_sites.models import DatasetVersion, HistoricalSite
+from historical_sites.versioning import bump_dataset_version
+
+
+# Fields synchronised from the media JSON file
+MEDIA_FIELDS = ('description', 'images')
+
+
+def media_hash(values):
+    """Stable content hash of a site's media fields"""
+    payload = json.dumps(
+        [values.get(field) for field in MEDIA_FIELDS],
+        sort_keys=True, ensure_ascii=False, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 
 class Command(BaseCommand):
@@ -18,9 +36,15 @@ class Command(BaseCommand):
             default='sites_images_descriptions.json',
             help='Path to JSON file containing image and description data'
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the changes that would be made without writing them'
+        )
     
     def handle(self, *args, **options):
         json_file = options['json_file']
+        dry_run = options['dry_run']
         
         # Validate file exists
         if not os.path.exists(json_file):
@@ -33,57 +57,108 @@ class Command(BaseCommand):
             # Load and process JSON data
             with open(json_file, 'r', encoding='utf-8') as f:
                 updates_data = json.load(f)
-            
-            updated_count = 0
-            not_found_count = 0
-            
-            # Update each site from JSON data
-            for update_item in updates_data:
-                site_name = update_item.get('name')
-                description = update_item.get('description')
-                images = update_item.get('images', [])
+        except json.JSONDecodeError as e:
+            self.stdout.write(
+                self.style.ERROR(f'✗ Invalid JSON format: {e}')
+            )
+            return
+        
+        try:
+            with transaction.atomic():
+                # One query builds a casefolded name -> site index with the
+                # current media fields, replacing a name__iexact lookup per item
+                sites_by_name = defaultdict(list)
+                for site in HistoricalSite.objects.only('id', 'name', *MEDIA_FIELDS):
+                    sites_by_name[site.name.casefold()].append(site)
                 
-                try:
-                    # Find and update matching site
-                    site = HistoricalSite.objects.get(name__iexact=site_name)
+                changed_sites = {}
+                field_changes = Counter()
+                unchanged_count = 0
+                not_found_count = 0
+                ambiguous_count = 0
+                
+                for update_item in updates_data:
+                    site_name = update_item.get('name') or ''
+                    matches = sites_by_name.get(site_name.casefold(), [])
                     
-                    if description:
-                        site.description = description
+                    if not matches:
+                        self.stdout.write(
+                            self.style.WARNING(f'⊘ Site not found: {site_name}')
+                        )
+                        not_found_count += 1
+                        continue
+                    if len(matches) > 1:
+                        self.stdout.write(
+                            self.style.WARNING(f'⊘ Ambiguous site name: {site_name}')
+                        )
+                        ambiguous_count += 1
+                        continue
                     
-                    if images:
-                        site.images = images
+                    site = matches[0]
+                    # Empty values in the file leave the stored value untouched
+                    incoming = {
+                        field: update_item.get(field) or getattr(site, field)
+                        for field in MEDIA_FIELDS
+                    }
+                    current = {field: getattr(site, field) for field in MEDIA_FIELDS}
                     
-                    site.save()
+                    # Skip rows whose content is unchanged
+                    if media_hash(incoming) == media_hash(current):
+                        unchanged_count += 1
+                        continue
                     
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'✓ Updated: {site.name}'
-                        )
+                    changed = tuple(
+                        field for field in MEDIA_FIELDS if incoming[field] != current[field]
                     )
-                    updated_count += 1
+                    for field in changed:
+                        setattr(site, field, incoming[field])
+                    # A site listed more than once keeps the fields changed by every entry
+                    previous = changed_sites[site.pk][1] if site.pk in changed_sites else ()
+                    changed_sites[site.pk] = (site, tuple(
+                        field for field in MEDIA_FIELDS if field in changed or field in previous
+                    ))
+                    field_changes.update(set(changed) - set(previous))
                     
-                except HistoricalSite.DoesNotExist:
                     self.stdout.write(
-                        self.style.WARNING(
-                            f'⊘ Site not found: {site_name}'
+                        self.style.SUCCESS(
+                            f'{"~ Would update" if dry_run else "✓ Updated"}: '
+                            f'{site.name} ({", ".join(changed)})'
                         )
                     )
-                    not_found_count += 1
+                
+                if changed_sites and not dry_run:
+                    self.write_changes(changed_sites.values())
+                    bump_dataset_version(DatasetVersion.HISTORICAL_SITES)
             
             # Display summary statistics
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'\n✓ Update complete!\n'
-                    f'  Updated: {updated_count} sites\n'
-                    f'  Not found: {not_found_count} sites'
+                    f'\n✓ {"Dry run" if dry_run else "Update"} complete!\n'
+                    f'  {"Would update" if dry_run else "Updated"}: {len(changed_sites)} sites\n'
+                    + ''.join(
+                        f'    • {field}: {field_changes[field]}\n' for field in MEDIA_FIELDS
+                    ) +
+                    f'  Unchanged: {unchanged_count} sites\n'
+                    f'  Not found: {not_found_count} sites\n'
+                    f'  Ambiguous: {ambiguous_count} sites'
                 )
             )
         
-        except json.JSONDecodeError as e:
-            self.stdout.write(
-                self.style.ERROR(f'✗ Invalid JSON format: {e}')
-            )
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'✗ Error updating data: {e}')
             )
+    
+    def write_changes(self, changed_sites):
+        """bulk_update each group of sites that share the same set of changed fields"""
+        groups = defaultdict(list)
+        now = timezone.now()
+        for site, changed in changed_sites:
+            # bulk_update bypasses auto_now, so stamp the modification time here
+            site.updated_at = now
+            groups[changed].append(site)
+        
+        for changed, sites in groups.items():
+            HistoricalSite.objects.bulk_update(
+                sites, [*changed, 'updated_at'], batch_size=1000
+            )
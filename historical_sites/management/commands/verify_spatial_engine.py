@@ -0,0 +1,126 @@
+import random
+import time
+from django.contrib.gis.geos import Polygon
+from django.core.management.base import BaseCommand, CommandError
+from historical_sites.memory_engine import build_spatial_engine
+from historical_sites.models import CountyBoundary, HistoricalSite
+from historical_sites.serializers import site_list_values
+from historical_sites.views import (
+    HistoricalSiteFilter,
+    buffer_zone_queryset,
+    finish_nearby_rows,
+    nearby_queryset,
+    nearby_rows,
+    polygon_queryset
+)
+
+
+# Reported distances are rounded to metres, so they may differ by one unit
+DISTANCE_TOLERANCE_KM = 0.001
+
+
+class Command(BaseCommand):
+    """Django command checking the in-memory spatial engine against PostGIS"""
+    
+    help = 'Run random spatial queries on both engines and fail on any difference'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--samples',
+            type=int,
+            default=100,
+            help='Random queries per query type'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1916,
+            help='Random seed of the sampled queries'
+        )
+    
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        engine = build_spatial_engine()
+        if engine is None:
+            raise CommandError('Dataset exceeds SPATIAL_ENGINE_MAX_SITES; nothing to verify')
+        if not len(engine):
+            raise CommandError('No sites loaded')
+        self.stdout.write(f'Engine loaded with {len(engine)} sites in {time.perf_counter() - started:.2f}s')
+        
+        rng = random.Random(options['seed'])
+        self.mismatches = []
+        
+        for _ in range(options['samples']):
+            latitude, longitude = self.random_point(rng, engine)
+            radius_km = rng.choice([None, round(rng.uniform(0.5, 100), 3)])
+            k = rng.choice([None, rng.randint(1, 50)]) if radius_km is not None else rng.randint(1, 50)
+            expected = list(nearby_rows(nearby_queryset(latitude, longitude, radius_km), k, radius_km))
+            expected_count = finish_nearby_rows(expected, radius_km)
+            actual, actual_count = engine.nearby(latitude, longitude, k, radius_km)
+            self.compare(
+                f'nearby lat={latitude} lng={longitude} k={k} radius_km={radius_km}',
+                expected, actual, expected_count, actual_count
+            )
+        
+        for _ in range(options['samples']):
+            latitude, longitude = self.random_point(rng, engine)
+            polygon = Polygon(self.close_ring(rng, latitude, longitude, rng.uniform(0.05, 1.0)))
+            expected = list(site_list_values(polygon_queryset(polygon)))
+            self.compare(f'in_polygon {polygon.wkt}', expected, engine.in_polygon(polygon))
+        
+        for _ in range(options['samples']):
+            center_site = HistoricalSite.objects.only('id', 'name', 'location', 'neighbour_radius_m').get(
+                id=engine.rows[rng.randrange(len(engine))]['id']
+            )
+            buffer_km = round(rng.uniform(0.5, 100), 3)
+            expected = list(site_list_values(buffer_zone_queryset(center_site, buffer_km)))
+            _center, actual = engine.buffer_zone(center_site.id, buffer_km)
+            self.compare(f'buffer_zone site_id={center_site.id} buffer_km={buffer_km}', expected, actual)
+        
+        for name in CountyBoundary.objects.values_list('name', flat=True):
+            queryset = HistoricalSiteFilter(
+                {'county': name.lower()}, queryset=HistoricalSite.objects.order_by('event_date', 'id')
+            ).qs
+            self.compare(f'county={name}', list(site_list_values(queryset)), engine.county_sites(name.lower()))
+        
+        if self.mismatches:
+            for label, reason in self.mismatches[:20]:
+                self.stdout.write(self.style.ERROR(f'✗ {label}: {reason}'))
+            raise CommandError(f'{len(self.mismatches)} queries differ between the engines')
+        self.stdout.write(self.style.SUCCESS('✓ Both engines returned identical results'))
+    
+    def random_point(self, rng, engine):
+        """A point near a random site, so queries hit populated areas"""
+        site = engine.rows[rng.randrange(len(engine))]
+        return (
+            round(site['latitude'] + rng.uniform(-0.2, 0.2), 6),
+            round(site['longitude'] + rng.uniform(-0.2, 0.2), 6)
+        )
+    
+    def close_ring(self, rng, latitude, longitude, size):
+        """A random convex quadrilateral around a point, as a closed ring"""
+        ring = [
+            (longitude - size * rng.uniform(0.3, 1), latitude - size * rng.uniform(0.3, 1)),
+            (longitude + size * rng.uniform(0.3, 1), latitude - size * rng.uniform(0.3, 1)),
+            (longitude + size * rng.uniform(0.3, 1), latitude + size * rng.uniform(0.3, 1)),
+            (longitude - size * rng.uniform(0.3, 1), latitude + size * rng.uniform(0.3, 1)),
+        ]
+        return ring + ring[:1]
+    
+    def compare(self, label, expected, actual, expected_count=None, actual_count=None):
+        if expected_count != actual_count:
+            self.mismatches.append((label, f'count {expected_count} != {actual_count}'))
+            return
+        if [site['id'] for site in expected] != [site['id'] for site in actual]:
+            self.mismatches.append((label, f'{len(expected)} vs {len(actual)} sites or different order'))
+            return
+        for expected_site, actual_site in zip(expected, actual):
+            expected_distance = expected_site.pop('distance_km', None)
+            actual_distance = actual_site.get('distance_km')
+            if expected_distance is not None and abs(expected_distance - actual_distance) > DISTANCE_TOLERANCE_KM:
+                self.mismatches.append((label, f'site {expected_site["id"]} distance differs'))
+                return
+            actual_fields = {key: value for key, value in actual_site.items() if key != 'distance_km'}
+            if expected_site != actual_fields:
+                self.mismatches.append((label, f'site {expected_site["id"]} fields differ'))
+                return
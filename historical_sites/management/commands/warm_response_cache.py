@@ -0,0 +1,76 @@
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+
+
+# Large responses fetched on every map page load, plus the FlatGeobuf exports
+DEFAULT_URLS = [
+    '/api/sites/',
+    '/api/sites/?format=geojson',
+    '/api/sites/?format=fgb',
+    '/api/sites/categories/',
+    '/api/sites/facets/',
+    '/api/county-boundaries/',
+    '/api/county-boundaries/geojson/',
+    '/api/county-boundaries/?format=fgb',
+]
+
+
+class Command(BaseCommand):
+    """Django command precomputing the compressed response variants after data loads"""
+    
+    help = 'Pre-warm the shared precompressed (gzip/brotli) API response cache'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--zooms',
+            type=str,
+            default='5-18',
+            help='Map zoom range of the county boundary requests to warm (e.g. 5-18)'
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            default=[],
+            help='Additional URL to warm (repeatable)'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            first, _, last = options['zooms'].partition('-')
+            zooms = range(int(first), int(last or first) + 1)
+        except ValueError:
+            raise CommandError('--zooms must be a zoom or a range such as 5-18')
+        
+        urls = DEFAULT_URLS + [
+            f'/api/county-boundaries/geojson_with_colors/?zoom={zoom}' for zoom in zooms
+        ] + options['url']
+        
+        # Requests look like the map's fetch() calls, which accept br and gzip
+        factory = RequestFactory(HTTP_ACCEPT='*/*', HTTP_ACCEPT_ENCODING='br, gzip')
+        warmed = 0
+        for url in urls:
+            try:
+                match = resolve(urlsplit(url).path)
+            except Resolver404:
+                self.stdout.write(self.style.WARNING(f'⊘ No view for {url}'))
+                continue
+            
+            started = time.perf_counter()
+            response = match.func(factory.get(url), *match.args, **match.kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            elapsed = time.perf_counter() - started
+            response.close()
+            
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'⊘ {url}: HTTP {response.status_code}'))
+                continue
+            warmed += 1
+            encoding = response.get('Content-Encoding', 'identity')
+            size = 'streamed' if response.streaming else f'{len(response.content)} bytes'
+            self.stdout.write(f'  • {url}: {size} {encoding} in {elapsed * 1000:.0f} ms')
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Warmed {warmed}/{len(urls)} responses'))
@@ -0,0 +1,237 @@
+"""
+Optional in-memory spatial engine (SPATIAL_ENGINE = 'memory').
+
+Each process keeps the list rows of every site, ordered by (event_date, id),
+together with NumPy coordinate arrays bucketed in a regular grid. Proximity
+(nearby, buffer_zone), polygon and county queries are answered with
+vectorised haversine distances and even-odd point-in-polygon tests, without
+a database round trip. Distances use the same sphere as the PostGIS queries
+(ST_Distance/ST_DWithin with use_spheroid => false), so both engines return
+the same sites in the same order; verify_spatial_engine checks this.
+
+PostGIS stays the source of truth: the engine is keyed by the site and
+county dataset versions and rebuilt when either changes. Datasets larger
+than SPATIAL_ENGINE_MAX_SITES and paginated requests are left to PostGIS.
+"""
+import logging
+import math
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from .caching import dataset_versions
+from .models import CountyBoundary, DatasetVersion, HistoricalSite
+from .serializers import site_list_values
+
+logger = logging.getLogger(__name__)
+
+
+ENGINE_DATASETS = (DatasetVersion.HISTORICAL_SITES, DatasetVersion.COUNTY_BOUNDARIES)
+
+# Mean Earth radius (IUGG), the sphere PostGIS uses for geography distances
+# with use_spheroid => false
+EARTH_RADIUS_M = 6371008.8
+
+# Points tested against a polygon at a time (bounds the edge x point matrix)
+TEST_BLOCK_SIZE = 4096
+
+
+def points_in_polygon(x, y, edges):
+    """
+    Even-odd ray casting of points against polygon edges (x1, y1, x2, y2)
+    from every ring, so holes are handled. Returns a boolean array.
+    """
+    inside = np.zeros(len(x), dtype=bool)
+    x1, y1, x2, y2 = (edges[:, i, None] for i in range(4))
+    for start in range(0, len(x), TEST_BLOCK_SIZE):
+        px = x[start:start + TEST_BLOCK_SIZE]
+        py = y[start:start + TEST_BLOCK_SIZE]
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crossings = np.count_nonzero(straddles & (px < crossing_x), axis=0)
+        inside[start:start + TEST_BLOCK_SIZE] = crossings % 2 == 1
+    return inside
+
+
+def polygon_edges(polygon):
+    """Edge array (x1, y1, x2, y2) of every ring of a GEOS polygon"""
+    rings = [np.asarray(ring.coords, dtype=float) for ring in polygon]
+    return np.concatenate([np.hstack([ring[:-1], ring[1:]]) for ring in rings])
+
+
+def haversine_m(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances in metres from one point (degrees) to arrays of radians"""
+    lat = math.radians(latitude)
+    lng = math.radians(longitude)
+    a = (
+        np.sin((latitudes - lat) / 2) ** 2
+        + math.cos(lat) * np.cos(latitudes) * np.sin((longitudes - lng) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialEngine:
+    """Site rows plus a grid index over their coordinates"""
+
+    def __init__(self, rows, county_ids, counties, cell_deg):
+        self.rows = rows
+        self.ids = np.array([row['id'] for row in rows], dtype=np.int64)
+        self.lat = np.array([row['latitude'] for row in rows], dtype=float)
+        self.lng = np.array([row['longitude'] for row in rows], dtype=float)
+        self.lat_rad = np.radians(self.lat)
+        self.lng_rad = np.radians(self.lng)
+        self.county_ids = np.array(
+            [-1 if county_id is None else county_id for county_id in county_ids], dtype=np.int64
+        )
+        # County names match case-insensitively, like the ?county= filter
+        self.counties = {name.upper(): pk for pk, name in counties}
+
+        self.id_order = np.argsort(self.ids)
+
+        # Grid buckets: positions sorted by cell key, one contiguous run per cell
+        self.cell_deg = cell_deg
+        self.origin = (self.lng.min(), self.lat.min()) if rows else (0.0, 0.0)
+        columns = np.floor((self.lng - self.origin[0]) / cell_deg).astype(np.int64)
+        grid_rows = np.floor((self.lat - self.origin[1]) / cell_deg).astype(np.int64)
+        self.columns = int(columns.max()) + 1 if rows else 0
+        self.grid_rows = int(grid_rows.max()) + 1 if rows else 0
+        keys = grid_rows * self.columns + columns
+        self.cell_order = np.argsort(keys, kind='stable')
+        self.cell_keys = keys[self.cell_order]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def position_of(self, site_id):
+        """Row position of a site id; raises KeyError when unknown"""
+        index = np.searchsorted(self.ids, site_id, sorter=self.id_order)
+        if index >= len(self.ids) or self.ids[self.id_order[index]] != site_id:
+            raise KeyError(site_id)
+        return int(self.id_order[index])
+
+    def bbox_candidates(self, min_lng, min_lat, max_lng, max_lat):
+        """Positions of the sites in the grid cells overlapping a bounding box"""
+        x0 = max(0, math.floor((min_lng - self.origin[0]) / self.cell_deg))
+        x1 = min(self.columns - 1, math.floor((max_lng - self.origin[0]) / self.cell_deg))
+        y0 = max(0, math.floor((min_lat - self.origin[1]) / self.cell_deg))
+        y1 = min(self.grid_rows - 1, math.floor((max_lat - self.origin[1]) / self.cell_deg))
+        if x0 > x1 or y0 > y1:
+            return np.empty(0, dtype=np.int64)
+        # Cells x0..x1 of one grid row are consecutive keys
+        row_keys = np.arange(y0, y1 + 1, dtype=np.int64) * self.columns
+        starts = np.searchsorted(self.cell_keys, row_keys + x0, side='left')
+        ends = np.searchsorted(self.cell_keys, row_keys + x1, side='right')
+        return np.concatenate(
+            [self.cell_order[start:end] for start, end in zip(starts, ends)]
+        ) if len(starts) else np.empty(0, dtype=np.int64)
+
+    def within(self, latitude, longitude, metres):
+        """(positions, distances) of the sites within `metres` of a point"""
+        delta_lat = math.degrees(metres / EARTH_RADIUS_M)
+        max_lat = min(90.0, abs(latitude) + delta_lat)
+        cos_lat = math.cos(math.radians(max_lat))
+        delta_lng = 180.0 if cos_lat < 1e-9 else min(180.0, delta_lat / cos_lat)
+        positions = self.bbox_candidates(
+            longitude - delta_lng, latitude - delta_lat, longitude + delta_lng, latitude + delta_lat
+        )
+        distances = haversine_m(latitude, longitude, self.lat_rad[positions], self.lng_rad[positions])
+        inside = distances <= metres
+        return positions[inside], distances[inside]
+
+    def nearby(self, latitude, longitude, k, radius_km):
+        """
+        Rows of a proximity search (nearest first, ties by id, with
+        distance_km) and the total number of matches, as nearby_rows() and
+        finish_nearby_rows() return them.
+        """
+        limit = k or settings.NEARBY_MAX_RESULTS
+        if radius_km is not None:
+            positions, distances = self.within(latitude, longitude, radius_km * 1000)
+        else:
+            positions = np.arange(len(self.rows))
+            distances = haversine_m(latitude, longitude, self.lat_rad, self.lng_rad)
+            if limit < len(positions):
+                closest = np.argpartition(distances, limit - 1)[:limit]
+                positions, distances = positions[closest], distances[closest]
+
+        order = np.lexsort((self.ids[positions], distances))[:limit]
+        sites = []
+        for position, distance in zip(positions[order], distances[order]):
+            site = dict(self.rows[position])
+            site['distance_km'] = round(float(distance) / 1000, 3)
+            sites.append(site)
+        count = len(positions) if radius_km is not None else len(sites)
+        return sites, count
+
+    def in_polygon(self, polygon):
+        """Rows of the sites inside a GEOS polygon (lng/lat), by (event_date, id)"""
+        positions = self.bbox_candidates(*polygon.extent)
+        inside = points_in_polygon(self.lng[positions], self.lat[positions], polygon_edges(polygon))
+        return [self.rows[position] for position in np.sort(positions[inside])]
+
+    def buffer_zone(self, site_id, buffer_km):
+        """(center row, rows of the other sites within buffer_km by (event_date, id))"""
+        center = self.rows[self.position_of(site_id)]
+        positions, _distances = self.within(center['latitude'], center['longitude'], buffer_km * 1000)
+        positions = np.sort(positions[self.ids[positions] != site_id])
+        return center, [self.rows[position] for position in positions]
+
+    def county_sites(self, name):
+        """Rows of the sites in a county (name matched case-insensitively), by (event_date, id)"""
+        county_id = self.counties.get(name.strip().upper())
+        if county_id is None:
+            return []
+        return [self.rows[position] for position in np.nonzero(self.county_ids == county_id)[0]]
+
+
+def build_spatial_engine():
+    """Load the engine from the database, or return None over SPATIAL_ENGINE_MAX_SITES"""
+    site_count = HistoricalSite.objects.count()
+    if site_count > settings.SPATIAL_ENGINE_MAX_SITES:
+        logger.warning(
+            'Spatial engine disabled: %d sites exceed SPATIAL_ENGINE_MAX_SITES (%d)',
+            site_count, settings.SPATIAL_ENGINE_MAX_SITES
+        )
+        return None
+
+    rows = list(site_list_values(HistoricalSite.objects.order_by('event_date', 'id'), 'county_id'))
+    county_ids = [row.pop('county_id') for row in rows]
+    counties = CountyBoundary.objects.values_list('id', 'name')
+    return SpatialEngine(rows, county_ids, counties, settings.SPATIAL_ENGINE_CELL_DEG)
+
+
+# Per-process engine: (dataset versions, SpatialEngine or None when over the bound)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_spatial_engine():
+    """
+    Return the current engine, or None when SPATIAL_ENGINE isn't 'memory' or
+    the dataset is too large. While one thread rebuilds the engine after a
+    dataset change, other threads keep using the previous one.
+    """
+    global _engine
+    if settings.SPATIAL_ENGINE != 'memory':
+        return None
+
+    versions = dataset_versions(ENGINE_DATASETS)
+    current = _engine
+    if current is not None and current[0] == versions:
+        return current[1]
+
+    if not _engine_lock.acquire(blocking=current is None):
+        return current[1]
+    try:
+        if _engine is None or _engine[0] != versions:
+            _engine = (versions, build_spatial_engine())
+        return _engine[1]
+    finally:
+        _engine_lock.release()
+
+
+def warm_spatial_engine():
+    """Load the engine ahead of the first request (called at process start)"""
+    get_spatial_engine()
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:12
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0002_countyboundary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='countyboundary',
+            name='geometry_coarse',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='countyboundary',
+            name='geometry_medium',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='countyboundary',
+            name='geometry_fine',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, null=True, srid=4326),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0004_datasetversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historicalsite',
+            index=models.Index(fields=['event_date', 'id'], name='historical__event_d_1a02ea_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Backfill existing sites with the county boundary covering their location
+ASSIGN_COUNTIES_SQL = """
+    UPDATE historical_sites_historicalsite s
+    SET county_id = (
+        SELECT c.id FROM historical_sites_countyboundary c
+        WHERE ST_Covers(c.geometry, s.location)
+        ORDER BY c.id
+        LIMIT 1
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0005_historicalsite_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalsite',
+            name='county',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sites', to='historical_sites.countyboundary'),
+        ),
+        migrations.RunSQL(ASSIGN_COUNTIES_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
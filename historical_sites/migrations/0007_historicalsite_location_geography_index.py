@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0006_historicalsite_county'),
+    ]
+
+    operations = [
+        # Expression index on the geography cast of the site location; serves
+        # ST_DWithin radius filters and <-> KNN ordering with metre distances
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX historical_site_location_geog_idx '
+                'ON historical_sites_historicalsite USING GIST ((location::geography))'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS historical_site_location_geog_idx',
+        ),
+    ]
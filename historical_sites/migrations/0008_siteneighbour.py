@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Initial population with the default SITE_NEIGHBOUR_MAX_KM (20 km); run the
+# rebuild_site_neighbours command after changing the setting
+POPULATE_NEIGHBOURS_SQL = """
+    INSERT INTO historical_sites_siteneighbour (site_id, neighbour_id, distance_m)
+    SELECT a.id, b.id, ST_Distance(a.location::geography, b.location::geography, false)
+    FROM historical_sites_historicalsite a
+    JOIN historical_sites_historicalsite b
+      ON b.id <> a.id
+     AND ST_DWithin(a.location::geography, b.location::geography, 20000, false)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0007_historicalsite_location_geography_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('distance_m', models.FloatField()),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of_links', to='historical_sites.historicalsite')),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_links', to='historical_sites.historicalsite')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['site', 'distance_m'], name='historical__site_id_ef118e_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='siteneighbour',
+            constraint=models.UniqueConstraint(fields=('site', 'neighbour'), name='unique_site_neighbour'),
+        ),
+        migrations.RunSQL(POPULATE_NEIGHBOURS_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:02
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Initial population with the default COUNTY_PIECE_MAX_VERTICES (256); run the
+# subdivide_county_boundaries command after changing the setting
+POPULATE_PIECES_SQL = """
+    INSERT INTO historical_sites_countyboundarypiece (county_id, geometry)
+    SELECT c.id, (ST_Dump(ST_Subdivide(c.geometry, 256))).geom
+    FROM historical_sites_countyboundary c
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0008_siteneighbour'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountyBoundaryPiece',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('geometry', django.contrib.gis.db.models.fields.PolygonField(srid=4326)),
+                ('county', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pieces', to='historical_sites.countyboundary')),
+            ],
+        ),
+        migrations.RunSQL(POPULATE_PIECES_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
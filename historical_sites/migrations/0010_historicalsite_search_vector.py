@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Weighted document: name (A), location name (B), significance (C) and
+# description (D). The trigger keeps it current for every write path,
+# including bulk_create/bulk_update which bypass model signals.
+SEARCH_DOCUMENT_SQL = """
+    setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(NEW.location_name, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(NEW.significance, '')), 'C') ||
+    setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D')
+"""
+
+CREATE_TRIGGER_SQL = f"""
+    CREATE FUNCTION historical_site_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_DOCUMENT_SQL};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER historical_site_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, location_name, significance, description, search_vector
+    ON historical_sites_historicalsite
+    FOR EACH ROW EXECUTE FUNCTION historical_site_search_vector_update();
+
+    -- Backfill existing rows through the trigger
+    UPDATE historical_sites_historicalsite SET search_vector = NULL;
+"""
+
+DROP_TRIGGER_SQL = """
+    DROP TRIGGER IF EXISTS historical_site_search_vector_trigger ON historical_sites_historicalsite;
+    DROP FUNCTION IF EXISTS historical_site_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0009_countyboundarypiece'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalsite',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='historicalsite',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='historical_site_search_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER_SQL, reverse_sql=DROP_TRIGGER_SQL),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:12
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0010_historicalsite_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='historicalsite',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='historical_site_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='historicalsite',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['location_name'], name='historical_site_place_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='countyboundary',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='county_boundary_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
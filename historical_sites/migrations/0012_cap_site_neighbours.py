@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+# Cap the existing neighbour lists (complete within 20 km, see 0008) to the
+# default SITE_NEIGHBOUR_MAX_PER_SITE (50) closest sites and record where each
+# capped list stops being complete; run the rebuild_site_neighbours command
+# after changing the settings
+CAP_NEIGHBOURS_SQL = """
+    CREATE TEMPORARY TABLE site_neighbour_ranked AS
+    SELECT id, site_id, distance_m,
+           row_number() OVER (PARTITION BY site_id ORDER BY distance_m, neighbour_id) AS rank
+    FROM historical_sites_siteneighbour;
+
+    UPDATE historical_sites_historicalsite SET neighbour_radius_m = 'Infinity';
+
+    UPDATE historical_sites_historicalsite s
+    SET neighbour_radius_m = r.distance_m
+    FROM site_neighbour_ranked r
+    WHERE r.site_id = s.id AND r.rank = 51;
+
+    DELETE FROM historical_sites_siteneighbour
+    WHERE id IN (SELECT id FROM site_neighbour_ranked WHERE rank > 50);
+
+    DROP TABLE site_neighbour_ranked;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0011_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalsite',
+            name='neighbour_radius_m',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(CAP_NEIGHBOURS_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:40
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historical_sites', '0012_cap_site_neighbours'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historicalsite',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='historical_site_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalsite',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('location_name'), name='text_pattern_ops'), name='historical_site_place_prefix_idx'),
+        ),
+    ]
@@ -1,4 +1,9 @@
+import uuid
+
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 
@@ -29,6 +34,21 @@ class HistoricalSite(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     event_type = models.CharField(max_length=100, help_text="e.g., Battle, Ambush, Execution, Political")
     
+    # County containing the site, denormalised by a spatial join when sites are
+    # loaded or boundaries are re-imported (see spatial.assign_site_counties)
+    county = models.ForeignKey(
+        'CountyBoundary',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='sites'
+    )
+    
+    # Distance (metres) below which the precomputed neighbour list of the site
+    # is complete; infinite unless SITE_NEIGHBOUR_MAX_PER_SITE cut it short,
+    # null until it is built (see spatial.rebuild_site_neighbours)
+    neighbour_radius_m = models.FloatField(null=True, blank=True, editable=False)
+    
     # Detailed historical information
     description = models.TextField(blank=True, null=True)
     casualties = models.IntegerField(null=True, blank=True)
@@ -43,11 +63,31 @@ class HistoricalSite(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Weighted full-text document (name, location, significance, description),
+    # maintained by a database trigger (see migration 0010)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         ordering = ['event_date', 'name']
         indexes = [
             models.Index(fields=['event_date']),
             models.Index(fields=['category']),
+            models.Index(fields=['event_date', 'id']),  # Keyset pagination order
+            GinIndex(fields=['search_vector'], name='historical_site_search_idx'),
+            # Trigram indexes for typo-tolerant autocomplete
+            GinIndex(fields=['name'], name='historical_site_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(
+                fields=['location_name'], name='historical_site_place_trgm_idx', opclasses=['gin_trgm_ops']
+            ),
+            # Case-insensitive prefix (istartswith) indexes for autocomplete
+            # when the in-memory prefix index is over its bound
+            models.Index(
+                OpClass(Upper('name'), name='text_pattern_ops'), name='historical_site_name_prefix_idx'
+            ),
+            models.Index(
+                OpClass(Upper('location_name'), name='text_pattern_ops'),
+                name='historical_site_place_prefix_idx'
+            ),
         ]
         verbose_name = 'Historical Site'
         verbose_name_plural = 'Historical Sites'
@@ -63,17 +103,135 @@ class HistoricalSite(models.Model):
         """Returns the longitude coordinate of the site location"""
         return self.location.x
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the loaded location so a save can tell a move from other edits
+        if 'location' in field_names:
+            location = values[field_names.index('location')]
+            instance._loaded_location = location.clone() if location is not None else None
+        return instance
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if 'location' not in self.get_deferred_fields():
+            self._loaded_location = self.location.clone() if self.location is not None else None
+    
+    def location_changed(self):
+        """Whether the location differs from the one last loaded or saved (True for a new site)"""
+        if not hasattr(self, '_loaded_location'):
+            return True
+        return self.location != self._loaded_location
+    
 
 class CountyBoundary(models.Model):
     """
     Model representing Irish county boundaries using PostGIS geometry.
     Used for geographical context and spatial queries.
     """
+    # Simplification levels: (field, Douglas-Peucker tolerance in degrees, max zoom).
+    # Tolerances are roughly one screen pixel at the highest zoom served by the level.
+    SIMPLIFICATION_LEVELS = [
+        ('geometry_coarse', 0.01, 7),
+        ('geometry_medium', 0.0025, 9),
+        ('geometry_fine', 0.0005, 11),
+    ]
+    
     name = models.CharField(max_length=100, unique=True)
     geometry = models.GeometryField(srid=4326)  # Accepts both Polygon and MultiPolygon
     
+    # Precomputed, topology-preserving simplifications of the full geometry
+    geometry_coarse = models.GeometryField(srid=4326, null=True, blank=True)
+    geometry_medium = models.GeometryField(srid=4326, null=True, blank=True)
+    geometry_fine = models.GeometryField(srid=4326, null=True, blank=True)
+    
+    class Meta:
+        app_label = 'historical_sites'
+        indexes = [
+            GinIndex(fields=['name'], name='county_boundary_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+    
+    def __str__(self):
+        return self.name
+    
+    @classmethod
+    def get_geometry_field(cls, zoom=None, tolerance=None):
+        """Returns the geometry field to serve for a map zoom level or a tolerance"""
+        if zoom is not None:
+            for field, _tolerance, max_zoom in cls.SIMPLIFICATION_LEVELS:
+                if zoom <= max_zoom:
+                    return field
+        elif tolerance is not None:
+            for field, level_tolerance, _max_zoom in cls.SIMPLIFICATION_LEVELS:
+                if level_tolerance <= tolerance:
+                    return field
+        return 'geometry'
+
+
+class CountyBoundaryPiece(models.Model):
+    """
+    Piece of a county boundary produced by ST_Subdivide, holding at most
+    COUNTY_PIECE_MAX_VERTICES vertices. Point-in-county tests run against
+    these small, tightly indexed polygons instead of the full boundaries.
+    """
+    county = models.ForeignKey(
+        CountyBoundary, on_delete=models.CASCADE, related_name='pieces'
+    )
+    geometry = models.PolygonField(srid=4326)
+    
+    class Meta:
+        app_label = 'historical_sites'
+    
+    def __str__(self):
+        return f"{self.county_id} piece {self.pk}"
+
+
+class SiteNeighbour(models.Model):
+    """
+    Precomputed pair of sites within SITE_NEIGHBOUR_MAX_KM of each other,
+    with their great-circle distance, so proximity lookups for a site are a
+    single indexed range scan. Each site keeps only its
+    SITE_NEIGHBOUR_MAX_PER_SITE closest neighbours, which bounds the table to
+    that many rows per site however dense the sites are.
+    """
+    site = models.ForeignKey(
+        HistoricalSite, on_delete=models.CASCADE, related_name='neighbour_links'
+    )
+    neighbour = models.ForeignKey(
+        HistoricalSite, on_delete=models.CASCADE, related_name='neighbour_of_links'
+    )
+    distance_m = models.FloatField()
+    
+    class Meta:
+        app_label = 'historical_sites'
+        constraints = [
+            models.UniqueConstraint(fields=['site', 'neighbour'], name='unique_site_neighbour'),
+        ]
+        indexes = [
+            models.Index(fields=['site', 'distance_m']),
+        ]
+    
+    def __str__(self):
+        return f"{self.site_id} -> {self.neighbour_id} ({self.distance_m:.0f} m)"
+
+
+class DatasetVersion(models.Model):
+    """
+    Version counter for a dataset, bumped whenever its data is (re)loaded.
+    Used to key and invalidate cached responses across worker processes.
+    """
+    COUNTY_BOUNDARIES = 'county_boundaries'
+    HISTORICAL_SITES = 'historical_sites'
+    
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+    # Random per database, so caches shared between databases (e.g. the
+    # benchmark's test database) never mix up entries with equal versions
+    token = models.UUIDField(default=uuid.uuid4, editable=False)
+    
     class Meta:
         app_label = 'historical_sites'
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,108 @@
+import base64
+import binascii
+from datetime import date
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination ordered on (event_date, id).
+
+    Pagination is only applied when the client sends `cursor` or `page_size`,
+    so existing consumers keep receiving unpaginated lists. Each page continues
+    with a row-value comparison `(event_date, id) > (%s, %s)` served by the
+    composite index, so deep pages cost the same as the first one.
+    """
+    ordering = ('event_date', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 50)
+        self.next_position = None
+        self.base_url = None
+
+    def is_requested(self, request):
+        """Check whether the client opted in to pagination"""
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        """Decode the (event_date, id) position from the cursor parameter"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            event_date, pk = raw.split('|')
+            return date.fromisoformat(event_date), int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        event_date, pk = position
+        raw = f'{event_date.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_position(self, row):
+        """Read the ordering values from a model instance or a values() dict"""
+        if isinstance(row, dict):
+            return tuple(row[field] for field in self.ordering)
+        return tuple(getattr(row, field) for field in self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            table = connection.ops.quote_name(queryset.model._meta.db_table)
+            columns = ', '.join(
+                f'{table}.{connection.ops.quote_name(field)}' for field in self.ordering
+            )
+            queryset = queryset.extra(where=[f'({columns}) > (%s, %s)'], params=list(position))
+
+        rows = list(queryset[:page_size + 1])
+        self.next_position = self.get_position(rows[page_size - 1]) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
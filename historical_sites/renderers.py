@@ -0,0 +1,21 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class GeoJSONRenderer(JSONRenderer):
+    """JSON renderer selected by ?format=geojson, served as application/geo+json"""
+    media_type = 'application/geo+json'
+    format = 'geojson'
+
+
+class FlatGeobufRenderer(BaseRenderer):
+    """
+    Negotiates ?format=fgb / application/flatgeobuf. The views write the file
+    themselves (see exports), so only already encoded bytes pass through.
+    """
+    media_type = 'application/flatgeobuf'
+    format = 'fgb'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
@@ -0,0 +1,46 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat
+
+
+# Text search configuration; must match the one used by the search_vector
+# trigger (migration 0010) so query terms are stemmed the same way
+SEARCH_CONFIG = 'english'
+
+HEADLINE_OPTIONS = {
+    'start_sel': '<mark>',
+    'stop_sel': '</mark>',
+    'max_words': 35,
+    'min_words': 15,
+    'max_fragments': 2,
+    'fragment_delimiter': ' … ',
+}
+
+
+def search_query(text):
+    """Parse user input with web search syntax ("quoted phrases", or, -excluded)"""
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search_sites(queryset, text):
+    """
+    Restrict a site queryset to full-text matches of `text`, using the GIN
+    index on search_vector, and annotate each site with its `rank`.
+    Results are ordered by rank, best first.
+    """
+    query = search_query(text)
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', 'id')
+
+
+def with_headline(queryset, text):
+    """Annotate a highlighted snippet of the significance and description text"""
+    return queryset.annotate(
+        headline=SearchHeadline(
+            Concat('significance', Value(' '), Coalesce('description', Value(''))),
+            search_query(text),
+            config=SEARCH_CONFIG,
+            **HEADLINE_OPTIONS
+        )
+    )
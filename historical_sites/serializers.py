@@ -1,7 +1,10 @@
+from django.conf import settings
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 from rest_framework import serializers
+from .functions import Latitude, Longitude
 from .models import HistoricalSite
 from .models import CountyBoundary
+from .models import SiteNeighbour
 
 
 class HistoricalSiteGeoJSONSerializer(GeoFeatureModelSerializer):
@@ -20,6 +23,7 @@ class HistoricalSiteDetailSerializer(serializers.ModelSerializer):
     """Provides complete historical site details including computed coordinates"""
     latitude = serializers.SerializerMethodField()
     longitude = serializers.SerializerMethodField()
+    nearby_events = serializers.SerializerMethodField()
     
     class Meta:
         model = HistoricalSite
@@ -28,16 +32,35 @@ class HistoricalSiteDetailSerializer(serializers.ModelSerializer):
             'latitude', 'longitude', 'category', 'event_type',
             'significance', 'description', 'casualties',
             'commanders', 'images', 'audio_url', 'sources',
-            'created_at', 'updated_at'
+            'nearby_events', 'created_at', 'updated_at'
+        ]
+    
+    def get_nearby_events(self, obj):
+        """Closest related events, read from the precomputed neighbour table"""
+        links = SiteNeighbour.objects.filter(site_id=obj.pk).order_by('distance_m').values(
+            'neighbour_id', 'neighbour__name', 'neighbour__event_date',
+            'neighbour__event_type', 'distance_m'
+        )[:settings.SITE_RELATED_EVENTS_LIMIT]
+        return [
+            {
+                'id': link['neighbour_id'],
+                'name': link['neighbour__name'],
+                'event_date': link['neighbour__event_date'],
+                'event_type': link['neighbour__event_type'],
+                'distance_km': round(link['distance_m'] / 1000, 3),
+            }
+            for link in links
         ]
     
     def get_latitude(self, obj):
-        """Extracts latitude from location geometry"""
-        return obj.get_latitude()
+        """Uses the SQL-computed latitude when annotated, else the location geometry"""
+        latitude = getattr(obj, 'latitude', None)
+        return obj.get_latitude() if latitude is None else latitude
     
     def get_longitude(self, obj):
-        """Extracts longitude from location geometry"""
-        return obj.get_longitude()
+        """Uses the SQL-computed longitude when annotated, else the location geometry"""
+        longitude = getattr(obj, 'longitude', None)
+        return obj.get_longitude() if longitude is None else longitude
 
 
 class HistoricalSiteListSerializer(serializers.ModelSerializer):
@@ -61,7 +84,25 @@ class HistoricalSiteListSerializer(serializers.ModelSerializer):
         """Extracts longitude from location geometry"""
         return obj.get_longitude()
 
-    
+
+
+def with_coordinates(queryset):
+    """Annotates latitude/longitude computed in SQL (ST_Y/ST_X) on a site queryset"""
+    return queryset.annotate(latitude=Latitude('location'), longitude=Longitude('location'))
+
+
+def site_list_values(queryset, *extra_fields):
+    """
+    Fast list path: rows with exactly the HistoricalSiteListSerializer fields
+    (plus any extra annotated fields), read with .values() and coordinates
+    computed in SQL, so neither model instances, GEOS points nor DRF field
+    objects are built per row.
+    """
+    return with_coordinates(queryset).values(
+        *HistoricalSiteListSerializer.Meta.fields, *extra_fields
+    )
+
+
 class CountyBoundarySerializer(GeoFeatureModelSerializer):
     """Serializes county boundary data to GeoJSON format for map overlay"""
     class Meta:
@@ -0,0 +1,66 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CountyBoundary, DatasetVersion, HistoricalSite
+from .simplification import simplify_county_neighbourhood
+from .spatial import assign_site_counties, rebuild_site_neighbours, subdivide_county_boundaries
+from .versioning import bump_dataset_version
+
+
+def site_moved(instance, raw, update_fields):
+    """Whether a (non-fixture) save created the site or changed its location"""
+    if raw or (update_fields is not None and 'location' not in update_fields):
+        return False
+    return instance.location_changed()
+
+
+@receiver(post_save, sender=HistoricalSite)
+def update_site_county(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Re-run the county spatial join when a site is created or moved"""
+    if not site_moved(instance, raw, update_fields):
+        return
+    assign_site_counties([instance.pk])
+
+
+@receiver(post_save, sender=HistoricalSite)
+def update_site_neighbours(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Refresh the precomputed neighbour pairs of a created or moved site"""
+    if not site_moved(instance, raw, update_fields):
+        return
+    rebuild_site_neighbours([instance.pk])
+
+
+@receiver(post_save, sender=CountyBoundary)
+def update_county_derived_data(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Refresh what is derived from a county boundary whose geometry was saved
+    (e.g. in the admin): its subdivided pieces, the county of the sites it
+    covered or now covers, and the simplified levels of it and its neighbours
+    """
+    if raw or (update_fields is not None and 'geometry' not in update_fields):
+        return
+    subdivide_county_boundaries([instance.pk])
+    site_ids = HistoricalSite.objects.filter(
+        Q(county_id=instance.pk) | Q(location__intersects=instance.geometry)
+    ).values_list('id', flat=True)
+    assign_site_counties(list(site_ids))
+    simplify_county_neighbourhood(instance.pk)
+
+
+@receiver(post_save, sender=HistoricalSite)
+@receiver(post_delete, sender=HistoricalSite)
+def bump_sites_version(sender, raw=False, **kwargs):
+    """Invalidate cached site responses whenever a site changes"""
+    if raw:
+        return
+    bump_dataset_version(DatasetVersion.HISTORICAL_SITES)
+
+
+@receiver(post_save, sender=CountyBoundary)
+@receiver(post_delete, sender=CountyBoundary)
+def bump_counties_version(sender, raw=False, **kwargs):
+    """Invalidate cached boundary responses whenever a county changes (e.g. in the admin)"""
+    if raw:
+        return
+    bump_dataset_version(DatasetVersion.COUNTY_BOUNDARIES)
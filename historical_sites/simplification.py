@@ -0,0 +1,219 @@
+"""
+Topology-preserving simplification of the county boundary coverage.
+
+Simplifying each county polygon on its own (ST_SimplifyPreserveTopology) keeps
+every polygon valid, but the two copies of a shared border are simplified
+independently and drift apart, leaving slivers and gaps between counties.
+Instead the rings of all counties are split into arcs at junction points (where
+three or more counties meet, or where a shared border meets the coast), each
+distinct arc is simplified exactly once with Douglas-Peucker while its end
+points stay fixed, and the rings are rebuilt from the simplified arcs. Both
+neighbours therefore receive identical border geometry at every tolerance.
+"""
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.db.models import Exists, OuterRef
+
+from .models import CountyBoundary
+
+
+def _iter_polygons(geometry):
+    """Yield the polygons of a Polygon or MultiPolygon geometry"""
+    if geometry.geom_type == 'Polygon':
+        yield geometry
+    elif geometry.geom_type == 'MultiPolygon':
+        yield from geometry
+    elif geometry.geom_type == 'GeometryCollection':
+        for part in geometry:
+            yield from _iter_polygons(part)
+
+
+def _ring_points(ring):
+    """Return the vertices of a ring without the closing duplicate"""
+    points = [tuple(coord[:2]) for coord in ring.coords]
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    return points
+
+
+def _find_junctions(rings):
+    """Find vertices whose neighbours differ between the rings that use them"""
+    neighbours = {}
+    junctions = set()
+    for points in rings:
+        count = len(points)
+        for idx, point in enumerate(points):
+            pair = frozenset((points[idx - 1], points[(idx + 1) % count]))
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def _split_ring(points, junctions):
+    """Split a ring into arcs that start and end on junction vertices"""
+    starts = [idx for idx, point in enumerate(points) if point in junctions]
+    if not starts:
+        # Rotate junction-free rings to a canonical start so that a ring shared
+        # by two counties (an enclave) is simplified identically for both.
+        start = points.index(min(points))
+        rotated = points[start:] + points[:start]
+        return [rotated + [rotated[0]]]
+
+    rotated = points[starts[0]:] + points[:starts[0]]
+    arcs = []
+    current = [rotated[0]]
+    for point in rotated[1:]:
+        current.append(point)
+        if point in junctions:
+            arcs.append(current)
+            current = [point]
+    current.append(rotated[0])
+    arcs.append(current)
+    return arcs
+
+
+def _perpendicular_distance(point, start, end):
+    """Distance from a point to the segment start-end (or to start if degenerate)"""
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    cx, cy = ax + t * dx, ay + t * dy
+    return ((px - cx) ** 2 + (py - cy) ** 2) ** 0.5
+
+
+def douglas_peucker(points, tolerance):
+    """Simplify a line with Douglas-Peucker, always keeping both end points"""
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance = 0.0
+        index = None
+        for idx in range(first + 1, last):
+            distance = _perpendicular_distance(points[idx], points[first], points[last])
+            if distance > max_distance:
+                max_distance, index = distance, idx
+        if index is not None and max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+class CoverageSimplifier:
+    """Simplifies a set of polygons that share borders without opening gaps"""
+
+    def __init__(self, geometries):
+        # geometries: mapping of key -> Polygon/MultiPolygon in a common SRID
+        self.srid = None
+        self.polygons = {}
+        rings = []
+        for key, geometry in geometries.items():
+            self.srid = self.srid or geometry.srid
+            polygons = []
+            for polygon in _iter_polygons(geometry):
+                polygon_rings = [_ring_points(ring) for ring in polygon]
+                polygons.append(polygon_rings)
+                rings.extend(polygon_rings)
+            self.polygons[key] = polygons
+        self.junctions = _find_junctions(rings)
+
+    def _simplify_ring(self, points, tolerance, arc_cache):
+        """Rebuild a ring from its (cached) simplified arcs"""
+        ring = []
+        for arc in _split_ring(points, self.junctions):
+            reversed_arc = tuple(reversed(arc))
+            key = min(tuple(arc), reversed_arc)
+            if key not in arc_cache:
+                arc_cache[key] = douglas_peucker(list(key), tolerance)
+            simplified = arc_cache[key]
+            if key is reversed_arc:
+                simplified = simplified[::-1]
+            ring.extend(simplified if not ring else simplified[1:])
+
+        # A ring needs at least three distinct vertices to enclose an area
+        if len(set(ring)) < 3:
+            return None
+        if ring[0] != ring[-1]:
+            ring.append(ring[0])
+        return ring
+
+    def simplify(self, tolerance):
+        """Return a mapping of key -> simplified MultiPolygon (or None if collapsed)"""
+        arc_cache = {}
+        results = {}
+        for key, polygons in self.polygons.items():
+            parts = []
+            for polygon_rings in polygons:
+                shell = self._simplify_ring(polygon_rings[0], tolerance, arc_cache)
+                if shell is None:
+                    continue
+                holes = [
+                    hole for hole in (
+                        self._simplify_ring(ring, tolerance, arc_cache)
+                        for ring in polygon_rings[1:]
+                    ) if hole is not None
+                ]
+                parts.append(Polygon(shell, *holes, srid=self.srid))
+
+            if not parts:
+                results[key] = None
+                continue
+
+            geometry = MultiPolygon(*parts, srid=self.srid)
+            if not geometry.valid:
+                geometry = geometry.buffer(0)
+                if geometry.geom_type == 'Polygon':
+                    geometry = MultiPolygon(geometry, srid=self.srid)
+            results[key] = geometry
+        return results
+
+
+def simplify_county_boundaries(queryset=None, update_ids=None):
+    """
+    Precompute the simplified geometry levels for every county boundary, or
+    only for the counties in `update_ids`, the rest of `queryset` then
+    serving as context for the shared borders.
+    """
+    if queryset is None:
+        queryset = CountyBoundary.objects.all()
+    counties = list(queryset.only('id', 'geometry'))
+    if not counties:
+        return 0
+
+    simplifier = CoverageSimplifier({county.pk: county.geometry for county in counties})
+    fields = []
+    for field, tolerance, _max_zoom in CountyBoundary.SIMPLIFICATION_LEVELS:
+        simplified = simplifier.simplify(tolerance)
+        for county in counties:
+            setattr(county, field, simplified[county.pk])
+        fields.append(field)
+
+    if update_ids is not None:
+        counties = [county for county in counties if county.pk in update_ids]
+    CountyBoundary.objects.bulk_update(counties, fields)
+    return len(counties)
+
+
+def simplify_county_neighbourhood(county_id):
+    """
+    Refresh the simplified levels after one boundary changed: the county and
+    the counties bordering it are rewritten. Their own neighbours are loaded
+    as context, so every junction on the rewritten borders, and therefore
+    every simplified arc, comes out as in a full run.
+    """
+    county = CountyBoundary.objects.only('geometry').get(pk=county_id)
+    bordering = set(
+        CountyBoundary.objects.filter(geometry__intersects=county.geometry).values_list('id', flat=True)
+    )
+    bordering.add(county_id)
+    context = CountyBoundary.objects.filter(Exists(
+        CountyBoundary.objects.filter(id__in=bordering, geometry__intersects=OuterRef('geometry'))
+    ))
+    return simplify_county_boundaries(context, update_ids=bordering)
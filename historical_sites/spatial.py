@@ -0,0 +1,257 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import CountyBoundary, CountyBoundaryPiece, HistoricalSite, SiteNeighbour
+
+
+# Geography point built from (longitude, latitude) query parameters
+GEOGRAPHY_POINT_SQL = 'ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography'
+
+
+def _site_geography_sql():
+    """The site location cast to geography, matching the expression GiST index"""
+    table = connection.ops.quote_name(HistoricalSite._meta.db_table)
+    return f'{table}.{connection.ops.quote_name("location")}::geography'
+
+
+# Distances are measured on the sphere (use_spheroid => false), the same model
+# the geography KNN operator uses, so ordering and reported distances agree.
+
+def geography_distance(point):
+    """Expression for the distance in metres from each site to a point"""
+    return RawSQL(
+        f'ST_Distance({_site_geography_sql()}, {GEOGRAPHY_POINT_SQL}, false)',
+        (point.x, point.y),
+        output_field=FloatField()
+    )
+
+
+def geography_knn(point):
+    """KNN ordering expression (<->) answered by the geography GiST index"""
+    return RawSQL(
+        f'{_site_geography_sql()} <-> {GEOGRAPHY_POINT_SQL}',
+        (point.x, point.y),
+        output_field=FloatField()
+    )
+
+
+def filter_within_distance(queryset, point, metres):
+    """Restrict a site queryset to an indexed ST_DWithin radius in metres"""
+    return queryset.extra(
+        where=[f'ST_DWithin({_site_geography_sql()}, {GEOGRAPHY_POINT_SQL}, %s, false)'],
+        params=[point.x, point.y, metres]
+    )
+
+
+def subdivide_county_boundaries(county_ids=None, max_vertices=None):
+    """
+    Rebuild the ST_Subdivide pieces of the county boundaries.
+
+    Each boundary is cut into polygons of at most `max_vertices` vertices
+    (COUNTY_PIECE_MAX_VERTICES by default), so a point-in-county test only
+    has to scan a small piece whose bounding box hugs it. Limit the rebuild
+    to `county_ids` when given; returns the number of pieces inserted.
+    """
+    counties = connection.ops.quote_name(CountyBoundary._meta.db_table)
+    pieces = connection.ops.quote_name(CountyBoundaryPiece._meta.db_table)
+    if max_vertices is None:
+        max_vertices = settings.COUNTY_PIECE_MAX_VERTICES
+    # ST_Subdivide needs at least 5 vertices per piece
+    max_vertices = max(5, int(max_vertices))
+
+    where = 'WHERE c.id = ANY(%s)' if county_ids is not None else ''
+    params = [list(county_ids)] if county_ids is not None else []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if county_ids is None:
+            cursor.execute(f'DELETE FROM {pieces}')
+        else:
+            cursor.execute(f'DELETE FROM {pieces} WHERE county_id = ANY(%s)', params)
+        cursor.execute(f"""
+            INSERT INTO {pieces} (county_id, geometry)
+            SELECT c.id, (ST_Dump(ST_Subdivide(c.geometry, %s))).geom
+            FROM {counties} c
+            {where}
+        """, [max_vertices] + params)
+        return cursor.rowcount
+
+
+def assign_site_counties(site_ids=None):
+    """
+    Set HistoricalSite.county to the boundary covering each site location.
+
+    Runs a single spatial join in PostGIS against the subdivided county
+    pieces (small polygons with a GiST index) and only writes rows whose
+    county actually changes. Limit the update to `site_ids` when given;
+    returns the number of rows updated.
+    """
+    sites = connection.ops.quote_name(HistoricalSite._meta.db_table)
+    pieces = connection.ops.quote_name(CountyBoundaryPiece._meta.db_table)
+    where = 'WHERE s.id = ANY(%s)' if site_ids is not None else ''
+    params = [list(site_ids)] if site_ids is not None else []
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH matched AS (
+                SELECT s.id, (
+                    SELECT p.county_id FROM {pieces} p
+                    WHERE ST_Covers(p.geometry, s.location)
+                    ORDER BY p.county_id
+                    LIMIT 1
+                ) AS county_id
+                FROM {sites} s
+                {where}
+            )
+            UPDATE {sites} s
+            SET county_id = matched.county_id
+            FROM matched
+            WHERE s.id = matched.id
+              AND s.county_id IS DISTINCT FROM matched.county_id
+        """, params)
+        return cursor.rowcount
+
+
+def rebuild_site_neighbours(site_ids=None):
+    """
+    Recompute the precomputed neighbour lists: the SITE_NEIGHBOUR_MAX_PER_SITE
+    closest sites within SITE_NEIGHBOUR_MAX_KM of each site, found with the
+    KNN operator on the geography index. The cap keeps the table at most
+    that many rows per site whatever the density. Each site also records
+    in neighbour_radius_m the distance below which its list is complete
+    (that of the first neighbour cut off, or infinity).
+
+    With `site_ids` only the lists of those (new or moved) sites are
+    recomputed, and the sites are added to the other lists whose complete
+    radius they fall within; otherwise the whole table is rebuilt. Returns
+    the number of pair rows inserted.
+    """
+    sites = connection.ops.quote_name(HistoricalSite._meta.db_table)
+    neighbours = connection.ops.quote_name(SiteNeighbour._meta.db_table)
+    max_distance = settings.SITE_NEIGHBOUR_MAX_KM * 1000
+    max_per_site = max(1, settings.SITE_NEIGHBOUR_MAX_PER_SITE)
+
+    where = 'WHERE a.id = ANY(%s)' if site_ids is not None else ''
+    target = 'WHERE id = ANY(%s)' if site_ids is not None else ''
+    params = [list(site_ids)] if site_ids is not None else []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if site_ids is None:
+            cursor.execute(f'DELETE FROM {neighbours}')
+        else:
+            cursor.execute(
+                f'DELETE FROM {neighbours} WHERE site_id = ANY(%s) OR neighbour_id = ANY(%s)',
+                params * 2
+            )
+
+        # One row past the cap is fetched to know where each list stops being complete
+        cursor.execute('DROP TABLE IF EXISTS site_neighbour_ranked')
+        cursor.execute(f"""
+            CREATE TEMPORARY TABLE site_neighbour_ranked AS
+            SELECT a.id AS site_id, n.id AS neighbour_id, n.distance_m,
+                   row_number() OVER (PARTITION BY a.id ORDER BY n.distance_m, n.id) AS rank
+            FROM {sites} a
+            CROSS JOIN LATERAL (
+                SELECT b.id,
+                       ST_Distance(a.location::geography, b.location::geography, false) AS distance_m
+                FROM {sites} b
+                WHERE b.id <> a.id
+                  AND ST_DWithin(a.location::geography, b.location::geography, %s, false)
+                ORDER BY b.location::geography <-> a.location::geography, b.id
+                LIMIT %s
+            ) n
+            {where}
+        """, [max_distance, max_per_site + 1] + params)
+        cursor.execute(f"UPDATE {sites} SET neighbour_radius_m = 'Infinity' {target}", params)
+        cursor.execute(f"""
+            UPDATE {sites} s
+            SET neighbour_radius_m = r.distance_m
+            FROM site_neighbour_ranked r
+            WHERE r.site_id = s.id AND r.rank > %s
+        """, [max_per_site])
+        cursor.execute(f"""
+            INSERT INTO {neighbours} (site_id, neighbour_id, distance_m)
+            SELECT site_id, neighbour_id, distance_m
+            FROM site_neighbour_ranked
+            WHERE rank <= %s
+        """, [max_per_site])
+        inserted = cursor.rowcount
+        cursor.execute('DROP TABLE site_neighbour_ranked')
+        if site_ids is None:
+            return inserted
+
+        # Other sites gain a changed site only where it falls inside their
+        # complete radius, so their lists stay complete below it
+        cursor.execute(f"""
+            INSERT INTO {neighbours} (site_id, neighbour_id, distance_m)
+            SELECT b.id, a.id,
+                   ST_Distance(a.location::geography, b.location::geography, false)
+            FROM {sites} a
+            JOIN {sites} b
+              ON b.id <> a.id
+             AND NOT (b.id = ANY(%s))
+             AND ST_DWithin(a.location::geography, b.location::geography, %s, false)
+            WHERE a.id = ANY(%s)
+              AND ST_Distance(a.location::geography, b.location::geography, false)
+                  < b.neighbour_radius_m
+            RETURNING site_id
+        """, [params[0], max_distance, params[0]])
+        inserted += cursor.rowcount
+        grown = list({row[0] for row in cursor.fetchall()})
+
+        # Lists pushed over the cap drop their furthest neighbours and
+        # shrink their complete radius accordingly
+        cursor.execute(f"""
+            WITH ranked AS (
+                SELECT id, site_id, distance_m,
+                       row_number() OVER (PARTITION BY site_id ORDER BY distance_m, neighbour_id) AS rank
+                FROM {neighbours}
+                WHERE site_id = ANY(%s)
+            ), radius AS (
+                UPDATE {sites} s
+                SET neighbour_radius_m = r.distance_m
+                FROM ranked r
+                WHERE r.site_id = s.id AND r.rank = %s
+            )
+            DELETE FROM {neighbours}
+            WHERE id IN (SELECT id FROM ranked WHERE rank > %s)
+        """, [grown, max_per_site + 1, max_per_site])
+        return inserted
+
+
+def invalidate_site_neighbours(site_ids=None):
+    """
+    Mark neighbour lists as incomplete (neighbour_radius_m NULL) after sites
+    were added or moved without rebuilding them: the lists of `site_ids`, of
+    the sites within SITE_NEIGHBOUR_MAX_KM of their new locations and of the
+    sites listing them from their old ones, or every list when `site_ids` is
+    None. buffer_zone answers those sites with its radius query until the
+    next rebuild_site_neighbours. Returns the number of sites marked.
+    """
+    sites = connection.ops.quote_name(HistoricalSite._meta.db_table)
+    neighbours = connection.ops.quote_name(SiteNeighbour._meta.db_table)
+
+    with connection.cursor() as cursor:
+        if site_ids is None:
+            cursor.execute(
+                f'UPDATE {sites} SET neighbour_radius_m = NULL WHERE neighbour_radius_m IS NOT NULL'
+            )
+            return cursor.rowcount
+
+        site_ids = list(site_ids)
+        cursor.execute(f"""
+            UPDATE {sites}
+            SET neighbour_radius_m = NULL
+            WHERE neighbour_radius_m IS NOT NULL
+              AND id IN (
+                  SELECT b.id
+                  FROM {sites} a
+                  JOIN {sites} b
+                    ON ST_DWithin(a.location::geography, b.location::geography, %s, false)
+                  WHERE a.id = ANY(%s)
+                  UNION
+                  SELECT site_id FROM {neighbours} WHERE neighbour_id = ANY(%s)
+              )
+        """, [settings.SITE_NEIGHBOUR_MAX_KM * 1000, site_ids, site_ids])
+        return cursor.rowcount
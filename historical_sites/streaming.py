@@ -0,0 +1,77 @@
+import json
+
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.http import StreamingHttpResponse
+
+
+# Feature properties match HistoricalSiteGeoJSONSerializer (id is the feature id)
+FEATURE_PROPERTIES = [
+    'name', 'event_date', 'location_name',
+    'category', 'event_type', 'significance', 'casualties'
+]
+
+STREAM_FORMATS = {
+    'geojson': 'application/geo+json',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched per server-side cursor round trip and features per written chunk
+CURSOR_CHUNK_SIZE = 2000
+FEATURES_PER_CHUNK = 500
+
+
+def iter_features(queryset):
+    """Yield encoded GeoJSON features straight from a server-side cursor"""
+    rows = queryset.annotate(
+        geometry_geojson=AsGeoJSON('location')
+    ).values_list('id', 'geometry_geojson', *FEATURE_PROPERTIES)
+
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    for pk, geometry, *values in rows.iterator(chunk_size=CURSOR_CHUNK_SIZE):
+        properties = dict(zip(FEATURE_PROPERTIES, values))
+        properties['event_date'] = properties['event_date'].isoformat()
+        # The geometry is already GeoJSON text computed by ST_AsGeoJSON
+        yield (
+            f'{{"id":{pk},"type":"Feature","geometry":{geometry or "null"},'
+            f'"properties":{dumps(properties)}}}'
+        )
+
+
+def _chunked(features):
+    """Join features into chunks so each write carries many features"""
+    chunk = []
+    for feature in features:
+        chunk.append(feature)
+        if len(chunk) >= FEATURES_PER_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_feature_collection(queryset):
+    """Yield a GeoJSON FeatureCollection incrementally"""
+    yield '{"type":"FeatureCollection","features":['
+    first = True
+    for chunk in _chunked(iter_features(queryset)):
+        yield ('' if first else ',') + ','.join(chunk)
+        first = False
+    yield ']}'
+
+
+def stream_ndjson(queryset):
+    """Yield one GeoJSON feature per line (newline-delimited JSON)"""
+    for chunk in _chunked(iter_features(queryset)):
+        yield '\n'.join(chunk) + '\n'
+
+
+def streaming_sites_response(queryset, stream_format):
+    """Build a StreamingHttpResponse for the sites queryset in the given format"""
+    if stream_format == 'ndjson':
+        content = stream_ndjson(queryset)
+    else:
+        content = stream_feature_collection(queryset)
+    return StreamingHttpResponse(
+        (part.encode('utf-8') for part in content),
+        content_type=STREAM_FORMATS[stream_format]
+    )
@@ -0,0 +1,316 @@
+"""
+Synthetic historical sites for load tests and benchmarks.
+
+Points are drawn by vectorised rejection sampling against the subdivided
+county pieces (CountyBoundaryPiece). Each piece has at most
+COUNTY_PIECE_MAX_VERTICES vertices and a tight bounding box, so few
+candidates are rejected and the even-odd test is cheap. Part of the sites
+cluster around towns and the real sites, and the rest are spread uniformly
+over the land area. Categories, event types and dates are resampled from the
+real sites, with their dates jittered within each category's range.
+
+Each chunk is generated from its own seeded generator, so the output depends
+only on the seed and chunk size, not on the number of worker processes.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+from django.db import connection, connections
+from django.utils import timezone
+
+from .memory_engine import points_in_polygon, polygon_edges
+from .models import CountyBoundary, CountyBoundaryPiece, HistoricalSite
+
+
+NAME_PREFIX = 'Synthetic site'
+
+# Towns used as cluster centres: (name, longitude, latitude, weight ~ 1911 population in thousands)
+URBAN_CENTRES = [
+    ('Dublin', -6.2603, 53.3498, 400),
+    ('Belfast', -5.9301, 54.5973, 387),
+    ('Cork', -8.4756, 51.8985, 77),
+    ('Derry', -7.3086, 54.9966, 41),
+    ('Limerick', -8.6267, 52.6638, 38),
+    ('Waterford', -7.1101, 52.2593, 27),
+    ('Galway', -9.0568, 53.2707, 13),
+    ('Dundalk', -6.4049, 54.0090, 13),
+    ('Newry', -6.3373, 54.1751, 12),
+    ('Drogheda', -6.3478, 53.7179, 12),
+    ('Wexford', -6.4633, 52.3369, 11),
+    ('Sligo', -8.4761, 54.2766, 11),
+    ('Kilkenny', -7.2448, 52.6541, 10),
+    ('Clonmel', -7.7032, 52.3550, 10),
+    ('Tralee', -9.7026, 52.2713, 10),
+    ('Athlone', -7.9407, 53.4239, 7),
+    ('Ennis', -8.9816, 52.8436, 5),
+]
+
+# Weight of each real site as a cluster centre, in the same units
+REAL_SITE_CENTRE_WEIGHT = 5
+
+# Category date ranges used when there are no real sites to resample
+DEFAULT_PERIODS = {
+    'EASTER_RISING': (date(1916, 4, 24), date(1916, 4, 29)),
+    'WAR_INDEPENDENCE': (date(1919, 1, 21), date(1921, 7, 11)),
+    'TREATY': (date(1921, 7, 11), date(1922, 6, 28)),
+    'CIVIL_WAR': (date(1922, 6, 28), date(1923, 5, 24)),
+    'AFTERMATH': (date(1923, 5, 24), date(1923, 12, 31)),
+}
+DEFAULT_EVENT_TYPES = ['Battle', 'Ambush', 'Execution', 'Political', 'Raid', 'Arrest']
+
+# Standard deviation of the jitter added to resampled dates
+DATE_JITTER_DAYS = 30
+
+
+class SamplingModel:
+    """Picklable description of where and what to generate"""
+
+    def __init__(self, pieces, centres, templates, urban_share, spread_km):
+        # Pieces: county ids, bounding boxes and edge arrays
+        self.piece_counties = np.array([county_id for county_id, _bbox, _edges in pieces], dtype=np.int64)
+        self.piece_bboxes = np.array([bbox for _county_id, bbox, _edges in pieces], dtype=float)
+        self.piece_edges = [edges for _county_id, _bbox, edges in pieces]
+        # Uniform over the union of pieces: pick a bounding box by its
+        # (latitude-corrected) area, then keep the points inside its piece
+        min_x, min_y, max_x, max_y = self.piece_bboxes.T
+        areas = (max_x - min_x) * (max_y - min_y) * np.cos(np.radians((min_y + max_y) / 2))
+        self.piece_weights = areas / areas.sum()
+
+        self.centre_names = [name for name, _lng, _lat, _weight in centres]
+        self.centre_coords = np.array([(lng, lat) for _name, lng, lat, _weight in centres], dtype=float)
+        weights = np.array([weight for _name, _lng, _lat, weight in centres], dtype=float)
+        self.centre_weights = weights / weights.sum() if len(centres) else weights
+        self.urban_share = urban_share if len(centres) else 0.0
+        self.spread_deg = spread_km / 111.32
+
+        # Templates: category, event type and date ordinal of each real site
+        self.categories = sorted({category for category, _event_type, _ordinal in templates})
+        self.event_types = sorted({event_type for _category, event_type, _ordinal in templates})
+        self.template_categories = np.array([self.categories.index(t[0]) for t in templates])
+        self.template_event_types = np.array([self.event_types.index(t[1]) for t in templates])
+        self.template_ordinals = np.array([t[2] for t in templates], dtype=np.int64)
+        self.category_bounds = np.array([
+            (self.template_ordinals[self.template_categories == i].min(),
+             self.template_ordinals[self.template_categories == i].max())
+            for i in range(len(self.categories))
+        ], dtype=np.int64)
+
+    def locate(self, x, y):
+        """County id of each point, or -1 where no piece contains it"""
+        counties = np.full(len(x), -1, dtype=np.int64)
+        for index, (min_x, min_y, max_x, max_y) in enumerate(self.piece_bboxes):
+            candidates = np.nonzero(
+                (counties < 0) & (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+            )[0]
+            if candidates.size:
+                inside = points_in_polygon(x[candidates], y[candidates], self.piece_edges[index])
+                counties[candidates[inside]] = self.piece_counties[index]
+        return counties
+
+    def sample_uniform(self, rng, count):
+        """Points spread uniformly over the county pieces"""
+        xs, ys, counties = [np.empty(0)], [np.empty(0)], [np.empty(0, dtype=np.int64)]
+        needed = count
+        while needed > 0:
+            size = max(needed * 2, 256)
+            pieces = rng.choice(len(self.piece_weights), size=size, p=self.piece_weights)
+            bboxes = self.piece_bboxes[pieces]
+            x = bboxes[:, 0] + rng.random(size) * (bboxes[:, 2] - bboxes[:, 0])
+            y = bboxes[:, 1] + rng.random(size) * (bboxes[:, 3] - bboxes[:, 1])
+
+            # Test each piece's candidates against that piece only
+            order = np.argsort(pieces, kind='stable')
+            accepted = np.zeros(size, dtype=bool)
+            groups, starts = np.unique(pieces[order], return_index=True)
+            for piece, start, end in zip(groups, starts, list(starts[1:]) + [size]):
+                members = order[start:end]
+                accepted[members] = points_in_polygon(x[members], y[members], self.piece_edges[piece])
+
+            keep = np.nonzero(accepted)[0][:needed]
+            xs.append(x[keep])
+            ys.append(y[keep])
+            counties.append(self.piece_counties[pieces[keep]])
+            needed -= keep.size
+        return np.concatenate(xs), np.concatenate(ys), np.concatenate(counties)
+
+    def sample_clustered(self, rng, count):
+        """Points normally distributed around the cluster centres, kept on land"""
+        xs, ys = [np.empty(0)], [np.empty(0)]
+        counties, centres = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        needed = count
+        while needed > 0:
+            size = max(needed * 2, 256)
+            chosen = rng.choice(len(self.centre_weights), size=size, p=self.centre_weights)
+            lng, lat = self.centre_coords[chosen].T
+            y = lat + rng.normal(size=size) * self.spread_deg
+            x = lng + rng.normal(size=size) * self.spread_deg / np.cos(np.radians(lat))
+            located = self.locate(x, y)
+
+            keep = np.nonzero(located >= 0)[0][:needed]
+            xs.append(x[keep])
+            ys.append(y[keep])
+            counties.append(located[keep])
+            centres.append(chosen[keep])
+            needed -= keep.size
+        return np.concatenate(xs), np.concatenate(ys), np.concatenate(counties), np.concatenate(centres)
+
+    def generate(self, count, seed, stream):
+        """Arrays describing `count` sites, reproducible from (seed, stream)"""
+        rng = np.random.default_rng([seed, stream])
+        clustered = int(rng.binomial(count, self.urban_share)) if self.urban_share else 0
+
+        x_urban, y_urban, county_urban, centre_urban = self.sample_clustered(rng, clustered)
+        x_rural, y_rural, county_rural = self.sample_uniform(rng, count - clustered)
+        order = rng.permutation(count)
+
+        templates = rng.integers(len(self.template_ordinals), size=count)
+        categories = self.template_categories[templates]
+        bounds = self.category_bounds[categories]
+        jitter = np.rint(rng.normal(size=count) * DATE_JITTER_DAYS).astype(np.int64)
+        ordinals = np.clip(self.template_ordinals[templates] + jitter, bounds[:, 0], bounds[:, 1])
+
+        return {
+            'lng': np.concatenate([x_urban, x_rural])[order],
+            'lat': np.concatenate([y_urban, y_rural])[order],
+            'county': np.concatenate([county_urban, county_rural])[order],
+            'centre': np.concatenate([centre_urban, np.full(count - clustered, -1)])[order],
+            'category': categories,
+            'event_type': self.template_event_types[templates],
+            'ordinal': ordinals,
+        }
+
+
+def load_sampling_model(urban_share=0.6, spread_km=5.0):
+    """
+    Build the sampling model from the loaded county pieces and real sites.
+    Raises ValueError when no county boundaries are loaded.
+    """
+    pieces = []
+    for county_id, geometry in CountyBoundaryPiece.objects.values_list('county_id', 'geometry').iterator():
+        pieces.append((county_id, geometry.extent, polygon_edges(geometry)))
+    if not pieces:
+        raise ValueError('No county boundary pieces; load county boundaries first')
+
+    real_sites = list(
+        HistoricalSite.objects.exclude(name__startswith=NAME_PREFIX)
+        .values_list('category', 'event_type', 'event_date', 'location_name', 'location')
+    )
+    if real_sites:
+        templates = [
+            (category, event_type, event_date.toordinal())
+            for category, event_type, event_date, _name, _location in real_sites
+        ]
+    else:
+        templates = [
+            (category, event_type, day)
+            for category, (start, end) in DEFAULT_PERIODS.items()
+            for event_type in DEFAULT_EVENT_TYPES
+            for day in np.linspace(start.toordinal(), end.toordinal(), 12).astype(int).tolist()
+        ]
+
+    centres = URBAN_CENTRES + [
+        (name, location.x, location.y, REAL_SITE_CENTRE_WEIGHT)
+        for _category, _event_type, _date, name, location in real_sites
+    ]
+    model = SamplingModel(pieces, centres, templates, urban_share, spread_km)
+
+    # Centres outside the loaded counties would only ever be rejected
+    on_land = model.locate(model.centre_coords[:, 0], model.centre_coords[:, 1]) >= 0 if centres else []
+    centres = [centre for centre, keep in zip(centres, on_land) if keep]
+    return SamplingModel(pieces, centres, templates, urban_share, spread_km)
+
+
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _generate_chunk(job):
+    count, seed, stream = job
+    return _worker_model.generate(count, seed, stream)
+
+
+def iter_site_chunks(model, count, seed, first_index=0, chunk_size=50000, workers=1):
+    """Yield generated chunks in order, in parallel worker processes when workers > 1"""
+    # Chunks are keyed by their first site number, so runs that continue a
+    # seed's numbering never replay an earlier chunk's random stream
+    jobs = [
+        (min(chunk_size, count - start), seed, first_index + start)
+        for start in range(0, count, chunk_size)
+    ]
+    if workers > 1 and len(jobs) > 1:
+        # Forked workers must not inherit open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)), initializer=_init_worker, initargs=(model,)
+        ) as executor:
+            yield from executor.map(_generate_chunk, jobs)
+    else:
+        for job_count, job_seed, stream in jobs:
+            yield model.generate(job_count, job_seed, stream)
+
+
+def next_synthetic_index(seed):
+    """Number of synthetic sites already generated with this seed"""
+    return HistoricalSite.objects.filter(name__startswith=f'{NAME_PREFIX} {seed}-').count()
+
+
+def write_site_chunk(model, chunk, seed, first_index, county_names):
+    """COPY one generated chunk into the sites table; returns the rows written"""
+    sites = connection.ops.quote_name(HistoricalSite._meta.db_table)
+    columns = [
+        'name', 'event_date', 'location_name', 'location', 'significance', 'category',
+        'event_type', 'county_id', 'commanders', 'images', 'sources', 'created_at', 'updated_at',
+    ]
+    now = timezone.now()
+    count = len(chunk['lng'])
+    with connection.cursor() as cursor:
+        with cursor.copy(f'COPY {sites} ({", ".join(columns)}) FROM STDIN') as copy:
+            for i in range(count):
+                centre = int(chunk['centre'][i])
+                county_id = int(chunk['county'][i])
+                event_type = model.event_types[chunk['event_type'][i]]
+                number = first_index + i + 1
+                copy.write_row((
+                    f'{NAME_PREFIX} {seed}-{number}',
+                    date.fromordinal(int(chunk['ordinal'][i])),
+                    model.centre_names[centre] if centre >= 0 else county_names[county_id],
+                    f'SRID=4326;POINT({chunk["lng"][i]:.6f} {chunk["lat"][i]:.6f})',
+                    f'Synthetic {event_type.lower()} {number} generated for load testing.',
+                    model.categories[chunk['category'][i]],
+                    event_type,
+                    county_id,
+                    '[]', '[]', '[]',
+                    now, now,
+                ))
+    return count
+
+
+def county_display_names():
+    """County id -> 'Co. Name' used as the location of rural synthetic sites"""
+    return {
+        county_id: f'Co. {name.title()}'
+        for county_id, name in CountyBoundary.objects.values_list('id', 'name')
+    }
+
+
+def generate_synthetic_sites(count, seed, model=None, chunk_size=50000, workers=1, progress=None):
+    """
+    Generate and insert `count` synthetic sites, continuing the numbering of
+    earlier runs with the same seed. Calls progress(written) after each chunk;
+    returns the number of sites written.
+    """
+    model = model or load_sampling_model()
+    county_names = county_display_names()
+    first_index = next_synthetic_index(seed)
+
+    written = 0
+    for chunk in iter_site_chunks(model, count, seed, first_index, chunk_size, workers):
+        written += write_site_chunk(model, chunk, seed, first_index + written, county_names)
+        if progress:
+            progress(written)
+    return written
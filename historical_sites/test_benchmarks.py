@@ -0,0 +1,79 @@
+"""
+The API benchmark scenarios (see benchmarks.py) run on small seeded
+datasets: every scenario must succeed, and no scenario may run more queries
+on a larger dataset. Timings are left to `manage.py benchmark_api`.
+"""
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from . import autocomplete, benchmarks, versioning
+from .caching import SHARED_CACHE_ALIAS, response_cache
+
+
+SEED = 42
+SMALL_SIZE = 200
+LARGE_SIZE = 600
+
+
+def reset_process_caches():
+    """Forget the per-process caches, so every scenario starts cold"""
+    response_cache.clear()
+    caches[SHARED_CACHE_ALIAS].clear()
+    versioning._versions.clear()
+    autocomplete._index = None
+
+
+@override_settings(
+    SPATIAL_ENGINE='postgis',
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        SHARED_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'benchmark-tests',
+        },
+    },
+)
+class BenchmarkScenarioTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        benchmarks.seed_counties()
+        benchmarks.grow_sites(SEED, SMALL_SIZE)
+        benchmarks.refresh_derived_data(neighbour_table=True)
+
+    def setUp(self):
+        reset_process_caches()
+
+    def test_scenarios_succeed(self):
+        results = benchmarks.run_benchmarks(repeat=1)
+        self.assertEqual(
+            set(results), {name for name, _method, _path, _payload in benchmarks.build_scenarios()}
+        )
+        for name, result in results.items():
+            with self.subTest(scenario=name):
+                self.assertEqual(result['status'], 200)
+                self.assertGreater(result['response_bytes'], 0)
+                self.assertGreater(result['queries'], 0)
+
+    def test_query_counts_do_not_grow_with_dataset(self):
+        small = benchmarks.run_benchmarks(repeat=1)
+
+        benchmarks.grow_sites(SEED, LARGE_SIZE)
+        benchmarks.refresh_derived_data(neighbour_table=True)
+        reset_process_caches()
+        large = benchmarks.run_benchmarks(repeat=1)
+
+        for name, result in large.items():
+            with self.subTest(scenario=name):
+                self.assertLessEqual(result['queries'], small[name]['queries'])
+
+    def test_compare_reports_flags_regressions(self):
+        result = {'p50_ms': 1.0, 'p95_ms': 10.0, 'queries': 3}
+        baseline = {'datasets': [{'sites': SMALL_SIZE, 'results': {'list': result}}]}
+        slower = {'datasets': [{'sites': SMALL_SIZE, 'results': {'list': {**result, 'p95_ms': 13.0}}}]}
+        more_queries = {'datasets': [{'sites': SMALL_SIZE, 'results': {'list': {**result, 'queries': 4}}}]}
+
+        self.assertEqual(benchmarks.compare_reports(baseline, baseline, 1.2), [])
+        self.assertEqual(len(benchmarks.compare_reports(baseline, slower, 1.2)), 1)
+        self.assertEqual(len(benchmarks.compare_reports(baseline, more_queries, 1.2)), 1)
+        self.assertEqual(benchmarks.compare_reports(baseline, slower, 1.5), [])
@@ -1,3 +1,41 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+
+from .models import HistoricalSite
+
+
+@override_settings(SPATIAL_ENGINE='postgis')
+class NearbyKnnTests(TestCase):
+    """The k nearest sites are the same whether or not the response is paginated"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Created farthest first, so the lowest ids are the farthest sites
+        HistoricalSite.objects.bulk_create([
+            HistoricalSite(
+                name=f'Site {index}',
+                event_date=date(1922, 1, 1 + index),
+                location_name=f'Place {index}',
+                location=Point(-8.0 + index * 0.01, 53.0, srid=4326),
+                significance='Test site',
+                category='CIVIL_WAR',
+                event_type='Ambush',
+            )
+            for index in reversed(range(20))
+        ])
+        cls.nearest_ids = set(
+            HistoricalSite.objects.filter(name__in=[f'Site {index}' for index in range(5)])
+            .values_list('id', flat=True)
+        )
+
+    def nearby_ids(self, query):
+        response = self.client.get(f'/api/sites/nearby/?lat=53.0&lng=-8.0&k=5{query}')
+        self.assertEqual(response.status_code, 200)
+        return {site['id'] for site in response.json()['sites']}
+
+    def test_paginated_knn_matches_unpaginated(self):
+        unpaginated = self.nearby_ids('')
+        self.assertEqual(unpaginated, self.nearest_ids)
+        self.assertEqual(self.nearby_ids('&page_size=100'), unpaginated)
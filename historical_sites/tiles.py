@@ -0,0 +1,110 @@
+from django.db import connection
+
+from .models import CountyBoundary, HistoricalSite
+
+
+# Tile extent and clipping buffer (in tile pixels) passed to ST_AsMVTGeom
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+MAX_TILE_ZOOM = 22
+
+# Vector tile layers: source table, geometry column and attributes per zoom.
+# Simplified layers render the county geometry level matching the tile zoom.
+# Each attribute entry is (minimum zoom, SQL expression, attribute name) so that
+# zoomed-out tiles only carry what the map needs to style a feature.
+TILE_LAYERS = {
+    'sites': {
+        'model': HistoricalSite,
+        'geometry': 'location',
+        'attributes': [
+            (0, 'id', 'id'),
+            (0, 'category', 'category'),
+            (8, 'name', 'name'),
+            (8, 'event_type', 'event_type'),
+            (11, 'event_date::text', 'event_date'),
+            (11, 'location_name', 'location_name'),
+        ],
+    },
+    'counties': {
+        'model': CountyBoundary,
+        'geometry': 'geometry',
+        'simplified': True,
+        'attributes': [
+            (0, 'id', 'id'),
+            (0, 'name', 'name'),
+        ],
+    },
+}
+
+
+def is_valid_tile(z, x, y):
+    """Check that z/x/y addresses an existing tile in the XYZ tile scheme"""
+    if not 0 <= z <= MAX_TILE_ZOOM:
+        return False
+    limit = 2 ** z
+    return 0 <= x < limit and 0 <= y < limit
+
+
+def get_layer_attributes(layer, zoom):
+    """Return the (SQL expression, attribute name) pairs included at a zoom level"""
+    return [
+        (expression, attribute)
+        for min_zoom, expression, attribute in TILE_LAYERS[layer]['attributes']
+        if zoom >= min_zoom
+    ]
+
+
+def build_tile_sql(layer, zoom):
+    """Build the ST_AsMVT query for a layer, trimming attributes for the zoom level"""
+    config = TILE_LAYERS[layer]
+    table = connection.ops.quote_name(config['model']._meta.db_table)
+    geometry = connection.ops.quote_name(config['geometry'])
+    rendered = f't.{geometry}'
+    if config.get('simplified'):
+        simplified = CountyBoundary.get_geometry_field(zoom=zoom)
+        if simplified != config['geometry']:
+            rendered = f'COALESCE(t.{connection.ops.quote_name(simplified)}, t.{geometry})'
+    columns = ', '.join(
+        f't.{expression} AS {connection.ops.quote_name(attribute)}'
+        for expression, attribute in get_layer_attributes(layer, zoom)
+    )
+
+    # The envelope is expanded by the clip buffer and transformed back to
+    # EPSG:4326 so the bounding box test can use the GiST index on the column.
+    return f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS tile,
+                   ST_Transform(
+                       ST_TileEnvelope(%(z)s, %(x)s, %(y)s, margin => %(margin)s), 4326
+                   ) AS search
+        ),
+        features AS (
+            SELECT ST_AsMVTGeom(
+                       ST_Transform({rendered}, 3857), bounds.tile,
+                       %(extent)s, %(buffer)s, true
+                   ) AS geom,
+                   {columns}
+            FROM {table} t, bounds
+            WHERE t.{geometry} && bounds.search
+        )
+        SELECT ST_AsMVT(features.*, %(layer)s, %(extent)s, 'geom')
+        FROM features
+        WHERE features.geom IS NOT NULL
+    """
+
+
+def render_tile(layer, z, x, y):
+    """Render a single Mapbox Vector Tile for a layer and return its bytes"""
+    params = {
+        'z': z,
+        'x': x,
+        'y': y,
+        'layer': layer,
+        'extent': TILE_EXTENT,
+        'buffer': TILE_BUFFER,
+        'margin': TILE_BUFFER / TILE_EXTENT,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(build_tile_sql(layer, z), params)
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] else b''
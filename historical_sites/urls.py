@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 # Initialize DRF router
 router = DefaultRouter()
@@ -11,5 +11,16 @@ router.register(r'county-boundaries', views.CountyBoundaryViewSet, basename='cou
 # Define URL patterns
 urlpatterns = [
     path('', views.MapView.as_view(), name='map'),  # Main map view
+    path(
+        'tiles/<str:layer>/<int:z>/<int:x>/<int:y>.mvt',
+        views.VectorTileView.as_view(),
+        name='vector-tile'
+    ),  # Mapbox Vector Tiles
+    path('autocomplete/', views.AutocompleteView.as_view(), name='autocomplete'),  # Type-ahead
+    # Async read-only site endpoints (for ASGI servers)
+    path('async/sites/', async_views.site_list, name='async-site-list'),
+    path('async/sites/nearby/', async_views.site_nearby, name='async-site-nearby'),
+    path('async/sites/timeline/', async_views.site_timeline, name='async-site-timeline'),
+    path('async/sites/<int:pk>/', async_views.site_detail, name='async-site-detail'),
     path('', include(router.urls)),  # Include API endpoints
 ]
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DatasetVersion
+
+
+# Per-process memo of dataset versions: name -> (version, updated_at, token, checked_at).
+# Versions are re-read from the database at most once per check interval, so a
+# cache lookup keyed by version normally costs a dictionary access.
+_versions = {}
+
+
+def get_dataset_version(name):
+    """
+    Return (version, updated_at, token) for a dataset, memoised for the check
+    interval. The token is random per database row, so cache keys built from
+    it differ between databases whose version counters happen to match.
+    """
+    now = time.monotonic()
+    interval = getattr(settings, 'DATASET_VERSION_CHECK_INTERVAL', 2.0)
+    memo = _versions.get(name)
+    if memo is not None and now - memo[3] < interval:
+        return memo[:3]
+
+    row = DatasetVersion.objects.filter(name=name).values_list('version', 'updated_at', 'token').first()
+    if row is None:
+        # Datasets never bumped still get a row, and with it a token of their own
+        dataset, _created = DatasetVersion.objects.get_or_create(name=name)
+        row = (dataset.version, dataset.updated_at, dataset.token)
+    version, updated_at, token = row
+    _versions[name] = (version, updated_at, token.hex, now)
+    return version, updated_at, token.hex
+
+
+def bump_dataset_version(name):
+    """Increment a dataset version so cached responses built from it are discarded"""
+    DatasetVersion.objects.get_or_create(name=name)
+    DatasetVersion.objects.filter(name=name).update(
+        version=F('version') + 1,
+        updated_at=timezone.now()
+    )
+    _versions.pop(name, None)
+    return get_dataset_version(name)[0]
@@ -1,20 +1,47 @@
-from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.db.models import GeometryField
+from django.conf import settings
+from django.contrib.gis.db.models.functions import AsGeoJSON
 from django.contrib.gis.geos import Point, Polygon
-from django.contrib.gis.measure import Distance as D
+from django.db.models import Count, Subquery, Window
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views import View
 from django.views.generic import TemplateView
 import django_filters
 from django_filters import rest_framework as filters
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 
-from .models import CountyBoundary, HistoricalSite
+from . import clustering, streaming, tiles
+from .autocomplete import autocomplete
+from .batch import run_batch_queries
+from .caching import ConditionalGetMixin, cached_json_response
+from .exports import (
+    COUNTY_COLORS,
+    FlatGeobufMixin,
+    cached_export,
+    export_file_response,
+    uncached_export_response,
+    write_counties,
+    write_sites
+)
+from .facets import compute_facets
+from .memory_engine import get_spatial_engine
+from .models import CountyBoundary, DatasetVersion, HistoricalSite
+from .pagination import KeysetPagination
+from .renderers import GeoJSONRenderer
+from .search import search_sites, with_headline
+from .spatial import filter_within_distance, geography_distance, geography_knn
 from .serializers import (
     CountyBoundarySerializer,
     HistoricalSiteGeoJSONSerializer,
     HistoricalSiteDetailSerializer,
-    HistoricalSiteListSerializer
+    HistoricalSiteListSerializer,
+    site_list_values,
+    with_coordinates
 )
 
 
@@ -30,24 +57,152 @@ class HistoricalSiteFilter(django_filters.FilterSet):
         fields = ['category', 'event_type', 'event_date_from', 'event_date_to', 'county']
     
     def filter_by_county(self, queryset, name, value):
-        """Filter sites by county using spatial point-in-polygon queries"""
+        """Filter sites by their denormalised county (indexed equality, no spatial query)"""
         if not value:
             return queryset
         
-        try:
-            county_boundary = CountyBoundary.objects.get(name__iexact=value)
-            return queryset.filter(location__within=county_boundary.geometry)
-        except CountyBoundary.DoesNotExist:
-            return queryset.none()
+        # The county id is resolved by an uncorrelated subquery inside the same
+        # statement, so building the filtered queryset never touches the
+        # database (and stays usable from async views)
+        county_id = CountyBoundary.objects.filter(
+            name__iexact=value.strip()
+        ).values('id')[:1]
+        return queryset.filter(county_id=Subquery(county_id))
+
+
+
+def parse_nearby_params(params):
+    """
+    Validate proximity search parameters and return (latitude, longitude,
+    k, radius_km); k or radius_km may be None. Raises ValueError with the
+    message returned to the client.
+    """
+    try:
+        latitude = float(params.get('lat'))
+        longitude = float(params.get('lng'))
+        
+        k = params.get('k', params.get('limit'))
+        k = int(k) if k is not None else None
+        radius_km = params.get('radius_km')
+        if radius_km is not None or k is None:
+            radius_km = float(radius_km if radius_km is not None else 50)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Invalid parameter: {str(e)}')
+    
+    if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+        raise ValueError('Invalid coordinates')
+    
+    if radius_km is not None and (radius_km <= 0 or radius_km > 500):
+        raise ValueError('Invalid radius (must be 0-500 km)')
+    
+    max_results = settings.NEARBY_MAX_RESULTS
+    if k is not None and not 1 <= k <= max_results:
+        raise ValueError(f'Invalid k (must be 1-{max_results})')
+    
+    return latitude, longitude, k, radius_km
+
+
+def nearby_queryset(latitude, longitude, radius_km):
+    """Sites annotated with distance_m, within radius_km if given, closest first"""
+    user_point = Point(longitude, latitude, srid=4326)
+    
+    nearby_sites = HistoricalSite.objects.annotate(
+        distance_m=geography_distance(user_point)
+    )
+    if radius_km is not None:
+        nearby_sites = filter_within_distance(nearby_sites, user_point, radius_km * 1000)
+    return nearby_sites.order_by(geography_knn(user_point), 'id')
+
+
+def nearest_only(nearby_sites, k):
+    """
+    Restrict a proximity queryset to its k nearest sites (k is at most
+    NEARBY_MAX_RESULTS), so the result can still be re-ordered and
+    keyset-paginated. The ids are fetched by a separate KNN query: the raw
+    distance SQL names the site table, which a subquery would alias.
+    """
+    if k is None:
+        return nearby_sites
+    return nearby_sites.filter(id__in=list(nearby_sites.values_list('id', flat=True)[:k]))
+
+
+def nearby_extra(latitude, longitude, k, radius_km):
+    """Search parameters echoed in proximity search responses"""
+    extra = {
+        'radius_km': radius_km,
+        'center': {'latitude': latitude, 'longitude': longitude}
+    }
+    if k is not None:
+        extra['k'] = k
+    return extra
+
+
+def nearby_rows(nearby_sites, k, radius_km):
+    """
+    Fast-path rows of a proximity search. One query returns the rows and,
+    for a radius search, the total number of matches through a window count.
+    """
+    fields = ['distance_m']
+    if radius_km is not None:
+        nearby_sites = nearby_sites.annotate(total=Window(expression=Count('id')))
+        fields.append('total')
+    return site_list_values(nearby_sites, *fields)[:k or settings.NEARBY_MAX_RESULTS]
+
+
+def finish_nearby_rows(sites, radius_km):
+    """Convert distances to km in place and return the total match count"""
+    count = sites[0]['total'] if sites and radius_km is not None else len(sites)
+    for site in sites:
+        site.pop('total', None)
+        site['distance_km'] = round(site.pop('distance_m') / 1000, 3)
+    return count
+
 
+def polygon_queryset(polygon):
+    """Sites inside a polygon, in keyset order"""
+    return HistoricalSite.objects.filter(location__within=polygon).order_by('event_date', 'id')
 
 
-class HistoricalSiteViewSet(viewsets.ReadOnlyModelViewSet):
+def buffer_zone_queryset(center_site, buffer_km):
+    """
+    Other sites within buffer_km of a site, in keyset order. Radii up to
+    SITE_NEIGHBOUR_MAX_KM are answered from the precomputed neighbour table
+    when the site's capped neighbour list is complete that far out; other
+    radii use an indexed geography radius query.
+    """
+    radius_m = center_site.neighbour_radius_m
+    if (
+        buffer_km <= settings.SITE_NEIGHBOUR_MAX_KM
+        and radius_m is not None
+        and buffer_km * 1000 < radius_m
+    ):
+        nearby = HistoricalSite.objects.filter(
+            neighbour_of_links__site_id=center_site.id,
+            neighbour_of_links__distance_m__lte=buffer_km * 1000
+        )
+    else:
+        nearby = filter_within_distance(
+            HistoricalSite.objects.exclude(id=center_site.id),
+            center_site.location,
+            buffer_km * 1000
+        )
+    return nearby.order_by('event_date', 'id')
+
+
+
+class HistoricalSiteViewSet(ConditionalGetMixin, FlatGeobufMixin, viewsets.ReadOnlyModelViewSet):
     """API ViewSet for Historical Sites with spatial filtering"""
-    queryset = HistoricalSite.objects.all().order_by('event_date')
+    # Site payloads and the county filter depend on both datasets
+    conditional_datasets = (DatasetVersion.HISTORICAL_SITES, DatasetVersion.COUNTY_BOUNDARIES)
+    # The unfiltered, unpaginated site list (JSON or ?format=geojson),
+    # timeline and categories are stored precompressed
+    compressed_actions = ('list', 'timeline', 'categories')
+    flatgeobuf_actions = ('list',)
+    queryset = HistoricalSite.objects.all().order_by('event_date', 'id')
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = HistoricalSiteFilter
-    pagination_class = None
+    pagination_class = KeysetPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, GeoJSONRenderer]
     
     def get_serializer_class(self):
         """Return appropriate serializer based on format"""
@@ -57,55 +212,205 @@ class HistoricalSiteViewSet(viewsets.ReadOnlyModelViewSet):
             return HistoricalSiteDetailSerializer
         return HistoricalSiteListSerializer
     
+    def get_queryset(self):
+        """Compute detail coordinates in SQL instead of loading the location geometry"""
+        queryset = super().get_queryset()
+        if self.action == 'retrieve' and self.format_kwarg != 'geojson':
+            queryset = with_coordinates(queryset.defer('location', 'search_vector'))
+        return queryset
+    
+    def uses_fast_list_path(self):
+        """Whether responses use the list serializer shape, served from .values() rows"""
+        return self.get_serializer_class() is HistoricalSiteListSerializer
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List sites, stream them as GeoJSON/NDJSON with ?stream=geojson|ndjson,
+        or export them as FlatGeobuf with ?format=fgb
+        """
+        if self.wants_flatgeobuf():
+            return self.flatgeobuf_response()
+        
+        stream_format = request.query_params.get('stream')
+        if stream_format is None:
+            if not self.uses_fast_list_path():
+                return super().list(request, *args, **kwargs)
+            
+            # A lone ?county= filter can be answered by the in-memory engine
+            fingerprint = self.get_filter_fingerprint()
+            county = request.query_params.get('county', '').strip()
+            if county and len(fingerprint) == 1 and fingerprint[0][0] == 'county':
+                engine = self.get_spatial_engine()
+                if engine is not None:
+                    return Response(engine.county_sites(county))
+            
+            rows = site_list_values(self.filter_queryset(self.get_queryset()))
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(list(rows))
+        
+        if stream_format not in streaming.STREAM_FORMATS:
+            return Response(
+                {'error': f'Invalid stream format (use {", ".join(streaming.STREAM_FORMATS)})'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        return streaming.streaming_sites_response(queryset, stream_format)
+    
+    def flatgeobuf_response(self):
+        """
+        FlatGeobuf of the filtered sites (pagination does not apply). The
+        unfiltered export is cached per site dataset version.
+        """
+        if not self.get_filter_fingerprint():
+            path = cached_export(
+                'sites',
+                DatasetVersion.HISTORICAL_SITES,
+                lambda out: write_sites(out, self.get_queryset())
+            )
+            return export_file_response(path)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        return uncached_export_response(lambda out: write_sites(out, queryset))
+    
+    def get_filter_fingerprint(self):
+        """Hashable key of the HistoricalSiteFilter parameters of the request"""
+        return tuple(sorted(
+            (name, tuple(values))
+            for name, values in self.request.query_params.lists()
+            if name in self.filterset_class.base_filters
+        ))
+    
+    def get_spatial_engine(self):
+        """The in-memory spatial engine, when enabled and the response is an unpaginated fast-path list"""
+        if not self.uses_fast_list_path() or self.paginator.is_requested(self.request):
+            return None
+        return get_spatial_engine()
+    
+    def get_sites_response(self, queryset, **extra):
+        """Build a {count, ..., sites} response, keyset-paginated when requested"""
+        fast_path = self.uses_fast_list_path()
+        if fast_path:
+            queryset = site_list_values(queryset)
+        
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            if fast_path:
+                sites = list(queryset)
+                return Response({'count': len(sites), **extra, 'sites': sites})
+            serializer = self.get_serializer(queryset, many=True)
+            return Response({'count': queryset.count(), **extra, 'sites': serializer.data})
+        
+        # Paginated responses count the current page only; a total would need
+        # a full scan on every page
+        sites = page if fast_path else self.get_serializer(page, many=True).data
+        return Response({
+            'count': len(page),
+            'next': self.paginator.get_next_link(),
+            **extra,
+            'sites': sites
+        })
+    
     @action(detail=False, methods=['post', 'get'])
     def nearby(self, request):
-        """Find sites within a specified radius of a point (proximity search)"""
+        """
+        Find sites within a specified radius of a point (proximity search).
+        With `k` (or `limit`) only the k closest sites are returned, using the
+        KNN operator on the geography index; the radius is then optional.
+        Results are ordered by distance, or by (event_date, id) when paginated.
+        """
+        params = request.query_params if request.method == 'GET' else request.data
         try:
-            if request.method == 'GET':
-                latitude = float(request.query_params.get('lat'))
-                longitude = float(request.query_params.get('lng'))
-                radius_km = float(request.query_params.get('radius_km', 50))
-            else:
-                latitude = float(request.data.get('lat'))
-                longitude = float(request.data.get('lng'))
-                radius_km = float(request.data.get('radius_km', 50))
-            
-            if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
-                return Response(
-                    {'error': 'Invalid coordinates'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            if radius_km <= 0 or radius_km > 500:
+            latitude, longitude, k, radius_km = parse_nearby_params(params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        extra = nearby_extra(latitude, longitude, k, radius_km)
+        engine = self.get_spatial_engine()
+        if engine is not None:
+            sites, count = engine.nearby(latitude, longitude, k, radius_km)
+            return Response({'count': count, **extra, 'sites': sites})
+        
+        nearby_sites = nearby_queryset(latitude, longitude, radius_km)
+        if not self.uses_fast_list_path() or self.paginator.is_requested(request):
+            return self.get_sites_response(nearest_only(nearby_sites, k), **extra)
+        
+        sites = list(nearby_rows(nearby_sites, k, radius_km))
+        count = finish_nearby_rows(sites, radius_km)
+        return Response({'count': count, **extra, 'sites': sites})
+
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over name, location, significance and
+        description. Composes with the HistoricalSiteFilter parameters and an
+        optional radius (lat, lng, radius_km) or bbox, so one query answers
+        e.g. ?q=Collins&event_type=Ambush&county=Cork.
+        """
+        params = request.query_params
+        text = (params.get('q') or '').strip()
+        if not text:
+            return Response(
+                {'error': 'Missing search query (q)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            max_results = settings.SEARCH_MAX_RESULTS
+            limit = int(params.get('limit', 20))
+            if not 1 <= limit <= max_results:
                 return Response(
-                    {'error': 'Invalid radius (must be 0-500 km)'},
+                    {'error': f'Invalid limit (must be 1-{max_results})'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            user_point = Point(longitude, latitude, srid=4326)
-            
-            nearby_sites = HistoricalSite.objects.filter(
-                location__distance_lte=(user_point, D(km=radius_km))
-            ).annotate(
-                distance=Distance('location', user_point)
-            ).order_by('distance')
-            
-            serializer = self.get_serializer(nearby_sites, many=True)
+            queryset = self.filter_queryset(self.get_queryset())
             
-            return Response({
-                'count': nearby_sites.count(),
-                'radius_km': radius_km,
-                'center': {'latitude': latitude, 'longitude': longitude},
-                'sites': serializer.data
-            })
+            if 'lat' in params or 'lng' in params:
+                latitude = float(params.get('lat'))
+                longitude = float(params.get('lng'))
+                radius_km = float(params.get('radius_km', 50))
+                if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+                    return Response(
+                        {'error': 'Invalid coordinates'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if radius_km <= 0 or radius_km > 500:
+                    return Response(
+                        {'error': 'Invalid radius (must be 0-500 km)'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                queryset = filter_within_distance(
+                    queryset, Point(longitude, latitude, srid=4326), radius_km * 1000
+                )
             
+            if 'bbox' in params:
+                bbox = [float(value) for value in params.get('bbox').split(',')]
+                if len(bbox) != 4:
+                    raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat')
+                queryset = queryset.filter(location__within=Polygon.from_bbox(bbox))
         except (TypeError, ValueError) as e:
             return Response(
                 {'error': f'Invalid parameter: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-
+        
+        # Rows, total match count and snippets come from one query; snippets
+        # are only generated for the returned page
+        results = search_sites(queryset, text).annotate(total=Window(expression=Count('id')))
+        sites = list(site_list_values(
+            with_headline(results, text), 'rank', 'headline', 'total'
+        )[:limit])
+        
+        count = sites[0]['total'] if sites else 0
+        for site in sites:
+            site.pop('total')
+        
+        return Response({'count': count, 'query': text, 'sites': sites})
+    
     @action(detail=False, methods=['get'])
     def timeline(self, request):
         """Get sites within a date range"""
@@ -119,24 +424,77 @@ class HistoricalSiteViewSet(viewsets.ReadOnlyModelViewSet):
         if end_date:
             queryset = queryset.filter(event_date__lte=end_date)
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            'count': queryset.count(),
-            'date_range': {'start': start_date, 'end': end_date},
-            'sites': serializer.data
-        })
+        return self.get_sites_response(
+            queryset,
+            date_range={'start': start_date, 'end': end_date}
+        )
 
 
     @action(detail=False, methods=['get'])
     def categories(self, request):
-        """Get all available categories with counts"""
-        categories = {}
-        for site in self.get_queryset():
-            cat = site.get_category_display()
-            if cat not in categories:
-                categories[cat] = 0
-            categories[cat] += 1
-        return Response(categories)
+        """Get all available categories with counts (derived from the facet counts)"""
+        facets = compute_facets(self.get_queryset())
+        return Response({item['label']: item['count'] for item in facets['category']})
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Counts by category, event type, county, year and month for the sites
+        matching the HistoricalSiteFilter parameters, from one GROUPING SETS
+        query. Results are cached per filter fingerprint and dataset version.
+        """
+        return cached_json_response(
+            request,
+            (DatasetVersion.HISTORICAL_SITES, DatasetVersion.COUNTY_BOUNDARIES),
+            ('facets', self.get_filter_fingerprint()),
+            lambda: compute_facets(self.filter_queryset(self.get_queryset()))
+        )
+    
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """
+        Grid clusters of the sites in a bounding box for zoomed-out map views.
+        Each cluster carries its centroid, site count and category breakdown.
+        """
+        try:
+            bbox = [float(value) for value in request.query_params.get('bbox', '').split(',')]
+            zoom = int(request.query_params.get('zoom'))
+            if len(bbox) != 4:
+                raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat')
+        except (TypeError, ValueError) as e:
+            return Response(
+                {'error': f'Invalid parameter: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        min_lng, min_lat, max_lng, max_lat = bbox
+        if not (-180 <= min_lng <= max_lng <= 180 and -90 <= min_lat <= max_lat <= 90):
+            return Response(
+                {'error': 'Invalid bbox'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not 0 <= zoom <= clustering.MAX_CLUSTER_ZOOM:
+            return Response(
+                {'error': f'Invalid zoom (must be 0-{clustering.MAX_CLUSTER_ZOOM})'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(clustering.tiles_for_bbox(bbox, zoom)) > settings.CLUSTER_MAX_TILES:
+            return Response(
+                {'error': 'Bounding box too large for this zoom level'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        clusters = clustering.get_clusters(queryset, zoom, bbox, self.get_filter_fingerprint())
+        
+        return Response({
+            'zoom': zoom,
+            'cell_size': clustering.tile_size(zoom) / clustering.GRID_SIZE,
+            'count': sum(cluster['count'] for cluster in clusters),
+            'clusters': clusters
+        })
     
     @action(detail=False, methods=['post'])
     def in_polygon(self, request):
@@ -145,11 +503,11 @@ class HistoricalSiteViewSet(viewsets.ReadOnlyModelViewSet):
         try:
             rings = [(lng, lat) for lat, lng in polygon_coords]
             polygon = Polygon(rings)
-            sites = HistoricalSite.objects.filter(location__within=polygon)
-            return Response({
-                'count': sites.count(),
-                'sites': self.get_serializer(sites, many=True).data
-            })
+            engine = self.get_spatial_engine()
+            if engine is not None:
+                sites = engine.in_polygon(polygon)
+                return Response({'count': len(sites), 'sites': sites})
+            return self.get_sites_response(polygon_queryset(polygon))
         except (ValueError, IndexError) as e:
             return Response(
                 {'error': str(e)},
@@ -157,9 +515,32 @@ class HistoricalSiteViewSet(viewsets.ReadOnlyModelViewSet):
             )
 
 
+    @action(detail=False, methods=['post'])
+    def batch_query(self, request):
+        """
+        Run many radius, polygon and bbox queries in one SQL statement.
+        Results are keyed by query id and list matching site ids; site
+        payloads are returned once in `sites`. HistoricalSiteFilter query
+        parameters restrict the sites considered by every query.
+        """
+        queryset = None
+        if self.get_filter_fingerprint():
+            queryset = self.filter_queryset(self.get_queryset())
+        try:
+            return Response(run_batch_queries(request.data.get('queries'), queryset))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
     @action(detail=False, methods=['get'])
     def buffer_zone(self, request):
-        """Find sites within buffer zone of another site"""
+        """
+        Find sites within buffer zone of another site (see
+        buffer_zone_queryset), from the in-memory engine when enabled.
+        """
         site_id = request.query_params.get('site_id')
         buffer_km = float(request.query_params.get('buffer_km', 20))
         
@@ -169,27 +550,37 @@ class HistoricalSiteViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        engine = self.get_spatial_engine()
+        if engine is not None and str(site_id).isdigit():
+            try:
+                center, sites = engine.buffer_zone(int(site_id), buffer_km)
+            except KeyError:
+                return Response(
+                    {'error': 'Site not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response({
+                'count': len(sites),
+                'center_site': center['name'],
+                'center_location': {'latitude': center['latitude'], 'longitude': center['longitude']},
+                'buffer_km': buffer_km,
+                'sites': sites
+            })
+        
         try:
-            center_site = HistoricalSite.objects.get(id=site_id)
-            buffer_degrees = buffer_km / 111.0
-            buffer_zone = center_site.location.buffer(buffer_degrees)
+            center_site = HistoricalSite.objects.only(
+                'id', 'name', 'location', 'neighbour_radius_m'
+            ).get(id=site_id)
             
-            nearby = HistoricalSite.objects.filter(
-                location__within=buffer_zone
-            ).exclude(id=site_id).order_by('event_date')
-            
-            serializer = self.get_serializer(nearby, many=True)
-            
-            return Response({
-                'count': nearby.count(),
-                'center_site': center_site.name,
-                'center_location': {
+            return self.get_sites_response(
+                buffer_zone_queryset(center_site, buffer_km),
+                center_site=center_site.name,
+                center_location={
                     'latitude': center_site.get_latitude(),
                     'longitude': center_site.get_longitude()
                 },
-                'buffer_km': buffer_km,
-                'sites': serializer.data
-            })
+                buffer_km=buffer_km
+            )
         except HistoricalSite.DoesNotExist:
             return Response(
                 {'error': 'Site not found'},
@@ -215,19 +606,76 @@ class MapView(TemplateView):
 
 
 
-class CountyBoundaryViewSet(viewsets.ReadOnlyModelViewSet):
+class VectorTileView(View):
+    """Mapbox Vector Tiles for sites and county boundaries built with ST_AsMVT"""
+    content_type = 'application/vnd.mapbox-vector-tile'
+    
+    def get(self, request, layer, z, x, y):
+        if layer not in tiles.TILE_LAYERS or not tiles.is_valid_tile(z, x, y):
+            raise Http404('Tile not found')
+        
+        tile = tiles.render_tile(layer, z, x, y)
+        
+        # Empty tiles are answered with 204 so map clients skip decoding them
+        if not tile:
+            return HttpResponse(status=204)
+        return HttpResponse(tile, content_type=self.content_type)
+
+
+class AutocompleteView(View):
+    """
+    Type-ahead suggestions for site names, place names and counties, served
+    from the per-process prefix index (plain Django view to keep per-keystroke
+    overhead minimal).
+    """
+    
+    def get(self, request):
+        text = request.GET.get('q', '').strip()
+        max_results = settings.AUTOCOMPLETE_MAX_RESULTS
+        try:
+            limit = int(request.GET.get('limit', max_results))
+        except ValueError:
+            limit = max_results
+        limit = max(1, min(limit, max_results))
+        
+        suggestions = autocomplete(text, limit) if text else []
+        return JsonResponse({'query': text, 'suggestions': suggestions})
+
+
+
+class CountyBoundaryViewSet(ConditionalGetMixin, FlatGeobufMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoint for county boundary polygons (GeoJSON format)"""
-    queryset = CountyBoundary.objects.all()
+    conditional_datasets = (DatasetVersion.COUNTY_BOUNDARIES,)
+    compressed_actions = ('list', 'geojson')
+    flatgeobuf_actions = ('list', 'geojson_with_colors')
+    queryset = CountyBoundary.objects.defer(
+        *[field for field, _tolerance, _zoom in CountyBoundary.SIMPLIFICATION_LEVELS]
+    )
     serializer_class = CountyBoundarySerializer
     pagination_class = None
     
+    def list(self, request, *args, **kwargs):
+        """List county boundaries, or export them as FlatGeobuf with ?format=fgb"""
+        if not self.wants_flatgeobuf():
+            return super().list(request, *args, **kwargs)
+        
+        try:
+            geometry_field = self.get_geometry_field(request)
+        except (TypeError, ValueError) as e:
+            return Response(
+                {'error': f'Invalid parameter: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self.flatgeobuf_response(geometry_field)
+    
     @action(detail=False, methods=['get'])
     def geojson(self, request):
         """Return all county boundaries as GeoJSON FeatureCollection"""
         from django.contrib.gis.serializers import geojson
-        counties = self.get_queryset()
+        # Only the full geometry and the name, as before the simplified levels existed
+        counties = self.get_queryset().only('id', 'name', 'geometry')
         return Response(
-            geojson.serialize('geojson', counties, geometry_field='geometry')
+            geojson.serialize('geojson', counties, geometry_field='geometry', fields=('name',))
         )
     
     @action(detail=False, methods=['get'])
@@ -235,32 +683,79 @@ class CountyBoundaryViewSet(viewsets.ReadOnlyModelViewSet):
         """Return county boundaries as GeoJSON FeatureCollection with color properties"""
         import json
         
-        colors = [
-            '#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8',
-            '#F7DC6F', '#BB8FCE', '#85C1E2', '#F8B88B', '#A3E4D7',
-            '#F1948A', '#85C1E2', '#F7DC6F', '#D7BDE2', '#A9DFBF',
-            '#F8B88B', '#AED6F1', '#F1948A', '#D5A6BD', '#FAD7A0',
-            '#85C1E2', '#F7DC6F', '#BB8FCE', '#A9CCE3', '#F8B88B',
-            '#F1948A', '#AED6F1'
-        ]
-        
-        counties = self.get_queryset()
-        features = []
-        
-        for idx, county in enumerate(counties):
-            geom_json = json.loads(county.geometry.geojson)
-            feature = {
-                'type': 'Feature',
-                'properties': {
-                    'name': county.name,
-                    'color': colors[idx % len(colors)],
-                    'id': county.id
-                },
-                'geometry': geom_json
+        try:
+            geometry_field = self.get_geometry_field(request)
+        except (TypeError, ValueError) as e:
+            return Response(
+                {'error': f'Invalid parameter: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if self.wants_flatgeobuf():
+            return self.flatgeobuf_response(geometry_field)
+        
+        def build_feature_collection():
+            # Fall back to the full geometry for counties without a simplified level
+            geometry = geometry_field
+            if geometry_field != 'geometry':
+                geometry = Coalesce(geometry_field, 'geometry', output_field=GeometryField(srid=4326))
+            
+            counties = self.get_queryset().only('id', 'name').annotate(
+                geometry_geojson=AsGeoJSON(geometry)
+            )
+            features = []
+            
+            for idx, county in enumerate(counties):
+                geom_json = json.loads(county.geometry_geojson)
+                feature = {
+                    'type': 'Feature',
+                    'properties': {
+                        'name': county.name,
+                        'color': COUNTY_COLORS[idx % len(COUNTY_COLORS)],
+                        'id': county.id
+                    },
+                    'geometry': geom_json
+                }
+                features.append(feature)
+            
+            return {
+                'type': 'FeatureCollection',
+                'features': features
             }
-            features.append(feature)
         
-        return Response({
-            'type': 'FeatureCollection',
-            'features': features
-        })
+        # Boundaries only change on import, so the encoded bytes are cached per
+        # dataset version and geometry level
+        return cached_json_response(
+            request,
+            DatasetVersion.COUNTY_BOUNDARIES,
+            ('geojson_with_colors', geometry_field),
+            build_feature_collection
+        )
+    
+    def flatgeobuf_response(self, geometry_field):
+        """FlatGeobuf of the coloured counties at a geometry level, cached per dataset version"""
+        path = cached_export(
+            f'counties-{geometry_field}',
+            DatasetVersion.COUNTY_BOUNDARIES,
+            lambda out: write_counties(out, self.get_queryset(), geometry_field)
+        )
+        return export_file_response(path)
+    
+    def get_geometry_field(self, request):
+        """Pick the simplified geometry level from ?zoom= or ?tolerance= (degrees)"""
+        zoom = request.query_params.get('zoom')
+        tolerance = request.query_params.get('tolerance')
+        
+        if zoom is not None:
+            zoom = int(zoom)
+            if not 0 <= zoom <= 22:
+                raise ValueError('zoom must be 0-22')
+            return CountyBoundary.get_geometry_field(zoom=zoom)
+        
+        if tolerance is not None:
+            tolerance = float(tolerance)
+            if tolerance < 0:
+                raise ValueError('tolerance must not be negative')
+            return CountyBoundary.get_geometry_field(tolerance=tolerance)
+        
+        return 'geometry'
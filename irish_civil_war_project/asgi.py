@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'irish_civil_war_project.settings')
+# Lets the settings pick ASGI-safe defaults (per-request database connections)
+os.environ['DJANGO_ASGI'] = 'True'
 
 application = get_asgi_application()
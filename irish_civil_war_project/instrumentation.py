@@ -0,0 +1,193 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware measures each request's total time, SQL query count and
+time, render time and response size. It reports them to the client in a
+Server-Timing header and records them in Prometheus histograms, which the
+/metrics view exposes. Requests over the query or latency budget are logged
+together with their SQL.
+
+Queries are captured by a database execute wrapper installed on every
+connection. The wrapper reports to a collector held in a context variable,
+which asgiref carries into the threads where async views run ORM calls.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+logger = logging.getLogger(__name__)
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency',
+    ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL queries per request',
+    ['view'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_queries', 'SQL queries per request',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+REQUEST_RENDER_DURATION = Histogram(
+    'http_request_render_duration_seconds', 'Response rendering time per request',
+    ['view'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size',
+    ['view'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+OVER_BUDGET = Counter(
+    'http_requests_over_budget_total', 'Requests over the query-count or latency budget',
+    ['view', 'budget'],
+)
+
+
+class QueryCollector:
+    """SQL statistics of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        if len(self.queries) < settings.PERF_LOGGED_QUERIES:
+            self.queries.append((duration, sql))
+
+
+_collector = ContextVar('query_collector', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper timing each query for the current request"""
+    collector = _collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        collector.record(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Install the execute wrapper on every database connection"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class PerformanceMiddleware:
+    """Server-Timing header, Prometheus histograms and budget logging per request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        collector, token, started = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self.finish(request, response, collector, started)
+
+    async def __acall__(self, request):
+        collector, token, started = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self.finish(request, response, collector, started)
+
+    def start(self, request):
+        collector = QueryCollector()
+        return collector, _collector.set(collector), time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Called after the view and before the response (template or DRF
+        # Response) is rendered; the remainder of the request is rendering
+        request._perf_view_finished = time.perf_counter()
+        return response
+
+    def finish(self, request, response, collector, started):
+        finished = time.perf_counter()
+        total = finished - started
+        render = finished - getattr(request, '_perf_view_finished', finished)
+        app = max(0.0, total - collector.duration - render)
+        size = None if response.streaming else len(response.content)
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unresolved'
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={collector.duration * 1000:.1f};desc="{collector.count} queries"',
+            f'app;dur={app * 1000:.1f}',
+            f'render;dur={render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+        REQUEST_DURATION.labels(view, request.method, response.status_code).observe(total)
+        REQUEST_DB_DURATION.labels(view).observe(collector.duration)
+        REQUEST_QUERIES.labels(view).observe(collector.count)
+        REQUEST_RENDER_DURATION.labels(view).observe(render)
+        if size is not None:
+            RESPONSE_SIZE.labels(view).observe(size)
+
+        over_budget = []
+        if collector.count > settings.PERF_QUERY_BUDGET:
+            over_budget.append('queries')
+        if total * 1000 > settings.PERF_LATENCY_BUDGET_MS:
+            over_budget.append('latency')
+        for budget in over_budget:
+            OVER_BUDGET.labels(view, budget).inc()
+        if over_budget:
+            logger.warning(
+                'Over %s budget: %s %s (%s) %.1f ms, %d queries in %.1f ms, render %.1f ms, %s bytes\n%s',
+                ' and '.join(over_budget), request.method, request.get_full_path(), view,
+                total * 1000, collector.count, collector.duration * 1000, render * 1000,
+                size if size is not None else 'streamed',
+                '\n'.join(f'  [{duration * 1000:.1f} ms] {sql}' for duration, sql in collector.queries),
+            )
+        return response
+
+
+def render_metrics():
+    """Prometheus text exposition, merged across worker processes when configured"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
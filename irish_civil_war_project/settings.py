@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'django_filters',
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 
 # Middleware stack
 MIDDLEWARE = [
+    'irish_civil_war_project.instrumentation.PerformanceMiddleware',  # Outermost, times the whole stack
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,6 +62,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'irish_civil_war_project.wsgi.application'  # WSGI entry point
+# Set by asgi.py when the project is served by an ASGI server
+ASGI = os.environ.get('DJANGO_ASGI', 'False') == 'True'
 
 # Database configuration (PostGIS) - values from environment
 DATABASES = {
@@ -70,6 +74,17 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', 'secure_password_change_me'),
         'HOST': os.environ.get('DB_HOST', 'db'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Persistent connections: each worker thread keeps its connection open
+        # for DB_CONN_MAX_AGE seconds ('None' = unlimited, 0 = per request) and
+        # checks it is still usable before reusing it for a new request. Under
+        # ASGI the default is 0: async views run their ORM calls in executor
+        # threads where the end-of-request cleanup never runs, so persistent
+        # connections there are neither reused nor closed and pile up
+        'CONN_MAX_AGE': (
+            None if os.environ.get('DB_CONN_MAX_AGE', '0' if ASGI else '600') == 'None'
+            else int(os.environ.get('DB_CONN_MAX_AGE', '0' if ASGI else '600'))
+        ),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
@@ -109,6 +124,85 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 50,
 }
 
+# Upper bound on the number of sites returned by a single proximity search
+NEARBY_MAX_RESULTS = int(os.environ.get('NEARBY_MAX_RESULTS', '1000'))
+
+# Maximum number of radius/polygon/bbox queries in one batch_query request
+BATCH_QUERY_MAX_QUERIES = int(os.environ.get('BATCH_QUERY_MAX_QUERIES', '500'))
+
+# Precomputed site proximity graph: maximum pair distance (km), the closest
+# neighbours kept per site (the table holds at most sites x this many rows)
+# and the number of related nearby events shown on a site's detail view
+SITE_NEIGHBOUR_MAX_KM = float(os.environ.get('SITE_NEIGHBOUR_MAX_KM', '20'))
+SITE_NEIGHBOUR_MAX_PER_SITE = int(os.environ.get('SITE_NEIGHBOUR_MAX_PER_SITE', '50'))
+SITE_RELATED_EVENTS_LIMIT = int(os.environ.get('SITE_RELATED_EVENTS_LIMIT', '5'))
+
+# County boundaries are split into pieces of at most this many vertices
+# (ST_Subdivide) for point-in-county lookups
+COUNTY_PIECE_MAX_VERTICES = int(os.environ.get('COUNTY_PIECE_MAX_VERTICES', '256'))
+
+# Spatial query engine: 'postgis', or 'memory' to answer nearby, in_polygon,
+# buffer_zone and ?county= from per-process NumPy arrays (see memory_engine),
+# for datasets of up to SPATIAL_ENGINE_MAX_SITES sites
+SPATIAL_ENGINE = os.environ.get('SPATIAL_ENGINE', 'postgis')
+SPATIAL_ENGINE_MAX_SITES = int(os.environ.get('SPATIAL_ENGINE_MAX_SITES', '250000'))
+SPATIAL_ENGINE_CELL_DEG = float(os.environ.get('SPATIAL_ENGINE_CELL_DEG', '0.05'))
+
+# Maximum results returned by a full-text search query
+SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', '100'))
+
+# Autocomplete: maximum entries held by each process's in-memory prefix index
+# (larger datasets are served from the trigram indexes) and results per request
+AUTOCOMPLETE_MAX_ENTRIES = int(os.environ.get('AUTOCOMPLETE_MAX_ENTRIES', '200000'))
+AUTOCOMPLETE_MAX_RESULTS = int(os.environ.get('AUTOCOMPLETE_MAX_RESULTS', '10'))
+
+# Server-side clustering: maximum tiles per request and cached tiles per process
+CLUSTER_MAX_TILES = int(os.environ.get('CLUSTER_MAX_TILES', '1024'))
+CLUSTER_CACHE_MAX_TILES = int(os.environ.get('CLUSTER_CACHE_MAX_TILES', '2048'))
+
+# Caches: 'responses' holds precompressed API responses on disk, shared by
+# every worker process and filled ahead of time by warm_response_cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('RESPONSE_CACHE_DIR', '/tmp/irish-history-responses'),
+        'TIMEOUT': None,  # Entries are keyed by dataset version and never go stale
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_SHARED_MAX_ENTRIES', '1000'))},
+    },
+}
+
+# Response caching: encoded API responses are cached per process and keyed by
+# dataset versions, which are re-checked at most once per interval (seconds)
+DATASET_VERSION_CHECK_INTERVAL = float(os.environ.get('DATASET_VERSION_CHECK_INTERVAL', '2'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '64'))
+# Cached bodies over RESPONSE_COMPRESS_MIN_BYTES are stored precompressed
+# (brotli variants need the optional brotli package)
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+RESPONSE_CACHE_GZIP = os.environ.get('RESPONSE_CACHE_GZIP', 'True') == 'True'
+RESPONSE_CACHE_GZIP_LEVEL = int(os.environ.get('RESPONSE_CACHE_GZIP_LEVEL', '9'))
+RESPONSE_CACHE_BROTLI = os.environ.get('RESPONSE_CACHE_BROTLI', 'True') == 'True'
+RESPONSE_CACHE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_CACHE_BROTLI_QUALITY', '9'))
+# Seconds nginx may serve a cached API response before revalidating it (X-Accel-Expires)
+API_MICRO_CACHE_SECONDS = int(os.environ.get('API_MICRO_CACHE_SECONDS', '5'))
+
+# FlatGeobuf exports (?format=fgb) are written once per dataset version into
+# EXPORT_CACHE_DIR. With EXPORT_ACCEL_REDIRECT_URL set, nginx serves them from
+# that internal location (X-Accel-Redirect), answering HTTP range requests
+EXPORT_CACHE_DIR = os.environ.get('EXPORT_CACHE_DIR', '/tmp/irish-history-exports')
+EXPORT_ACCEL_REDIRECT_URL = os.environ.get('EXPORT_ACCEL_REDIRECT_URL', '')
+# Seconds an export of an older dataset version is kept after a newer one is
+# written, while workers and nginx may still be serving it
+EXPORT_CACHE_GRACE_SECONDS = int(os.environ.get('EXPORT_CACHE_GRACE_SECONDS', '300'))
+
+# Request instrumentation: requests over these budgets are logged with their
+# SQL (at most PERF_LOGGED_QUERIES statements per request)
+PERF_QUERY_BUDGET = int(os.environ.get('PERF_QUERY_BUDGET', '50'))
+PERF_LATENCY_BUDGET_MS = float(os.environ.get('PERF_LATENCY_BUDGET_MS', '500'))
+PERF_LOGGED_QUERIES = int(os.environ.get('PERF_LOGGED_QUERIES', '100'))
+
 # CORS settings (development)
 CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:8000,http://127.0.0.1:8000,http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
@@ -2,9 +2,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 
+from .instrumentation import render_metrics
+
 
 @require_http_methods(["GET"])
 def health_check(request):
@@ -12,8 +14,16 @@ def health_check(request):
     return JsonResponse({"status": "ok"})
 
 
+@require_http_methods(["GET"])
+def metrics(request):
+    """Prometheus metrics (request latency, SQL and response size histograms)."""
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
 urlpatterns = [
     path('health/', health_check, name='health-check'),  # Docker health check endpoint
+    path('metrics', metrics, name='metrics'),  # Prometheus scrape endpoint
     path('', include('historical_sites.urls')),  # Root URL includes historical_sites urls
     path('admin/', admin.site.urls),
     path('api/', include('historical_sites.urls')),  # API endpoints
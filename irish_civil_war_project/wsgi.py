@@ -10,7 +10,20 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.db import DatabaseError
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'irish_civil_war_project.settings')
 
 application = get_wsgi_application()
+
+# Warm the per-process autocomplete index (and the in-memory spatial engine
+# when enabled) so the first requests don't pay for building them; skipped
+# when the database isn't ready (e.g. before migrate)
+try:
+    from historical_sites.autocomplete import warm_prefix_index
+    from historical_sites.memory_engine import warm_spatial_engine
+
+    warm_prefix_index()
+    warm_spatial_engine()
+except DatabaseError:
+    pass
@@ -9,6 +9,19 @@ let currentSiteId = null;
 let countyBoundaryLayer = null;
 let countyPolygons = {};
 let boundariesVisible = true;
+let countyDetailLevel = null;
+let siteFacets = null;
+let clusterLayer;
+let showingAllSites = false;
+let clusterRequestId = 0;
+
+
+// Below this zoom the unfiltered map shows server-side clusters instead of markers
+const clusterMaxZoom = 10;
+
+
+// Max zoom served by each simplified county geometry level (see CountyBoundary.SIMPLIFICATION_LEVELS)
+const countyDetailZooms = [7, 9, 11];
 
 
 // Color palette for county boundaries
@@ -83,6 +96,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeMap();
     loadCountyBoundaries();
     loadSites();
+    loadSiteFacets();
     setupEventListeners();
 });
 
@@ -106,6 +120,16 @@ function initializeMap() {
 
 
     markerLayer = L.layerGroup().addTo(map);
+    clusterLayer = L.layerGroup();
+    map.on('moveend', updateClusters);
+
+
+    // Swap county geometries when the zoom crosses a level-of-detail boundary
+    map.on('zoomend', function() {
+        if (countyDetailLevel !== null && getCountyDetailLevel(map.getZoom()) !== countyDetailLevel) {
+            loadCountyBoundaries();
+        }
+    });
     L.control.scale({position: 'bottomright', imperial: false}).addTo(map);
 
 
@@ -139,14 +163,25 @@ function initializeMap() {
 }
 
 
+// Index of the simplified geometry level used for a zoom (length = full resolution)
+function getCountyDetailLevel(zoom) {
+    const level = countyDetailZooms.findIndex(maxZoom => zoom <= maxZoom);
+    return level === -1 ? countyDetailZooms.length : level;
+}
+
+
 // Fetch and display county boundaries as colored polygons
 function loadCountyBoundaries() {
-    fetch('/api/county-boundaries/geojson_with_colors/')
+    const zoom = map.getZoom();
+    countyDetailLevel = getCountyDetailLevel(zoom);
+
+    fetch(`/api/county-boundaries/geojson_with_colors/?zoom=${zoom}`)
         .then(r => r.json())
         .then(data => {
             console.log(`Loaded ${data.features.length} county boundaries`);
 
 
+            const previousLayer = countyBoundaryLayer;
             countyBoundaryLayer = L.geoJSON(data, {
                 style: function(feature) {
                     const color = feature.properties.color;
@@ -194,11 +229,15 @@ function loadCountyBoundaries() {
                         });
                     });
                 }
-            }).addTo(map);
+            });
+
+
+            if (previousLayer) map.removeLayer(previousLayer);
+            if (boundariesVisible) countyBoundaryLayer.addTo(map);
 
 
             countyPolygons = countyBoundaryLayer;
-            showAlert('County boundaries loaded with colored borders', 'success');
+            if (!previousLayer) showAlert('County boundaries loaded with colored borders', 'success');
         })
         .catch(error => {
             console.error('Error loading county boundaries:', error);
@@ -261,6 +300,7 @@ async function loadSites() {
 function displaySites(sites) {
     markerLayer.clearLayers();
     markers = {};
+    showingAllSites = sites === allSites;
 
 
     sites.forEach(site => {
@@ -290,6 +330,69 @@ function displaySites(sites) {
             showSiteModal(site);
         });
     });
+
+
+    updateClusters();
+}
+
+
+// Swap individual markers for server-side clusters when zoomed out on the full dataset
+async function updateClusters() {
+    const requestId = ++clusterRequestId;
+
+
+    if (!showingAllSites || map.getZoom() >= clusterMaxZoom) {
+        map.removeLayer(clusterLayer);
+        if (!map.hasLayer(markerLayer)) map.addLayer(markerLayer);
+        return;
+    }
+
+
+    const bounds = map.getBounds();
+    const bbox = [
+        Math.max(bounds.getWest(), -180), Math.max(bounds.getSouth(), -90),
+        Math.min(bounds.getEast(), 180), Math.min(bounds.getNorth(), 90)
+    ].map(value => value.toFixed(4)).join(',');
+
+
+    try {
+        const response = await fetch(`/api/sites/clusters/?bbox=${bbox}&zoom=${map.getZoom()}`);
+        if (!response.ok) {
+            throw new Error(`API error: ${response.status}`);
+        }
+
+
+        const data = await response.json();
+        if (requestId !== clusterRequestId) return;
+
+
+        clusterLayer.clearLayers();
+        data.clusters.forEach(cluster => {
+            const dominant = Object.entries(cluster.categories).sort((a, b) => b[1] - a[1])[0][0];
+            const clusterMarker = L.circleMarker([cluster.latitude, cluster.longitude], {
+                radius: Math.min(8 + Math.sqrt(cluster.count) * 2, 30),
+                fillColor: getCategoryColor(dominant),
+                color: '#fff',
+                weight: 2,
+                opacity: 1,
+                fillOpacity: 0.7
+            });
+
+
+            clusterMarker.bindTooltip(`${cluster.count} site${cluster.count > 1 ? 's' : ''}`);
+            clusterMarker.on('click', () => map.setView([cluster.latitude, cluster.longitude], map.getZoom() + 2));
+            clusterMarker.addTo(clusterLayer);
+        });
+
+
+        map.removeLayer(markerLayer);
+        if (!map.hasLayer(clusterLayer)) map.addLayer(clusterLayer);
+    } catch (error) {
+        // Fall back to individual markers if clustering is unavailable
+        console.error('Error loading clusters:', error);
+        map.removeLayer(clusterLayer);
+        if (!map.hasLayer(markerLayer)) map.addLayer(markerLayer);
+    }
 }
 
 
@@ -495,7 +598,7 @@ async function showRelatedSites() {
 }
 
 
-// County filter using spatial point-in-polygon queries
+// County filter using each site's precomputed county
 async function filterByCounty() {
     const countySelect = document.getElementById('county-select');
     const selected = countySelect ? countySelect.value : '';
@@ -509,7 +612,7 @@ async function filterByCounty() {
     }
 
 
-    // Filter sites using spatial query (ST_Within)
+    // Filter sites server-side by county
     try {
         const params = new URLSearchParams({county: selected});
         const response = await fetch(`/api/sites/?${params}`);
@@ -744,11 +847,28 @@ async function performProximitySearch(lat, lng, radiusKm) {
 }
 
 
+// Fetch server-side site statistics (counts by category, county, year, ...)
+async function loadSiteFacets() {
+    try {
+        const response = await fetch('/api/sites/facets/');
+        if (!response.ok) {
+            throw new Error(`API error: ${response.status}`);
+        }
+
+
+        siteFacets = await response.json();
+        updateStatistics();
+    } catch (error) {
+        console.error('Error loading site statistics:', error);
+    }
+}
+
+
 function updateStatistics() {
     const totalEl = document.getElementById('stat-total');
     const visibleEl = document.getElementById('stat-visible');
 
 
-    if (totalEl) totalEl.textContent = allSites.length;
+    if (totalEl) totalEl.textContent = siteFacets ? siteFacets.total : allSites.length;
     if (visibleEl) visibleEl.textContent = Object.keys(markers).length;
 }